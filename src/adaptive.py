@@ -0,0 +1,273 @@
+import argparse
+import math
+import time
+from decimal import Decimal, localcontext
+import numpy as np
+from consistency import generateRows
+from lawbatch import LawBatch
+from planner import SIDES, ANGLES
+from solver import SolveResult, resultOf
+from stats import readRows
+from triangle import Triangle
+from trig import TrigLaw, SPHERICAL_LAWS
+
+class DecimalTrig:
+    '''
+    Class with pi, the sine, cosine and their inverses in decimal at the precision of the current context.
+    pi, sin and cos are the series of the decimal module's documentation, atan halves its argument until its series
+    converges fast, asin and acos go through atan so they stay accurate next to ±1.
+    Arguments out of the domain raise ValueError like math does.
+    '''
+    pis = {} # precision -> pi
+
+    @staticmethod
+    def pi():
+        with localcontext() as context:
+            precision = context.prec
+            if precision not in DecimalTrig.pis:
+                context.prec += 2
+                lasts, t, s, n, na, d, da = 0, Decimal(3), 3, 1, 0, 0, 24
+                while s != lasts:
+                    lasts = s
+                    n, na = n + na, na + 8
+                    d, da = d + da, da + 32
+                    t = (t * n) / d
+                    s += t
+                context.prec -= 2
+                DecimalTrig.pis[precision] = +s
+        return DecimalTrig.pis[precision]
+
+    @staticmethod
+    def sin(x):
+        with localcontext() as context:
+            context.prec += 2
+            i, lasts, s, fact, num, sign = 1, 0, x, 1, x, 1
+            while s != lasts:
+                lasts = s
+                i += 2
+                fact *= i * (i - 1)
+                num *= x * x
+                sign *= -1
+                s += num / fact * sign
+        return +s
+
+    @staticmethod
+    def cos(x):
+        with localcontext() as context:
+            context.prec += 2
+            i, lasts, s, fact, num, sign = 0, 0, Decimal(1), 1, Decimal(1), 1
+            while s != lasts:
+                lasts = s
+                i += 2
+                fact *= i * (i - 1)
+                num *= x * x
+                sign *= -1
+                s += num / fact * sign
+        return +s
+
+    @staticmethod
+    def tan(x):
+        return DecimalTrig.sin(x) / DecimalTrig.cos(x)
+
+    @staticmethod
+    def sqrt(x):
+        if x < 0:
+            raise ValueError('math domain error')
+        return x.sqrt()
+
+    @staticmethod
+    def atan(x):
+        with localcontext() as context:
+            context.prec += 2
+            halvings = 0
+            while abs(x) > Decimal('0.1'): # atan(x) = 2 atan(x / (1 + sqrt(1 + x²)))
+                x = x / (1 + (1 + x * x).sqrt())
+                halvings += 1
+            i, lasts, s, num, sign = 1, 0, x, x, 1
+            while s != lasts:
+                lasts = s
+                i += 2
+                num *= x * x
+                sign *= -1
+                s += num / i * sign
+            s *= 2 ** halvings
+        return +s
+
+    @staticmethod
+    def asin(x):
+        if abs(x) > 1:
+            raise ValueError('math domain error')
+        return 2 * DecimalTrig.atan(x / (1 + (1 - x * x).sqrt()))
+
+    @staticmethod
+    def acos(x):
+        if abs(x) > 1:
+            raise ValueError('math domain error')
+        if x == -1:
+            return DecimalTrig.pi()
+        return 2 * DecimalTrig.atan(((1 - x) / (1 + x)).sqrt())
+
+# decimal versions of lawbatch.KERNELS, keyed the same way, v is a dict of Decimals, angles in radians
+DECIMAL_KERNELS = {
+    'triangleSumTheoremString': lambda v, X, Y, Z: DecimalTrig.pi() - (v[X] + v[Y]),
+    'cosineLawSideString': lambda v, x, y, Z, z: DecimalTrig.sqrt(v[x]**2 + v[y]**2 - 2 * v[x] * v[y] * DecimalTrig.cos(v[Z])),
+    'cosineLawAngleString': lambda v, x, y, z, Z: DecimalTrig.acos((v[x]**2 + v[y]**2 - v[z]**2) / (2 * v[x] * v[y])),
+    'sineLawSideString': lambda v, x, X, W, w: v[x] * DecimalTrig.sin(v[W]) / DecimalTrig.sin(v[X]),
+    'sineLawAngleString': lambda v, x, X, w, W: DecimalTrig.asin(v[w] * DecimalTrig.sin(v[X]) / v[x]),
+    'pythagorasTheoremPlusString': lambda v, o, a, h: DecimalTrig.sqrt(v[o]**2 + v[a]**2),
+    'pythagorasTheoremMinusString': lambda v, h, a, o: DecimalTrig.sqrt(v[h]**2 - v[a]**2),
+    'sohSideOString': lambda v, h, o, angle: v[h] * DecimalTrig.sin(v[angle]),
+    'sohSideHString': lambda v, o, h, angle: v[o] / DecimalTrig.sin(v[angle]),
+    'sohAngleString': lambda v, o, h, angle: DecimalTrig.asin(v[o] / v[h]),
+    'cahSideAString': lambda v, h, a, angle: v[h] * DecimalTrig.cos(v[angle]),
+    'cahSideHString': lambda v, a, h, angle: v[a] / DecimalTrig.cos(v[angle]),
+    'cahAngleString': lambda v, a, h, angle: DecimalTrig.acos(v[a] / v[h]),
+    'toaSideOString': lambda v, a, o, angle: v[a] * DecimalTrig.tan(v[angle]),
+    'toaSideAString': lambda v, o, a, angle: v[o] / DecimalTrig.tan(v[angle]),
+    'toaAngleString': lambda v, o, a, angle: DecimalTrig.atan(v[o] / v[a])
+}
+
+def preciseSolve(row, law = TrigLaw.AUTO, digits = 40):
+    '''
+    Solves a row of three givens in decimal with the given number of digits, through the same steps a LazyTriangle
+    would take (LawBatch.derivations). The float inputs are taken exactly, only the result is rounded to float.
+    Returns a SolveResult, or None when the row isn't one this can solve (other givens, spherical laws, ...).
+    '''
+    row = {key: value for key, value in row.items() if value is not None}
+    if law in SPHERICAL_LAWS or not set(row) <= set(SIDES + ANGLES):
+        return None
+    derivations = LawBatch.derivations(frozenset(row), row.get('A') == 90, law)
+    if derivations is None:
+        return None
+
+    with localcontext() as context:
+        context.prec = digits
+        pi = DecimalTrig.pi()
+        values = {key: Decimal(value) * pi / 180 if key in ANGLES else Decimal(value) for key, value in row.items()}
+        try:
+            for quantity in SIDES + ANGLES:
+                LawBatch.evaluate(values, derivations, quantity, DECIMAL_KERNELS)
+        except (ValueError, ArithmeticError): # domain errors, division by zero
+            return SolveResult(None, None, None, None, None, None, law, 'Not correct dimensions for a triangle!', None)
+
+        angles = [values[quantity] for quantity in ANGLES]
+        if min(angles) <= 0 or min(values[quantity] for quantity in SIDES) <= 0:
+            return SolveResult(None, None, None, None, None, None, law, 'Not correct dimensions for a triangle!', None)
+        if sum(angles) > pi + Decimal(10) ** (-digits // 2):
+            return SolveResult(None, None, None, None, None, None, law, 'Angles can\'t add up to more than 180 degrees!', None)
+        return SolveResult(*(float(values[quantity]) for quantity in SIDES), *(float(angle * 180 / pi) for angle in angles),
+                           law, None, None)
+
+def fragileRows(count, seed = 0):
+    '''
+    Returns count rows that are hard on float: SSA whose sine law argument is next to 1 (a nearly right angle
+    is solved), nearly flat SSS and SAS with a tiny angle between nearly equal sides.
+    '''
+    generator = np.random.default_rng(seed)
+    rows = []
+    for i in range(count):
+        scale = math.exp(generator.uniform(math.log(1e-3), math.log(1e3)))
+        gap = 10 ** generator.uniform(-17, -8) # below 1e-16 some round onto or past the edge
+        if i % 3 == 0:
+            A = generator.uniform(10, 80)
+            rows.append({'a': scale, 'A': A, 'b': scale / math.sin(math.radians(A)) * (1 - gap)})
+        elif i % 3 == 1:
+            a, b = scale, scale * generator.uniform(0.1, 1)
+            rows.append({'a': a, 'b': b, 'c': (a + b) * (1 - gap)})
+        else:
+            rows.append({'a': scale, 'b': scale * (1 + gap), 'C': math.degrees(gap ** 0.5)})
+    return rows
+
+class AdaptiveSolver:
+    '''
+    Class that solves rows like solver.solve, in float, and re-solves in decimal only the ones whose condition
+    estimate (TrigCache.condition, Triangle.condition) is above threshold: the rounding its steps amplify could
+    cost them more than about 1e-16 * threshold relative, or a step failed on an argument past ±1 by rounding only.
+    It counts how many rows were escalated and what they cost, to check the common path stays at float speed.
+    '''
+    def __init__(self, threshold = 1e6, digits = 40):
+        self.threshold = threshold
+        self.digits = digits
+        self.rows = 0
+        self.escalated = 0
+        self.unescalable = 0 # flagged, but preciseSolve doesn't take them
+        self.rescued = 0 # failed in float, solved in decimal
+        self.rejected = 0 # solved in float, not a triangle in decimal
+        self.maxChange = 0.0 # largest relative difference of the rows solved both ways
+        self.floatTime = 0.0
+        self.preciseTime = 0.0
+
+    def solve(self, row, law = TrigLaw.AUTO, steps = False):
+        '''
+        Solves a row (dict of inputs, a 'law' key overrides law) and returns a SolveResult.
+        An escalated row keeps the procedure of the float solve.
+        '''
+        from spherical import SphericalTriangle
+
+        row = dict(row)
+        law = TrigLaw(row.pop('law', None) or law)
+        start = time.perf_counter()
+        triangle = SphericalTriangle(law=law, **row) if law in SPHERICAL_LAWS else Triangle(law=law, **row)
+        result = resultOf(triangle, law, steps)
+        self.floatTime += time.perf_counter() - start
+        self.rows += 1
+
+        if getattr(triangle, 'condition', 1.0) <= self.threshold: # SphericalTriangle doesn't estimate it
+            return result
+
+        start = time.perf_counter()
+        precise = preciseSolve(row, law, self.digits)
+        self.preciseTime += time.perf_counter() - start
+        if precise is None:
+            self.unescalable += 1
+            return result
+
+        self.escalated += 1
+        if result.error and not precise.error:
+            self.rescued += 1
+        elif precise.error and not result.error:
+            self.rejected += 1
+        elif not result.error:
+            self.maxChange = max(self.maxChange, max(abs(x - y) / abs(y) for x, y in zip(result[:6], precise[:6])))
+        return precise._replace(steps=result.steps)
+
+    def solveChunk(self, rows, law = TrigLaw.AUTO, steps = False):
+        return [self.solve(row, law, steps) for row in rows]
+
+    def report(self):
+        '''
+        Returns a summary of the escalations and their cost.
+        '''
+        rate = self.escalated / self.rows if self.rows else 0.0
+        return (f'{self.rows} rows, {self.escalated} escalated ({100 * rate:.3f}%), {self.unescalable} flagged but not escalable\n'
+                f'{self.rescued} failed in float and solved in decimal, {self.rejected} solved in float and not in decimal, '
+                f'largest change of the others {self.maxChange:.2e}\n'
+                f'float {self.floatTime:.3f}s ({1e6 * self.floatTime / max(self.rows, 1):.1f} us/row), '
+                f'decimal {self.preciseTime:.3f}s ({1e3 * self.preciseTime / max(self.escalated + self.unescalable, 1):.2f} ms/escalation, '
+                f'+{100 * self.preciseTime / max(self.floatTime, 1e-9):.1f}% over float)')
+
+def main():
+    '''
+    Command line entry point, solves a CSV file or generated rows (some of them fragile) and prints the report.
+    '''
+    parser = argparse.ArgumentParser(description='Solve in float and re-solve the ill-conditioned rows in decimal.')
+    parser.add_argument('path', nargs='?', help='CSV file with a header of any of a, b, c, A, B, C and law, generated rows if left out')
+    parser.add_argument('--law', default=TrigLaw.AUTO.value, help='law used for rows without a law column')
+    parser.add_argument('--rows', type=int, default=100000, help='number of generated rows')
+    parser.add_argument('--fragile', type=float, default=0.01, help='fraction of the generated rows that are fragile')
+    parser.add_argument('--threshold', type=float, default=1e6, help='condition above which a row is re-solved')
+    parser.add_argument('--digits', type=int, default=40)
+    args = parser.parse_args()
+
+    if args.path:
+        rows = (row for row in readRows(args.path) if row is not None)
+    else:
+        fragile = int(args.rows * args.fragile)
+        rows = generateRows(args.rows - fragile) + fragileRows(fragile)
+    solver = AdaptiveSolver(args.threshold, args.digits)
+    for row in rows:
+        solver.solve(row, TrigLaw(args.law))
+    print(solver.report())
+
+if __name__ == '__main__':
+    main()
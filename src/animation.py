@@ -0,0 +1,311 @@
+import argparse
+import math
+import os
+import sys
+import time
+import numpy as np
+from PyQt5.QtCore import Qt, QObject, QPointF, QRectF, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QGuiApplication, QImage, QPainter, QPen, QPolygonF
+from PyQt5.QtWidgets import (QApplication, QCheckBox, QComboBox, QDialog, QDialogButtonBox, QDoubleSpinBox, QFormLayout,
+                             QGraphicsEllipseItem, QGraphicsPolygonItem, QGraphicsScene, QGraphicsTextItem, QSpinBox)
+from lawbatch import LawBatch, QUANTITIES
+from trig import TrigLaw
+
+# label offsets of TrigMainWindow.drawLabels, multiplied by its spacing unit
+SIDE_LABEL_OFFSETS = ((10, -20), (-60, -20), (-20, -20))
+ANGLE_LABEL_OFFSETS = ((-30, 5), (-30, 5), (-30, -20))
+
+class Keyframes:
+    '''
+    Class that holds a sweep of solved triangles, e.g. B going from 20 to 80 degrees with the other givens fixed,
+    and the geometry of their drawings, one row per keyframe.
+    The whole sweep is solved in one LawBatch call and the geometry (vertices, arcs and label positions, laid out
+    like TrigMainWindow.drawTriangle does) is computed with array operations, so a frame in between two keyframes
+    is just a linear interpolation of two rows.
+    Steps of the sweep that don't make a triangle are left out.
+    '''
+    def __init__(self, inputs, quantity, start, end, count = 61, law = TrigLaw.AUTO, size = 300):
+        '''
+        inputs is a dict of the three givens (angles in degrees), quantity is the one of them that goes from start
+        to end in count steps. size is the drawing size like TriangleView.drawingSize.
+        '''
+        self.inputs = dict(inputs)
+        self.quantity = quantity
+        self.law = law
+
+        parameters = np.linspace(start, end, count)
+        solved = LawBatch.solve(dict(self.inputs, **{quantity: parameters}), law)
+        if np.count_nonzero(solved['solved']) < 2:
+            raise ValueError('Less than two steps of the sweep make a triangle!')
+
+        self.parameters = parameters[solved['solved']]
+        self.values = np.stack([solved[name][solved['solved']] for name in QUANTITIES], axis=1) # angles in degrees
+        self.geometry = Keyframes.layout(self.values, size)
+
+    @staticmethod
+    def layout(values, size):
+        '''
+        Returns the drawing of every row of values (a, b, c, A, B, C) as a dict of arrays: 'vertices' (n, 3, 2),
+        'arcRects' (n, 3, 4) and 'arcAngles' (n, 3, 2) (start and span in degrees), 'sideLabels' and
+        'angleLabels' (n, 3, 2) positions.
+        '''
+        a, b, c = values[:, 0], values[:, 1], values[:, 2]
+        A, B = np.radians(values[:, 3]), np.radians(values[:, 4])
+
+        scale = size / np.max(values[:, :3], axis=1)
+        vertices = np.zeros((len(values), 3, 2))
+        vertices[:, 1, 0] = c
+        vertices[:, 2, 0] = b * np.cos(A)
+        vertices[:, 2, 1] = -b * np.sin(A) # the y-axis is inverted in the view
+        vertices *= scale[:, None, None]
+
+        scaleFactor = np.min(values[:, :3], axis=1) * scale
+        radius = scaleFactor / 5
+        arcRects = np.concatenate([vertices - radius[:, None, None], np.broadcast_to(2 * radius[:, None, None], vertices.shape)], axis=2)
+        arcAngles = np.stack([np.stack([np.zeros(len(values)), np.degrees(np.pi - B), np.degrees(A - np.pi)], axis=1),
+                              values[:, 3:]], axis=2)
+
+        unit = (0.5 + scaleFactor / 200)[:, None, None]
+        midpoints = (np.roll(vertices, -1, axis=1) + np.roll(vertices, -2, axis=1)) / 2 # opposite each vertex
+        sideLabels = midpoints + unit * np.array(SIDE_LABEL_OFFSETS)
+        angleLabels = vertices + unit * np.array(ANGLE_LABEL_OFFSETS)
+
+        return {'vertices': vertices, 'arcRects': arcRects, 'arcAngles': arcAngles, 'sideLabels': sideLabels, 'angleLabels': angleLabels}
+
+    def frame(self, t):
+        '''
+        Returns the values and geometry at t (0 to 1 over the sweep), interpolated between the two nearest keyframes.
+        '''
+        position = min(max(t, 0.0), 1.0) * (len(self.values) - 1)
+        i = min(int(position), len(self.values) - 2)
+        f = position - i
+        interpolate = lambda array: (1 - f) * array[i] + f * array[i + 1]
+        return interpolate(self.values), {name: interpolate(array) for name, array in self.geometry.items()}
+
+    def bounds(self, margin = 100):
+        '''
+        Returns a QRectF that holds every frame of the sweep, with a margin for the label text.
+        '''
+        points = np.concatenate([self.geometry[name].reshape(-1, 2) for name in ('vertices', 'sideLabels', 'angleLabels')])
+        low, high = points.min(axis=0) - margin, points.max(axis=0) + margin
+        return QRectF(low[0], low[1], high[0] - low[0], high[1] - low[1])
+
+    def inputsAt(self, t):
+        '''
+        Returns the givens of the sweep at t, to solve that frame with a regular Triangle.
+        '''
+        return dict(self.inputs, **{self.quantity: float(np.interp(t, (0, 1), (self.parameters[0], self.parameters[-1])))})
+
+class TriangleAnimator(QObject):
+    '''
+    Class that plays Keyframes in a QGraphicsScene.
+    The items (triangle, arcs and labels) are created once and every frame only moves them, instead of clearing and
+    rebuilding the scene like a redraw does. Playback follows the clock rather than counting timer ticks, so a
+    frame that comes late doesn't slow the animation down, and the timer runs at the refresh rate of the screen.
+    '''
+    frameChanged = pyqtSignal(object) # the values (a, b, c, A, B, C) of the frame just shown, angles in degrees
+    finished = pyqtSignal()
+
+    def __init__(self, scene, keyframes, font = None, duration = 3.0, loop = False, parent = None):
+        super().__init__(parent)
+        self.scene = scene
+        self.keyframes = keyframes
+        self.duration = duration
+        self.loop = loop # back and forth until stopped
+        self.started = None
+
+        scene.clear()
+        self.triangleItem = QGraphicsPolygonItem()
+        scene.addItem(self.triangleItem)
+        self.arcItems = []
+        for _ in range(3):
+            arc = QGraphicsEllipseItem()
+            arc.setPen(QPen(QColor('#f08080'), 1)) # light coral like TrigMainWindow.drawArc
+            scene.addItem(arc)
+            self.arcItems.append(arc)
+        self.labelItems = []
+        for _ in range(6):
+            label = QGraphicsTextItem()
+            label.setFont(font or QFont('Sans Serif', 10))
+            scene.addItem(label)
+            self.labelItems.append(label)
+        scene.setSceneRect(keyframes.bounds()) # fixed, so the view doesn't jump around as the triangle changes
+
+        refreshRate = QGuiApplication.primaryScreen().refreshRate() or 60
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(max(1, round(1000 / refreshRate)))
+        self.timer.timeout.connect(self.onTimeout)
+
+        self.show(0.0)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def isRunning(self):
+        return self.timer.isActive()
+
+    def onTimeout(self):
+        '''
+        Shows the frame for the time elapsed since start.
+        '''
+        t = (time.perf_counter() - self.started) / self.duration
+        if self.loop:
+            t = 1 - abs(t % 2 - 1) # 0 -> 1 -> 0 -> ...
+        elif t >= 1:
+            self.show(1.0)
+            self.stop()
+            self.finished.emit()
+            return
+        self.show(t)
+
+    def show(self, t):
+        '''
+        Moves the items to the frame at t (0 to 1) and emits its values.
+        '''
+        values, geometry = self.keyframes.frame(t)
+        self.triangleItem.setPolygon(QPolygonF([QPointF(x, y) for x, y in geometry['vertices']]))
+
+        for arc, rect, (start, span) in zip(self.arcItems, geometry['arcRects'], geometry['arcAngles']):
+            arc.setRect(QRectF(*rect))
+            arc.setStartAngle(int(start * 16)) # 1/16th of a degree
+            arc.setSpanAngle(int(span * 16))
+
+        texts = [f'{name}={value:.2f}' for name, value in zip(('a', 'b', 'c'), values[:3])]
+        texts += [f'∠{name}={value:.2f}°' for name, value in zip(('A', 'B', 'C'), values[3:])]
+        positions = np.concatenate([geometry['sideLabels'], geometry['angleLabels']])
+        for label, text, (x, y) in zip(self.labelItems, texts, positions):
+            if label.toPlainText() != text: # relaying out the text is the expensive part
+                label.setPlainText(text)
+            label.setPos(x, y)
+
+        self.frameChanged.emit(values)
+
+    def exportFrames(self, directory, fps = 30, prefix = 'frame'):
+        '''
+        Renders the animation at fps frames per second of its duration to PNG images (frame-0001.png, ...)
+        in directory and returns their paths. It works on its own, without the timer or a view.
+        '''
+        os.makedirs(directory, exist_ok=True)
+        rect = self.scene.sceneRect()
+        count = max(2, round(self.duration * fps) + 1)
+        paths = []
+
+        for k in range(count):
+            self.show(k / (count - 1))
+            image = QImage(math.ceil(rect.width()), math.ceil(rect.height()), QImage.Format_ARGB32)
+            image.fill(Qt.white)
+            painter = QPainter(image)
+            painter.setRenderHint(QPainter.Antialiasing)
+            self.scene.render(painter, QRectF(image.rect()), rect)
+            painter.end()
+
+            path = os.path.join(directory, f'{prefix}-{k + 1:04d}.png')
+            image.save(path)
+            paths.append(path)
+
+        return paths
+
+class AnimationDialog(QDialog):
+    '''
+    Dialog to pick what to animate: which of the givens to sweep, its range, the number of keyframes, the duration
+    and whether to loop. It's closed with Play or Export Frames, exportRequested tells which.
+    '''
+    def __init__(self, inputs, parent = None):
+        super().__init__(parent)
+        self.setWindowTitle('Animate')
+        self.inputs = inputs
+        self.exportRequested = False
+
+        layout = QFormLayout(self)
+        self.quantityBox = QComboBox()
+        self.quantityBox.addItems(list(inputs))
+        self.quantityBox.currentTextChanged.connect(self.onQuantityChanged)
+        layout.addRow('Sweep', self.quantityBox)
+
+        self.startBox = QDoubleSpinBox()
+        self.endBox = QDoubleSpinBox()
+        for box in (self.startBox, self.endBox):
+            box.setDecimals(2)
+            box.setRange(0.01, 1e6)
+        layout.addRow('From', self.startBox)
+        layout.addRow('To', self.endBox)
+
+        self.keyframesBox = QSpinBox()
+        self.keyframesBox.setRange(2, 10000)
+        self.keyframesBox.setValue(61)
+        layout.addRow('Keyframes', self.keyframesBox)
+
+        self.durationBox = QDoubleSpinBox()
+        self.durationBox.setRange(0.1, 600)
+        self.durationBox.setValue(3)
+        self.durationBox.setSuffix(' s')
+        layout.addRow('Duration', self.durationBox)
+
+        self.loopBox = QCheckBox('Back and forth until stopped')
+        layout.addRow('Loop', self.loopBox)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Cancel)
+        buttons.addButton('Play', QDialogButtonBox.AcceptRole)
+        exportButton = buttons.addButton('Export Frames...', QDialogButtonBox.AcceptRole)
+        exportButton.clicked.connect(lambda: setattr(self, 'exportRequested', True))
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+        self.onQuantityChanged(self.quantityBox.currentText())
+
+    def onQuantityChanged(self, quantity):
+        '''
+        Starts the range at the current value of the quantity, angles go up to 180 degrees.
+        '''
+        isAngle = quantity.isupper()
+        for box in (self.startBox, self.endBox):
+            box.setMaximum(179.99 if isAngle else 1e6)
+            box.setSuffix('°' if isAngle else '')
+        value = self.inputs[quantity]
+        self.startBox.setValue(value)
+        self.endBox.setValue(min(value * 2, 179.99) if isAngle else value * 2)
+
+    def settings(self):
+        '''
+        Returns the chosen (quantity, start, end, keyframes, duration, loop).
+        '''
+        return (self.quantityBox.currentText(), self.startBox.value(), self.endBox.value(),
+                self.keyframesBox.value(), self.durationBox.value(), self.loopBox.isChecked())
+
+def main():
+    '''
+    Command line entry point, exports the frames of a sweep without the window:
+        python animation.py frames --given a=5 --given c=7 --sweep B=20:80 [--law Auto] [--fps 30]
+    '''
+    parser = argparse.ArgumentParser(description='Export the frames of a triangle animated over a sweep of one of its givens.')
+    parser.add_argument('directory')
+    parser.add_argument('--given', action='append', default=[], help='fixed given, e.g. a=5 (angles in degrees)')
+    parser.add_argument('--sweep', required=True, help='swept given and its range, e.g. B=20:80')
+    parser.add_argument('--law', default=TrigLaw.AUTO.value)
+    parser.add_argument('--keyframes', type=int, default=61)
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--size', type=int, default=300, help='drawing size in pixels')
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication(sys.argv)
+
+    inputs = {name: float(value) for name, value in (given.split('=') for given in args.given)}
+    quantity, sweep = args.sweep.split('=')
+    start, end = (float(value) for value in sweep.split(':'))
+    inputs[quantity] = start
+
+    keyframes = Keyframes(inputs, quantity, start, end, args.keyframes, TrigLaw(args.law), args.size)
+    animator = TriangleAnimator(QGraphicsScene(), keyframes, duration=args.duration)
+    paths = animator.exportFrames(args.directory, args.fps)
+    print(f'Wrote {len(paths)} frames: {paths[0]} ... {paths[-1]}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+'''
+Benchmark of cluster.py scaling with the number of workers, all started on this host.
+Every run solves the same generated CSV file and its output is checked against the first run's. With --kill one
+worker is killed after a second, so its chunks have to be sent to the others again.
+    python benchmarks/cluster.py [--rows 200000] [--workers 1 2 4 8] [--kill]
+'''
+import argparse
+import csv
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # the modules live in src
+from benchmarks.threads import generateRows
+from cluster import Coordinator, launchWorkers
+
+def writeRows(path, count):
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=['a', 'b', 'c', 'A', 'B', 'C'])
+        writer.writeheader()
+        writer.writerows(generateRows(count))
+
+def run(path, workers, chunkSize, kill):
+    '''
+    Solves the file with workers local workers and returns the coordinator.
+    '''
+    coordinator = Coordinator([path], chunkSize=chunkSize, timeout=5.0)
+    processes = launchWorkers(coordinator.address, workers)
+    if kill:
+        threading.Timer(1.0, processes[0].kill).start()
+    coordinator.run(processes)
+    for process in processes:
+        process.wait()
+    return coordinator
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the coordinator/worker throughput by number of workers.')
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--kill', action='store_true', help='kill one worker during every run')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'rows.csv')
+    writeRows(path, args.rows)
+    output = os.path.join(directory, 'rows.solved.csv')
+    reference = os.path.join(directory, 'reference.csv')
+    print(f'{args.rows} rows, chunks of {args.chunk_size}, {os.cpu_count()} cores')
+
+    try:
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            coordinator = run(path, workers, args.chunk_size, args.kill and workers > 1)
+            elapsed = time.perf_counter() - start
+            if baseline is None:
+                baseline = elapsed
+                shutil.copy(output, reference)
+            assert filecmp.cmp(output, reference, shallow=False), 'output differs from the first run'
+            print(f'{workers:>2} workers: {args.rows / elapsed:>8.0f} rows/s, speedup {baseline / elapsed:.2f}x, '
+                  f'{coordinator.redispatched} chunks sent again')
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main()
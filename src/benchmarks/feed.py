@@ -0,0 +1,91 @@
+'''
+Benchmark of the live feed: a producer writes triangles to a named pipe as fast as it can (or at --rate lines per
+second) while the window shows them. Reports the lines received and triangles shown per second, how late the GUI's
+event loop gets (the largest gap between ticks of a 5 ms timer) and how much the memory grew.
+    python benchmarks/feed.py [--seconds 5] [--rate 0]
+'''
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # the modules live in src
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+def produce(path, seconds, rate, stop):
+    '''
+    Writes random SAS triangles to the pipe for seconds, rate lines per second or as fast as possible if 0.
+    '''
+    generator = random.Random(0)
+    with open(path, 'w') as pipe:
+        started = time.perf_counter()
+        written = 0
+        while not stop.is_set() and time.perf_counter() - started < seconds:
+            lines = [json.dumps({'a': generator.uniform(1, 10), 'b': generator.uniform(1, 10), 'C': generator.uniform(10, 170)})
+                     for _ in range(100)]
+            pipe.write('\n'.join(lines) + '\n')
+            written += len(lines)
+            if rate:
+                time.sleep(max(0.0, written / rate - (time.perf_counter() - started)))
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the live feed of the calculator window.')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--rate', type=float, default=0, help='lines per second, as fast as possible if 0')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    from gui import TrigMainWindow
+
+    window = TrigMainWindow(storePath=':memory:') # the benchmark mustn't touch the real history
+    window.show()
+    QApplication.processEvents()
+    window.initDeferredComponents() # numpy and the database, so they don't count as the feed's memory
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'feed')
+    os.mkfifo(path)
+    memoryBefore = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    window.startFeed(path)
+
+    gaps = []
+    last = [time.perf_counter()]
+    def tick():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+    ticker = QTimer()
+    ticker.timeout.connect(tick)
+    ticker.start(5)
+
+    stop = threading.Event()
+    producer = threading.Thread(target=produce, args=(path, args.seconds, args.rate, stop))
+    started = time.perf_counter()
+    producer.start()
+    QTimer.singleShot(int(args.seconds * 1000), app.quit)
+    app.exec_()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    producer.join()
+
+    worker = window.feedWorker
+    received, shown = worker.received, window.feedShown
+    window.stopFeed()
+    os.remove(path)
+    os.rmdir(directory)
+
+    gaps.sort()
+    print(f'received {received / elapsed:.0f} lines/s, shown {shown / elapsed:.1f} triangles/s '
+          f'({worker.skipped} skipped, {worker.solved} solved)')
+    print(f'event loop gap p50 {gaps[len(gaps) // 2] * 1000:.1f} ms, max {gaps[-1] * 1000:.1f} ms (timer at 5 ms)')
+    print(f'max RSS grew by {(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memoryBefore) / 1024:.1f} MiB')
+
+if __name__ == '__main__':
+    main()
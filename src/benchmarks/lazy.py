@@ -0,0 +1,55 @@
+'''
+Benchmark of full solving (Triangle) against demand-driven solving (LazyTriangle) when only one output is needed.
+    python benchmarks/lazy.py [repeats]
+'''
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # the modules live in src
+from triangle import Triangle
+from lazy import LazyTriangle
+from trig import Trigonometry, TrigLaw
+
+CASES = [
+    ('SAS -> c', dict(a=3, b=4, C=60), TrigLaw.COSINE_LAW, 'c'),
+    ('SSS -> A', dict(a=5, b=6, c=7), TrigLaw.COSINE_LAW, 'A'),
+    ('ASA -> b', dict(A=40, B=60, c=5), TrigLaw.SINE_LAW, 'b'),
+    ('SSA -> B', dict(a=5, b=4, A=70), TrigLaw.SINE_LAW, 'B'),
+    ('right -> c', dict(a=5, b=3, A=90), TrigLaw.TOA, 'c')
+]
+
+def countCalls(function):
+    '''
+    Returns how many Trigonometry helpers a call of function makes, by wrapping them for the duration.
+    '''
+    calls = [0]
+    originals = {}
+    for name in ('pythagorasTheorem', 'triangleSumTheorem', 'soh', 'cah', 'toa', 'sine', 'cosine'):
+        originals[name] = getattr(Trigonometry, name)
+        def wrapper(*args, original=originals[name], **kwargs):
+            calls[0] += 1
+            return original(*args, **kwargs)
+        setattr(Trigonometry, name, staticmethod(wrapper))
+    try:
+        function()
+    finally:
+        for name, original in originals.items():
+            setattr(Trigonometry, name, staticmethod(original))
+    return calls[0]
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f'{"case":<12}{"full us":>10}{"lazy us":>10}{"speedup":>9}{"full calls":>12}{"lazy calls":>12}')
+
+    for name, inputs, law, output in CASES:
+        full = lambda: getattr(Triangle(law=law, **inputs), output)
+        lazy = lambda: getattr(LazyTriangle(law=law, **inputs), output)
+        assert abs(full() - lazy()) < 1e-9, name
+
+        fullTime = min(timeit.repeat(full, number=repeats, repeat=3)) / repeats * 1e6
+        lazyTime = min(timeit.repeat(lazy, number=repeats, repeat=3)) / repeats * 1e6
+        print(f'{name:<12}{fullTime:>10.2f}{lazyTime:>10.2f}{fullTime / lazyTime:>8.1f}x{countCalls(full):>12}{countCalls(lazy):>12}')
+
+if __name__ == '__main__':
+    main()
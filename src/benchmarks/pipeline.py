@@ -0,0 +1,46 @@
+'''
+Benchmark of pipeline.py: the same generated CSV file solved with the stages one after another, on threads, and on
+threads with a process pool for solving. Checks every output against the sequential one and prints the stage stats.
+    python benchmarks/pipeline.py [--rows 200000] [--processes 4]
+'''
+import argparse
+import csv
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # the modules live in src
+from benchmarks.threads import generateRows
+from pipeline import BatchPipeline
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the sequential and pipelined batch solving of a CSV file.')
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'rows.csv')
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=['a', 'b', 'c', 'A', 'B', 'C'])
+        writer.writeheader()
+        writer.writerows(generateRows(args.rows))
+
+    try:
+        reference = os.path.join(directory, 'sequential.csv')
+        runs = [('sequential', reference, 0), ('threads', os.path.join(directory, 'threads.csv'), 0),
+                (f'{args.processes} processes', os.path.join(directory, 'processes.csv'), args.processes)]
+        for name, output, processes in runs:
+            pipeline = BatchPipeline(path, output, chunkSize=args.chunk_size, processes=processes)
+            pipeline.runSequential() if name == 'sequential' else pipeline.run()
+            assert filecmp.cmp(output, reference, shallow=False), f'{name} output differs from the sequential one'
+            print(f'--- {name}')
+            print(pipeline.report())
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+'''
+Benchmark of repainting the triangle view with and without the item pixmap caches.
+Measures exposes (full viewport repaints of an unchanged scene) and resizes (relayout plus repaint).
+    python benchmarks/repaint.py [repaints]
+'''
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # the modules live in src
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication, QGraphicsView
+from triangle import Triangle
+from trig import TrigLaw
+
+def measure(window, cached, repaints):
+    '''
+    Returns the median milliseconds of an expose and of a resize, with the caches on or off.
+    '''
+    view = window.triangleView
+    view.cached = cached
+    view.setCacheMode(QGraphicsView.CacheBackground if cached else QGraphicsView.CacheNone)
+    window.showTriangle(Triangle(a=5, b=6, c=7, law=TrigLaw.COSINE_LAW)) # items only get a cache when view.cached is on
+    QApplication.processEvents()
+
+    view.viewport().repaint() # fills the caches
+    view.paintTimes.clear()
+    for _ in range(repaints):
+        view.viewport().repaint()
+    expose = statistics.median(view.paintTimes) * 1000
+
+    resizes = []
+    for i in range(repaints // 10):
+        start = time.perf_counter()
+        window.resize(window.width() + (10 if i % 2 else -10), window.height())
+        QApplication.processEvents()
+        view.resized.emit() # skip the debounce delay
+        view.viewport().repaint()
+        resizes.append(time.perf_counter() - start)
+
+    return expose, statistics.median(resizes) * 1000
+
+def main():
+    repaints = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    app = QApplication(sys.argv)
+    from gui import TrigMainWindow
+
+    window = TrigMainWindow()
+    window.show()
+    print(f'device pixel ratio {window.devicePixelRatioF()}')
+    for cached in (False, True):
+        expose, resize = measure(window, cached, repaints)
+        print(f'{"cached" if cached else "uncached":>9}: expose {expose:.3f} ms, resize {resize:.3f} ms')
+    window.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+'''
+Start up benchmark of the GUI with a regression budget: import time of gui and its heaviest imports, and the time
+to the first frame (window painted) and to the deferred panels being ready, in fresh interpreters.
+Exits with status 1 if a median goes over its budget.
+    python benchmarks/startup.py [runs]
+'''
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # the modules live in src
+
+# seconds, medians over the runs, generous enough for a slow machine but well under the old eager start up
+BUDGETS = {'import gui': 0.25, 'first frame': 0.6, 'deferred ready': 1.0}
+
+FIRST_FRAME_SCRIPT = '''
+import time
+start = time.perf_counter()
+import os, sys
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication
+from gui import TrigMainWindow
+imported = time.perf_counter()
+app = QApplication(sys.argv)
+window = TrigMainWindow()
+window.show()
+while not window.deferredComponentsReady:
+    app.processEvents()
+ready = time.perf_counter()
+print(imported - start, window.firstFrameTime - start, ready - start)
+window.close()
+'''
+
+def run(arguments):
+    '''
+    Runs python with the arguments in src and returns its stdout and stderr.
+    '''
+    process = subprocess.run([sys.executable] + arguments, cwd=SRC, capture_output=True, text=True, check=True)
+    return process.stdout, process.stderr
+
+def importTimes():
+    '''
+    Returns the (cumulative seconds, module) of the imports of gui, from python -X importtime, slowest first.
+    '''
+    _, stderr = run(['-X', 'importtime', '-c', 'import gui'])
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line.split('|')
+        times.append((int(cumulative) / 1e6, module.rstrip()))
+    return sorted(times, reverse=True)
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print('slowest imports (cumulative):')
+    for seconds, module in importTimes()[:10]:
+        print(f'{seconds * 1000:>9.1f} ms {module}')
+
+    samples = {name: [] for name in BUDGETS}
+    for _ in range(runs):
+        stdout, _ = run(['-c', FIRST_FRAME_SCRIPT])
+        for name, value in zip(BUDGETS, stdout.split()):
+            samples[name].append(float(value))
+
+    print(f'\nmedians over {runs} runs:')
+    overBudget = False
+    for name, budget in BUDGETS.items():
+        median = statistics.median(samples[name])
+        status = 'ok' if median <= budget else 'OVER BUDGET'
+        overBudget |= median > budget
+        print(f'{name:>15}: {median * 1000:7.1f} ms (budget {budget * 1000:.0f} ms) {status}')
+
+    sys.exit(1 if overBudget else 0)
+
+if __name__ == '__main__':
+    main()
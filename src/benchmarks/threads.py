@@ -0,0 +1,61 @@
+'''
+Benchmark of solver.solveBatch scaling with the number of threads.
+Run it with a regular and a free-threaded (e.g. python3.13t) interpreter to compare:
+    python benchmarks/threads.py [rows]
+'''
+import math
+import os
+import random
+import sys
+import sysconfig
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # the modules live in src
+from solver import solveBatch, solveChunk
+from trig import TrigLaw
+
+def generateRows(count, seed = 0):
+    '''
+    Generates a mix of SSS, SAS and ASA rows from random valid triangles.
+    '''
+    rng = random.Random(seed)
+    rows = []
+
+    for i in range(count):
+        A, B = rng.uniform(10, 80), rng.uniform(10, 80)
+        C = 180 - A - B
+        a = rng.uniform(1, 100)
+        b = a * math.sin(math.radians(B)) / math.sin(math.radians(A))
+        c = a * math.sin(math.radians(C)) / math.sin(math.radians(A))
+
+        if i % 3 == 0:
+            rows.append({'a': a, 'b': b, 'c': c})
+        elif i % 3 == 1:
+            rows.append({'a': a, 'b': b, 'C': C})
+        else:
+            rows.append({'A': A, 'B': B, 'c': c})
+
+    return rows
+
+def main():
+    rows = generateRows(int(sys.argv[1]) if len(sys.argv) > 1 else 60000)
+    gilDisabled = bool(sysconfig.get_config_var('Py_GIL_DISABLED'))
+    gilEnabled = sys._is_gil_enabled() if hasattr(sys, '_is_gil_enabled') else True
+
+    print(f'Python {sys.version.split()[0]}, free-threaded build: {gilDisabled}, GIL enabled: {gilEnabled}, cores: {os.cpu_count()}')
+
+    start = time.perf_counter()
+    reference = solveChunk(rows, TrigLaw.AUTO)
+    serial = time.perf_counter() - start
+    print(f'{"serial":>10}: {len(rows) / serial:>10.0f} rows/s')
+
+    for workers in (1, 2, 4, 8, 16):
+        start = time.perf_counter()
+        results = list(solveBatch(rows, TrigLaw.AUTO, workers=workers, chunkSize=500))
+        elapsed = time.perf_counter() - start
+
+        assert results == reference, 'threaded results differ from the serial ones'
+        print(f'{workers:>2} threads: {len(rows) / elapsed:>10.0f} rows/s, speedup {serial / elapsed:.2f}x')
+
+if __name__ == '__main__':
+    main()
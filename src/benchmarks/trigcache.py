@@ -0,0 +1,78 @@
+'''
+Microbenchmark of the per-solve TrigCache: libm calls and time per triangle with and without it.
+The steps are rendered in both cases since Triangle always builds them.
+    python benchmarks/trigcache.py [repeats]
+'''
+import math
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # the modules live in src
+import triangle
+from triangle import Triangle
+from trig import TrigCache, TrigFunctions, TrigLaw
+
+CASES = [
+    ('ASA sine', dict(A=40, B=60, c=5), TrigLaw.SINE_LAW),
+    ('SSA sine', dict(a=5, b=4, A=70), TrigLaw.SINE_LAW),
+    ('SAS cosine', dict(a=3, b=4, C=60), TrigLaw.COSINE_LAW),
+    ('SSS cosine', dict(a=5, b=6, c=7), TrigLaw.COSINE_LAW),
+    ('right SOH', dict(a=5, b=3, A=90), TrigLaw.SOH),
+    ('SAS auto', dict(a=3, b=4, C=60), TrigLaw.AUTO)
+]
+LIBM = ('sin', 'cos', 'degrees')
+
+def countCalls(function):
+    '''
+    Returns how many times function calls math.sin, math.cos and math.degrees, by wrapping them for the duration.
+    '''
+    calls = [0]
+    originals = {name: getattr(math, name) for name in LIBM}
+    for name, original in originals.items():
+        def wrapper(x, original=original):
+            calls[0] += 1
+            return original(x)
+        setattr(math, name, wrapper)
+    try:
+        function()
+    finally:
+        for name, original in originals.items():
+            setattr(math, name, original)
+    return calls[0]
+
+def solved(cacheClass, inputs, law):
+    '''
+    Returns the solved values and steps of a triangle using cacheClass as its cache.
+    '''
+    triangle.TrigCache = cacheClass
+    try:
+        solution = Triangle(law=law, **inputs)
+        return (solution.a, solution.b, solution.c, solution.A, solution.B, solution.C, solution.lawsUsed)
+    finally:
+        triangle.TrigCache = TrigCache
+
+def measure(cacheClass, inputs, law, repeats):
+    '''
+    Returns the libm calls and microseconds per solve with Triangle using cacheClass as its cache.
+    '''
+    triangle.TrigCache = cacheClass
+    try:
+        function = lambda: Triangle(law=law, **inputs)
+        elapsed = min(timeit.repeat(function, number=repeats, repeat=3)) / repeats * 1e6
+        return countCalls(function), elapsed
+    finally:
+        triangle.TrigCache = TrigCache
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f'{"case":<12}{"libm before":>13}{"libm after":>12}{"us before":>11}{"us after":>10}')
+
+    for name, inputs, law in CASES:
+        assert solved(TrigFunctions, inputs, law) == solved(TrigCache, inputs, law), name
+        callsBefore, timeBefore = measure(TrigFunctions, inputs, law, repeats)
+        callsAfter, timeAfter = measure(TrigCache, inputs, law, repeats)
+        print(f'{name:<12}{callsBefore:>13}{callsAfter:>12}{timeBefore:>11.2f}{timeAfter:>10.2f}')
+
+if __name__ == '__main__':
+    main()
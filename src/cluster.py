@@ -0,0 +1,474 @@
+import argparse
+import csv
+import io
+import json
+import os
+import queue
+import selectors
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+import numpy as np
+from solver import SolveResult, solveChunk
+from trig import TrigLaw
+from watcher import OUTPUT_SUFFIX, SOLVED_COLUMNS
+
+# every message is a header (kind, chunk id, payload length) followed by the payload
+HEADER = struct.Struct('!BQI')
+HELLO, TASK, RESULT, HEARTBEAT, SHUTDOWN = range(1, 6)
+
+LAWS = list(TrigLaw)
+INPUT_KEYS = ('a', 'b', 'c', 'A', 'B', 'C')
+INVALID = 255 # law code of a row that couldn't be parsed
+COUNT = struct.Struct('!I')
+
+def sendMessage(connection, kind, chunkId = 0, payload = b''):
+    connection.sendall(HEADER.pack(kind, chunkId, len(payload)) + payload)
+
+def readMessages(buffer):
+    '''
+    Takes the complete messages off the front of a bytearray and returns them as (kind, chunk id, payload).
+    '''
+    messages = []
+    while len(buffer) >= HEADER.size:
+        kind, chunkId, length = HEADER.unpack_from(buffer)
+        if len(buffer) < HEADER.size + length:
+            break
+        messages.append((kind, chunkId, bytes(buffer[HEADER.size:HEADER.size + length])))
+        del buffer[:HEADER.size + length]
+    return messages
+
+def encodeRows(rows):
+    '''
+    Packs rows (dicts of a, b, c, A, B, C and law, None for a malformed row) as the count, a float64 array of the
+    inputs (NaN where not given) and a uint8 array of the law codes.
+    '''
+    inputs = np.full((len(rows), 6), np.nan, dtype='<f8')
+    laws = np.full(len(rows), INVALID, dtype=np.uint8)
+    for i, row in enumerate(rows):
+        if row is not None:
+            for key, value in row.items():
+                if key in INPUT_KEYS:
+                    inputs[i, INPUT_KEYS.index(key)] = value
+            laws[i] = LAWS.index(TrigLaw(row['law']))
+    return COUNT.pack(len(rows)) + inputs.tobytes() + laws.tobytes()
+
+def decodeRows(payload):
+    count, = COUNT.unpack_from(payload)
+    inputs = np.frombuffer(payload, dtype='<f8', count=count * 6, offset=COUNT.size).reshape(count, 6)
+    laws = np.frombuffer(payload, dtype=np.uint8, count=count, offset=COUNT.size + inputs.nbytes)
+    return [None if law == INVALID else dict({key: float(value) for key, value in zip(INPUT_KEYS, values) if not np.isnan(value)},
+                                             law=LAWS[law].value) for values, law in zip(inputs, laws)]
+
+def encodeResults(results):
+    '''
+    Packs SolveResults (None for a malformed row) as the count, a float64 array of the solved values (NaN where not
+    solved), a uint16 array of error codes (0 when solved) and the JSON list of the error messages they index.
+    '''
+    values = np.full((len(results), 6), np.nan, dtype='<f8')
+    errors = np.zeros(len(results), dtype='<u2')
+    messages = [None, 'Invalid value in row!']
+    for i, result in enumerate(results):
+        if result is None:
+            errors[i] = 1
+        elif result.error:
+            if result.error not in messages:
+                messages.append(result.error)
+            errors[i] = messages.index(result.error)
+        else:
+            values[i] = result[:6]
+    return COUNT.pack(len(results)) + values.tobytes() + errors.tobytes() + json.dumps(messages).encode('utf-8')
+
+def decodeResults(payload):
+    '''
+    Returns the solved values as a (rows, 6) array and the error message of every row (None when solved).
+    '''
+    count, = COUNT.unpack_from(payload)
+    values = np.frombuffer(payload, dtype='<f8', count=count * 6, offset=COUNT.size).reshape(count, 6)
+    errors = np.frombuffer(payload, dtype='<u2', count=count, offset=COUNT.size + values.nbytes)
+    messages = json.loads(payload[COUNT.size + values.nbytes + errors.nbytes:].decode('utf-8'))
+    return values, [messages[error] for error in errors]
+
+class Worker:
+    '''
+    Class that connects to a Coordinator and solves the chunks it's sent with the regular Triangle solving
+    (solver.solveChunk), one at a time, until it's told to shut down or the connection goes away.
+    Messages are received on a thread of their own so the coordinator's sends never wait for a solve,
+    and a heartbeat is sent every interval seconds, also while solving.
+    '''
+    def __init__(self, address, interval = 1.0):
+        self.address = address
+        self.interval = interval
+        self.connection = socket.create_connection(address)
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sendLock = threading.Lock()
+        self.tasks = queue.Queue()
+        self.stopped = threading.Event()
+
+    def send(self, kind, chunkId = 0, payload = b''):
+        with self.sendLock:
+            sendMessage(self.connection, kind, chunkId, payload)
+
+    def receive(self):
+        '''
+        Puts the tasks received in the queue, None once the coordinator says to stop or hangs up.
+        '''
+        buffer = bytearray()
+        try:
+            while True:
+                data = self.connection.recv(1 << 20)
+                if not data:
+                    break
+                buffer += data
+                for kind, chunkId, payload in readMessages(buffer):
+                    if kind == SHUTDOWN:
+                        return
+                    if kind == TASK:
+                        self.tasks.put((chunkId, payload))
+        except OSError:
+            pass
+        finally:
+            self.tasks.put(None)
+
+    def heartbeat(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.send(HEARTBEAT)
+            except OSError:
+                return
+
+    def run(self):
+        '''
+        Solves tasks until there are no more, returns the number of chunks solved.
+        '''
+        threading.Thread(target=self.receive, daemon=True).start()
+        threading.Thread(target=self.heartbeat, daemon=True).start()
+        self.send(HELLO, payload=json.dumps({'host': socket.gethostname(), 'pid': os.getpid()}).encode('utf-8'))
+
+        solved = 0
+        try:
+            while True:
+                task = self.tasks.get()
+                if task is None:
+                    break
+                chunkId, payload = task
+                rows = decodeRows(payload)
+                results = iter(solveChunk([row for row in rows if row is not None]))
+                self.send(RESULT, chunkId, encodeResults([None if row is None else next(results) for row in rows]))
+                solved += 1
+        except OSError: # the coordinator went away
+            pass
+        finally:
+            self.stopped.set()
+            self.connection.close()
+        return solved
+
+class WorkerConnection:
+    '''
+    Coordinator side of a worker: its socket, unparsed bytes, the chunks it was sent and when it was last heard from.
+    '''
+    def __init__(self, connection, address):
+        self.connection = connection
+        self.address = address
+        self.name = f'{address[0]}:{address[1]}'
+        self.buffer = bytearray()
+        self.assigned = set()
+        self.lastSeen = time.perf_counter()
+        self.chunksSolved = 0
+
+class Chunk:
+    '''
+    A chunk of an input file: its raw CSV records (written back with the results), the output and the encoded rows.
+    '''
+    def __init__(self, output, records, payload):
+        self.output = output
+        self.records = records
+        self.payload = payload
+        self.last = False # last chunk of its file, the output is closed after it
+        self.attempts = 0 # workers it was lost with
+
+class Coordinator:
+    '''
+    Class that shards CSV files of triangles into chunks and hands them out to Workers over TCP.
+    Every worker has at most prefetch chunks at a time, so it starts the next one as soon as it sends a result.
+    A worker that hangs up or isn't heard from (results or heartbeats) for timeout seconds is dropped and its
+    chunks are sent to the others again, a late result of a chunk that was already written is ignored.
+    A chunk lost with maxAttempts workers is given up on: its rows are written with an error instead.
+    Results are written in input order next to each input as <name>.solved.csv (the same format as watcher.py),
+    out of order ones wait for the chunks before them. At most window chunks are read ahead of the one being
+    written, so memory stays bounded however big the files are.
+    '''
+    def __init__(self, paths, law = TrigLaw.AUTO, host = '127.0.0.1', port = 0, chunkSize = 5000, timeout = 10.0,
+                 prefetch = 2, window = 64, maxAttempts = 3):
+        self.paths = paths
+        self.law = law
+        self.chunkSize = chunkSize
+        self.timeout = timeout
+        self.prefetch = prefetch
+        self.window = window
+        self.maxAttempts = maxAttempts
+
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()[:2]
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+
+        self.workers = {} # socket -> WorkerConnection
+        self.chunks = {} # id -> Chunk, read and not written yet
+        self.results = {} # id -> result payload, waiting for the chunks before it to be written
+        self.waiting = deque() # ids of the chunks to send
+        self.reader = self.readChunks()
+        self.readCount = 0
+        self.nextWrite = 0
+        self.exhausted = False
+
+        self.rows = 0
+        self.redispatched = 0
+        self.droppedWorkers = 0
+        self.failedChunks = 0
+
+    def readChunks(self):
+        '''
+        Yields the chunks of every input file, the last one of a file marked so its output is closed once written.
+        '''
+        for path in self.paths:
+            outputPath = (path[:-len('.csv')] if path.endswith('.csv') else path) + OUTPUT_SUFFIX
+            with open(path, newline='') as inputFile:
+                reader = csv.reader(inputFile)
+                header = next(reader, None) or []
+                outputFile = open(outputPath, 'w', newline='')
+                csv.writer(outputFile, lineterminator='\n').writerow(header + SOLVED_COLUMNS)
+
+                previous = None # held back until it's known whether it's the last one
+                records = []
+                for values in reader:
+                    if any(value.strip() for value in values):
+                        records.append(values + [''] * (len(header) - len(values)))
+                    if len(records) >= self.chunkSize:
+                        if previous is not None:
+                            yield previous
+                        previous = Chunk(outputFile, records, encodeRows([self.parse(header, values) for values in records]))
+                        records = []
+                if records:
+                    if previous is not None:
+                        yield previous
+                    previous = Chunk(outputFile, records, encodeRows([self.parse(header, values) for values in records]))
+
+                if previous is None: # nothing but the header
+                    outputFile.close()
+                else:
+                    previous.last = True
+                    yield previous
+
+    def parse(self, header, values):
+        '''
+        Returns a record as the row dict the workers take, None if a value isn't valid.
+        '''
+        try:
+            row = {key: float(value) for key, value in zip(header, values) if key in INPUT_KEYS and value.strip()}
+            fields = dict(zip(header, values))
+            row['law'] = TrigLaw(fields['law'].strip()).value if fields.get('law', '').strip() else self.law.value
+            return row
+        except ValueError:
+            return None
+
+    def fill(self):
+        '''
+        Reads chunks until window of them are waiting to be written or the inputs are exhausted.
+        '''
+        while not self.exhausted and self.readCount - self.nextWrite < self.window:
+            try:
+                chunk = next(self.reader)
+            except StopIteration:
+                self.exhausted = True
+                return
+            self.chunks[self.readCount] = chunk
+            self.waiting.append(self.readCount)
+            self.readCount += 1
+
+    def dispatch(self):
+        '''
+        Sends waiting chunks to the workers that have room for them, the least busy first.
+        '''
+        for worker in sorted(self.workers.values(), key=lambda worker: len(worker.assigned)):
+            while self.waiting and len(worker.assigned) < self.prefetch:
+                chunkId = self.waiting.popleft()
+                if chunkId not in self.chunks or chunkId in self.results: # solved meanwhile by a worker presumed dead
+                    continue
+                try:
+                    sendMessage(worker.connection, TASK, chunkId, self.chunks[chunkId].payload)
+                except OSError:
+                    self.waiting.appendleft(chunkId)
+                    self.drop(worker)
+                    break
+                worker.assigned.add(chunkId)
+
+    def accept(self):
+        connection, address = self.listener.accept()
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.workers[connection] = WorkerConnection(connection, address)
+        self.selector.register(connection, selectors.EVENT_READ)
+
+    def receive(self, worker):
+        '''
+        Reads what a worker sent: results are kept for writing, anything counts as a sign of life.
+        '''
+        try:
+            data = worker.connection.recv(1 << 20)
+        except OSError:
+            data = b''
+        if not data:
+            self.drop(worker)
+            return
+
+        worker.lastSeen = time.perf_counter()
+        worker.buffer += data
+        for kind, chunkId, payload in readMessages(worker.buffer):
+            if kind == HELLO:
+                info = json.loads(payload.decode('utf-8'))
+                worker.name = f'{info["host"]}/{info["pid"]}'
+            elif kind == RESULT:
+                worker.assigned.discard(chunkId)
+                worker.chunksSolved += 1
+                if chunkId in self.chunks and chunkId not in self.results:
+                    self.results[chunkId] = payload
+
+    def drop(self, worker):
+        '''
+        Forgets a dead worker and puts its chunks back at the front of the queue, or gives up on the ones that
+        were already lost with maxAttempts workers (rows that crash or hang every worker).
+        '''
+        self.selector.unregister(worker.connection)
+        worker.connection.close()
+        del self.workers[worker.connection]
+        self.droppedWorkers += 1
+        for chunkId in sorted(worker.assigned, reverse=True):
+            if chunkId not in self.chunks or chunkId in self.results:
+                continue
+            chunk = self.chunks[chunkId]
+            chunk.attempts += 1
+            if chunk.attempts >= self.maxAttempts:
+                error = f'Chunk lost with {chunk.attempts} workers!'
+                self.results[chunkId] = encodeResults([SolveResult(None, None, None, None, None, None, self.law, error, None)] * len(chunk.records))
+                self.failedChunks += 1
+            else:
+                self.waiting.appendleft(chunkId)
+                self.redispatched += 1
+
+    def write(self):
+        '''
+        Writes the results that are next in order.
+        '''
+        while self.nextWrite in self.results:
+            chunk = self.chunks.pop(self.nextWrite)
+            values, errors = decodeResults(self.results.pop(self.nextWrite))
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator='\n')
+            for record, solved, error in zip(chunk.records, values, errors):
+                writer.writerow(record + ['' if np.isnan(value) else repr(float(value)) for value in solved] + [error or ''])
+            chunk.output.write(buffer.getvalue())
+            if chunk.last:
+                chunk.output.close()
+            self.rows += len(chunk.records)
+            self.nextWrite += 1
+
+    def step(self, wait = 0.5):
+        '''
+        One round of the loop: reads ahead, hands out chunks, handles what the workers sent, drops the silent ones
+        and writes what's in order.
+        '''
+        self.fill()
+        self.dispatch()
+        for key, _ in self.selector.select(wait):
+            if key.fileobj is self.listener:
+                self.accept()
+            elif key.fileobj in self.workers:
+                self.receive(self.workers[key.fileobj])
+        now = time.perf_counter()
+        for worker in [worker for worker in self.workers.values() if now - worker.lastSeen > self.timeout]:
+            self.drop(worker)
+        self.write()
+
+    def run(self, processes = ()):
+        '''
+        Solves every input file and tells the workers to shut down. Returns the number of rows written.
+        processes are the local workers (Popen objects, see launchWorkers): when they have all exited and no worker
+        is connected, nothing is left to solve the rest and a RuntimeError is raised.
+        '''
+        self.started = time.perf_counter()
+        try:
+            while not (self.exhausted and self.nextWrite == self.readCount):
+                self.step()
+                if processes and not self.workers and all(process.poll() is not None for process in processes):
+                    raise RuntimeError(f'all workers exited, {self.readCount - self.nextWrite} chunks not solved')
+        finally:
+            for worker in list(self.workers.values()):
+                try:
+                    sendMessage(worker.connection, SHUTDOWN)
+                except OSError:
+                    pass
+                worker.connection.close()
+            for chunk in self.chunks.values(): # outputs of files that weren't finished
+                chunk.output.close()
+            self.reader.close()
+            self.selector.close()
+            self.listener.close()
+        self.elapsed = time.perf_counter() - self.started
+        return self.rows
+
+    def report(self):
+        solvedBy = ', '.join(f'{worker.name}: {worker.chunksSolved}' for worker in self.workers.values())
+        return (f'{self.rows} rows in {self.elapsed:.2f}s ({self.rows / max(self.elapsed, 1e-9):.0f} rows/s), '
+                f'{self.readCount} chunks, {self.redispatched} sent again, {self.failedChunks} given up, '
+                f'{self.droppedWorkers} workers dropped'
+                + (f'\nchunks per worker: {solvedBy}' if solvedBy else ''))
+
+def launchWorkers(address, count):
+    '''
+    Starts count worker processes on this host connected to a coordinator, returns their Popen objects.
+    '''
+    host, port = address
+    return [subprocess.Popen([sys.executable, os.path.abspath(__file__), 'worker', f'{host}:{port}']) for _ in range(count)]
+
+def main():
+    '''
+    Command line entry point, runs a coordinator (with local workers if asked) or a worker.
+    '''
+    parser = argparse.ArgumentParser(description='Solve CSV files of triangles on workers over TCP.')
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+    coordinatorParser = subparsers.add_parser('coordinator', help='shard files into chunks and hand them to workers')
+    coordinatorParser.add_argument('paths', nargs='+')
+    coordinatorParser.add_argument('--law', default=TrigLaw.AUTO.value, help='law used for rows without a law column')
+    coordinatorParser.add_argument('--host', default='127.0.0.1', help='address to listen on, 0.0.0.0 for workers on other hosts')
+    coordinatorParser.add_argument('--port', type=int, default=0, help='port to listen on, any free one if 0')
+    coordinatorParser.add_argument('--chunk-size', type=int, default=5000)
+    coordinatorParser.add_argument('--timeout', type=float, default=10.0, help='seconds of silence after which a worker is dropped')
+    coordinatorParser.add_argument('--local', type=int, default=0, help='number of workers to start on this host')
+    workerParser = subparsers.add_parser('worker', help='solve chunks for a coordinator')
+    workerParser.add_argument('address', help='host:port of the coordinator')
+    args = parser.parse_args()
+
+    if args.mode == 'worker':
+        host, port = args.address.rsplit(':', 1)
+        Worker((host, int(port))).run()
+        return
+
+    coordinator = Coordinator(args.paths, TrigLaw(args.law), args.host, args.port, args.chunk_size, args.timeout)
+    print(f'listening on {coordinator.address[0]}:{coordinator.address[1]}', flush=True)
+    processes = launchWorkers(coordinator.address, args.local)
+    try:
+        coordinator.run(processes)
+    except RuntimeError as e:
+        sys.exit(f'coordinator stopped: {e}')
+    finally:
+        for process in processes:
+            process.wait()
+    print(coordinator.report())
+
+if __name__ == '__main__':
+    main()
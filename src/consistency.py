@@ -0,0 +1,238 @@
+import argparse
+import itertools
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from lawbatch import LawBatch, QUANTITIES
+from precision import PLANAR_LAWS, givenCase
+from solver import solve
+from stats import readRows
+
+LAW_PAIRS = tuple(itertools.combinations(PLANAR_LAWS, 2))
+ENGINES = ('triangle', 'batch') # Triangle's own solve chains one row at a time, or LawBatch on whole chunks
+
+def applicableLaws(row):
+    '''
+    Returns the laws that should be able to solve a row of three givens (the ones whose operations can get every
+    quantity from them), right triangle laws only when A is 90 degrees.
+    '''
+    rightAngleA = row.get('A') == 90 # exactly, like Triangle's right triangle laws check it
+    return [law for law in PLANAR_LAWS if LawBatch.derivations(frozenset(row), rightAngleA, law) is not None]
+
+def generateRows(count, seed = 0, rightFraction = 0.5):
+    '''
+    Returns count random rows: triangles of random shapes and sizes (rightFraction of them right angled at A),
+    each given by a random set of three of its sides and angles with at least one side.
+    '''
+    generator = np.random.default_rng(seed)
+    angles = 180 * generator.dirichlet((1, 1, 1), count)
+    right = generator.random(count) < rightFraction
+    B = generator.uniform(0, 90, count)
+    angles[right] = np.stack([np.full(count, 90.0), B, 90 - B], axis=1)[right]
+    sides = np.exp(generator.uniform(np.log(1e-3), np.log(1e3), count))[:, None] * np.sin(np.radians(angles))
+    values = np.concatenate([sides, angles], axis=1)
+
+    patterns = [pattern for pattern in itertools.combinations(QUANTITIES, 3) if pattern[0].islower()] # not only angles
+    rightPatterns = [pattern for pattern in patterns if 'A' in pattern] # the right angle is always given
+    rows = []
+    for row, choice, isRight in zip(values, generator.random(count), right):
+        choices = rightPatterns if isRight else patterns
+        pattern = choices[int(choice * len(choices))]
+        rows.append({quantity: float(value) for quantity, value in zip(QUANTITIES, row) if quantity in pattern})
+    return rows
+
+class ConsistencyReport:
+    '''
+    Class that collects the disagreements between laws that solve the same rows, grouped by law pair and given case.
+    Two laws disagree on a row when both solve it but some side or angle differs by more than tolerance (relative),
+    or when only one of them solves it. The worst rows of every group are kept as examples to reproduce.
+    Partial reports of separate workers merge into the report of the whole dataset.
+    '''
+    def __init__(self, tolerance = 1e-9, examples = 3):
+        self.tolerance = tolerance
+        self.examples = examples
+        self.rows = 0
+        self.groups = {} # (law, law, case) -> dict of counts, the largest difference and examples
+
+    def group(self, lawA, lawB, case):
+        return self.groups.setdefault((lawA.value, lawB.value, case), {
+            'compared': 0, 'disagreed': 0, 'maxDifference': 0.0, 'failures': Counter(), 'examples': []
+        })
+
+    def add(self, rows, results, errors):
+        '''
+        Adds a chunk: rows are the input dicts, results a dict of law -> (rows, 6) array of solved values (NaN where
+        not solved or not applicable) and errors a dict of law -> array of error messages (None when solved or not
+        applicable, since only the applicable laws are compared).
+        '''
+        self.rows += len(rows)
+        cases = np.array([givenCase(row) for row in rows])
+        laws = [applicableLaws(row) for row in rows]
+        applicable = {law: np.array([law in rowLaws for rowLaws in laws], dtype=bool) for law in PLANAR_LAWS}
+
+        for lawA, lawB in LAW_PAIRS:
+            both = applicable[lawA] & applicable[lawB]
+            if not both.any():
+                continue
+            solvedA = ~np.isnan(results[lawA]).any(axis=1)
+            solvedB = ~np.isnan(results[lawB]).any(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                differences = np.max(np.abs(results[lawA] - results[lawB]) / np.abs(results[lawA]), axis=1, initial=0)
+            differences = np.where(solvedA & solvedB, differences, np.inf) # only one of them solved it
+
+            for case in np.unique(cases[both]):
+                indices = np.flatnonzero(both & (cases == case))
+                group = self.group(lawA, lawB, case)
+                group['compared'] += indices.size
+
+                solvedBoth = indices[solvedA[indices] & solvedB[indices]]
+                if solvedBoth.size:
+                    group['maxDifference'] = max(group['maxDifference'], float(differences[solvedBoth].max()))
+                for index in indices[solvedA[indices] != solvedB[indices]]:
+                    failed, message = (lawB, errors[lawB][index]) if solvedA[index] else (lawA, errors[lawA][index])
+                    group['failures'][f'{failed.value}: {message}'] += 1
+
+                disagreed = indices[differences[indices] > self.tolerance]
+                group['disagreed'] += disagreed.size
+                worst = disagreed[np.argsort(-differences[disagreed], kind='stable')[:self.examples]]
+                group['examples'] = self.worst(group['examples'] + [(float(differences[index]), rows[index]) for index in worst])
+
+    def worst(self, examples):
+        return sorted(examples, key=lambda example: -example[0])[:self.examples]
+
+    def merge(self, other):
+        '''
+        Folds the report of another chunk of rows into this one.
+        '''
+        self.rows += other.rows
+        for key, theirs in other.groups.items():
+            ours = self.groups.setdefault(key, {'compared': 0, 'disagreed': 0, 'maxDifference': 0.0, 'failures': Counter(), 'examples': []})
+            ours['compared'] += theirs['compared']
+            ours['disagreed'] += theirs['disagreed']
+            ours['maxDifference'] = max(ours['maxDifference'], theirs['maxDifference'])
+            ours['failures'].update(theirs['failures'])
+            ours['examples'] = self.worst(ours['examples'] + theirs['examples'])
+        return self
+
+    def toDict(self):
+        return {
+            'rows': self.rows,
+            'tolerance': self.tolerance,
+            'groups': [dict(group, laws=[lawA, lawB], case=case, failures=dict(group['failures']),
+                            examples=[{'difference': difference, 'row': row} for difference, row in group['examples']])
+                       for (lawA, lawB, case), group in sorted(self.groups.items())]
+        }
+
+    def report(self):
+        '''
+        Returns a table of every law pair and given case, with the most common failures and the worst examples
+        of the groups that disagree.
+        '''
+        lines = [f'{"laws":<26}{"case":<6}{"compared":>10}{"disagreed":>11}{"max difference":>16}']
+        for (lawA, lawB, case), group in sorted(self.groups.items(), key=lambda item: (-item[1]['disagreed'], item[0])):
+            lines.append(f'{lawA + " / " + lawB:<26}{case:<6}{group["compared"]:>10}{group["disagreed"]:>11}{group["maxDifference"]:>16.2e}')
+            for failure, count in group['failures'].most_common(3):
+                lines.append(f'    {count} x {failure}')
+            for difference, row in group['examples']:
+                lines.append(f'    {"only one solved" if difference == np.inf else f"{difference:.2e}"}: {row}')
+        lines.append(f'{self.rows} rows, relative tolerance {self.tolerance:g}')
+        return '\n'.join(lines)
+
+def solveLaws(rows, engine = 'triangle'):
+    '''
+    Solves rows through every applicable planar law. Returns the results and errors dicts ConsistencyReport.add takes.
+    '''
+    results = {law: np.full((len(rows), 6), np.nan) for law in PLANAR_LAWS}
+    errors = {law: np.full(len(rows), None, dtype=object) for law in PLANAR_LAWS}
+
+    if engine == 'batch':
+        columns = {quantity: np.array([row.get(quantity, np.nan) for row in rows], dtype=np.float64) for quantity in QUANTITIES}
+        for law in PLANAR_LAWS:
+            solved = LawBatch.solve(columns, law)
+            results[law] = np.stack([solved[quantity] for quantity in QUANTITIES], axis=1)
+            errors[law][~solved['solved']] = 'Not a valid triangle'
+        return results, errors
+
+    for i, row in enumerate(rows):
+        for law in applicableLaws(row):
+            result = solve(law=law, **row)
+            if result.error:
+                errors[law][i] = result.error
+            else:
+                results[law][i] = result[:6]
+    return results, errors
+
+def auditChunk(rows, tolerance = 1e-9, engine = 'triangle'):
+    '''
+    Audits a chunk of rows (dicts of three givens, None or other shapes are skipped) and returns its
+    ConsistencyReport. This is what a worker process runs.
+    '''
+    rows = [row for row in rows if row is not None and len(row) == 3 and any(key.islower() for key in row)]
+    report = ConsistencyReport(tolerance)
+    report.add(rows, *solveLaws(rows, engine))
+    return report
+
+def auditGenerated(count, seed, tolerance = 1e-9, engine = 'triangle'):
+    '''
+    Audits count generated rows, generated in the worker itself so only the seed travels to it.
+    '''
+    return auditChunk(generateRows(count, seed), tolerance, engine)
+
+def audit(rows = None, count = 100000, tolerance = 1e-9, engine = 'triangle', workers = None, chunkSize = 5000, seed = 0):
+    '''
+    Audits an iterable of rows, or count generated rows if rows is None, on a process pool chunk by chunk
+    with at most two chunks per worker in flight. Returns the merged ConsistencyReport.
+    '''
+    workers = workers or os.cpu_count() or 1
+    total = ConsistencyReport(tolerance)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        def submit(*args):
+            pending.append(executor.submit(*args))
+            if len(pending) >= 2 * workers:
+                total.merge(pending.pop(0).result())
+
+        if rows is None:
+            for k, start in enumerate(range(0, count, chunkSize)):
+                submit(auditGenerated, min(chunkSize, count - start), seed + k, tolerance, engine)
+        else:
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunkSize:
+                    submit(auditChunk, chunk, tolerance, engine)
+                    chunk = []
+            if chunk:
+                submit(auditChunk, chunk, tolerance, engine)
+
+        for future in pending:
+            total.merge(future.result())
+
+    return total
+
+def main():
+    '''
+    Command line entry point, audits generated rows or a CSV file and prints the report (or JSON).
+    '''
+    parser = argparse.ArgumentParser(description='Solve every row through every applicable law and report where the laws disagree.')
+    parser.add_argument('path', nargs='?', help='CSV file with a header of any of a, b, c, A, B, C, generated rows if left out')
+    parser.add_argument('--rows', type=int, default=100000, help='number of generated rows')
+    parser.add_argument('--tolerance', type=float, default=1e-9, help='relative difference above which two laws disagree')
+    parser.add_argument('--engine', choices=ENGINES, default='triangle')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    rows = None
+    if args.path:
+        rows = ({key: value for key, value in row.items() if key != 'law'} if row else None for row in readRows(args.path))
+    report = audit(rows, args.rows, args.tolerance, args.engine, args.workers, args.chunk_size, args.seed)
+    print(json.dumps(report.toDict(), indent=1, default=str) if args.json else report.report())
+
+if __name__ == '__main__':
+    main()
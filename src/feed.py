@@ -0,0 +1,180 @@
+import json
+import os
+import select
+import socket
+import stat
+import sys
+import threading
+import time
+from PyQt5.QtCore import QObject, pyqtSignal
+from triangle import Triangle
+from trig import TrigLaw, SPHERICAL_LAWS
+
+INPUT_KEYS = ('a', 'b', 'c', 'A', 'B', 'C')
+
+def openSource(source):
+    '''
+    Opens a feed source and returns (fileno, read, close), read(size) returns the bytes available (b'' at the end).
+    The source is '-' for stdin, 'tcp:host:port' or the path of a Unix socket to connect to, or the path of a named
+    pipe or file to read. Raises OSError if it can't be opened.
+    '''
+    if source == '-':
+        fileno = sys.stdin.fileno()
+        return fileno, lambda size: os.read(fileno, size), lambda: None
+
+    if source.startswith('tcp:'):
+        host, port = source[len('tcp:'):].rsplit(':', 1)
+        connection = socket.create_connection((host or 'localhost', int(port)))
+    elif source.startswith('unix:') or stat.S_ISSOCK(os.stat(source).st_mode):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(source[len('unix:'):] if source.startswith('unix:') else source)
+    else:
+        # a named pipe is opened for writing too: opening doesn't wait for a producer, and there's always a writer
+        # (us) so the feed doesn't end when the producer restarts. A regular file is read to its end.
+        fileno = os.open(source, os.O_RDWR if stat.S_ISFIFO(os.stat(source).st_mode) else os.O_RDONLY)
+        return fileno, lambda size: os.read(fileno, size), lambda: os.close(fileno)
+
+    return connection.fileno(), connection.recv, connection.close
+
+class FeedWorker(QObject):
+    '''
+    Worker that reads JSON lines of triangle inputs (any of a, b, c, A, B, C, other givens and optionally law)
+    from a feed and solves them, meant to run on a QThread.
+    It doesn't emit the triangles: the producer can send far more than can be drawn, and every queued signal would
+    wait in the GUI's event loop. Instead the latest solved triangle is kept in a single slot the GUI takes from at
+    its own rate (takeLatest), and lines are only solved when the slot is empty, the ones replaced by a newer line
+    before that are skipped (without being parsed if they came in the same read). What's read at once is bounded
+    by maxBytes, the rest waits in the pipe or socket.
+    '''
+    finished = pyqtSignal(str) # final status message
+
+    def __init__(self, source, law = TrigLaw.AUTO, maxBytes = 1 << 16):
+        super().__init__()
+        self.source = source
+        self.law = law
+        self.maxBytes = maxBytes
+        self.cancelled = False
+        self.lock = threading.Lock()
+        self.latest = None # solved Triangle waiting to be shown
+        self.pending = None # newest line, not solved yet
+
+        self.received = 0
+        self.invalid = 0 # lines that aren't a JSON object of numbers
+        self.skipped = 0 # replaced by a newer line before being solved
+        self.solved = 0
+        self.failed = 0 # not a valid triangle
+
+    def cancel(self):
+        '''
+        Asks the worker to stop, it checks at least every 100 ms. Set from the GUI thread, read from the worker.
+        '''
+        self.cancelled = True
+
+    def takeLatest(self):
+        '''
+        Returns the latest solved triangle and empties the slot, None if nothing new was solved since the last call.
+        '''
+        with self.lock:
+            latest, self.latest = self.latest, None
+        return latest
+
+    def run(self):
+        '''
+        Reads the feed until it ends or the worker is cancelled.
+        '''
+        try:
+            fileno, read, close = openSource(self.source)
+        except (OSError, ValueError) as e:
+            self.finished.emit(f'Feed failed: {e}')
+            return
+
+        message = f'Feed {self.source} ended'
+        buffer = b''
+        try:
+            while not self.cancelled:
+                readable = select.select([fileno], [], [], 0.01 if self.pending else 0.1)[0]
+                if readable:
+                    data = read(self.maxBytes)
+                    if not data:
+                        break
+                    lines = (buffer + data).split(b'\n')
+                    buffer = lines.pop() # an incomplete last line waits for the rest
+                    if len(buffer) > self.maxBytes:
+                        raise ValueError(f'a line is longer than {self.maxBytes} bytes')
+                    self.received += len(lines)
+                    self.takeLast(lines)
+                if self.pending is not None and self.latest is None: # the GUI took the previous one
+                    self.solve(self.pending)
+                    self.pending = None
+            if self.pending is not None:
+                self.solve(self.pending)
+        except (OSError, ValueError) as e:
+            message = f'Feed failed: {e}'
+        finally:
+            close()
+        self.finished.emit(message if not self.cancelled else 'Feed stopped')
+
+    def takeLast(self, lines):
+        '''
+        Makes the last valid line of a read the pending one. Lines are parsed from the end, so the ones before it
+        are skipped without even being parsed, like the pending line it replaces.
+        '''
+        for i in range(len(lines) - 1, -1, -1):
+            row = self.parse(lines[i])
+            if row is not None:
+                self.skipped += i + (self.pending is not None)
+                self.pending = row
+                return
+
+    def parse(self, line):
+        '''
+        Returns a line as (inputs, law), or None (counted as invalid) if it isn't a JSON object of numbers.
+        '''
+        try:
+            row = json.loads(line)
+            law = TrigLaw(row.pop('law', self.law))
+            return {key: float(value) for key, value in row.items() if value is not None}, law
+        except (ValueError, TypeError, AttributeError):
+            self.invalid += 1
+            return None
+
+    def solve(self, pending):
+        '''
+        Solves a parsed line and puts it in the slot if it's a valid triangle.
+        '''
+        from spherical import SphericalTriangle
+
+        row, law = pending
+        try:
+            if law in SPHERICAL_LAWS:
+                triangle = SphericalTriangle(law=law, **{key: value for key, value in row.items() if key in INPUT_KEYS})
+            else:
+                triangle = Triangle(law=law, **row)
+        except TypeError: # an unknown key
+            self.invalid += 1
+            return
+        if triangle.errorMessage:
+            self.failed += 1
+            return
+        self.solved += 1
+        with self.lock:
+            self.latest = triangle
+
+class FeedRates:
+    '''
+    Class that turns the running counters of a FeedWorker (and the count of triangles shown) into a status line
+    with the rates over the time since the previous line.
+    '''
+    def __init__(self):
+        self.previous = None
+
+    def status(self, worker, shown):
+        now = time.perf_counter()
+        counts = (worker.received, shown)
+        rates = (0.0, 0.0)
+        if self.previous is not None:
+            then, previousCounts = self.previous
+            rates = tuple((count - previous) / max(now - then, 1e-9) for count, previous in zip(counts, previousCounts))
+        self.previous = (now, counts)
+        return (f'Feed: {worker.received} received ({rates[0]:.0f}/s), {shown} shown ({rates[1]:.0f}/s), '
+                f'{worker.skipped} skipped, {worker.invalid} invalid, {worker.failed} not triangles')
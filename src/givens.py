@@ -0,0 +1,294 @@
+import math
+import numpy as np
+
+# every quantity a row can be given, sides/angles plus the non-standard ones (h = altitude, m = median)
+QUANTITIES = ('a', 'b', 'c', 'A', 'B', 'C', 'area', 'perimeter', 'ha', 'hb', 'hc', 'ma', 'mb', 'mc')
+ANGLE_QUANTITIES = ('A', 'B', 'C')
+
+# asymmetric starting shapes (relative side lengths), tried one after the other on the rows that haven't converged
+# an equilateral start would sit on a symmetric point where the jacobian of many systems is singular
+STARTS = ((1.0, 1.1, 0.9), (1.0, 0.6, 1.3), (1.3, 1.0, 0.5), (0.6, 1.2, 1.4), (1.0, 1.9, 1.2))
+
+# least squares fits stop once a step changes the sides by less than this (relative), the central difference
+# jacobian isn't accurate enough to get much closer
+FIT_STEP_TOL = 1e-9
+
+class GivensSolver:
+    '''
+    Class that solves triangles given by any mix of sides, angles, area, perimeter, altitudes and medians.
+    The unknowns are always the three sides (in log space so they stay positive) and the givens are turned into a
+    nonlinear system that is solved with a damped Gauss-Newton iteration.
+    With more than three givens (redundant measurements that don't quite agree) the same iteration finds the
+    weighted least squares fit instead, and the residual of every measurement tells how far off it was.
+    Everything works on arrays of rows at once, a row that is missing a quantity just has NaN in it.
+    '''
+    @staticmethod
+    def evaluate(a, b, c, quantities = QUANTITIES):
+        '''
+        Returns the given quantities (all of them by default) of the triangles with sides a, b and c (arrays)
+        as a dict of arrays. Angles are in radians.
+        '''
+        values = {'a': a, 'b': b, 'c': c}
+        if any(quantity in quantities for quantity in ('area', 'ha', 'hb', 'hc')):
+            s = (a + b + c) / 2
+            values['area'] = np.sqrt(np.clip(s * (s - a) * (s - b) * (s - c), 0, None)) # Heron's formula
+
+        formulas = {
+            'A': lambda: np.arccos(np.clip((b**2 + c**2 - a**2) / (2 * b * c), -1, 1)),
+            'B': lambda: np.arccos(np.clip((c**2 + a**2 - b**2) / (2 * c * a), -1, 1)),
+            'C': lambda: np.arccos(np.clip((a**2 + b**2 - c**2) / (2 * a * b), -1, 1)),
+            'perimeter': lambda: a + b + c,
+            'ha': lambda: 2 * values['area'] / a, 'hb': lambda: 2 * values['area'] / b, 'hc': lambda: 2 * values['area'] / c,
+            'ma': lambda: 0.5 * np.sqrt(np.clip(2 * b**2 + 2 * c**2 - a**2, 0, None)),
+            'mb': lambda: 0.5 * np.sqrt(np.clip(2 * c**2 + 2 * a**2 - b**2, 0, None)),
+            'mc': lambda: 0.5 * np.sqrt(np.clip(2 * a**2 + 2 * b**2 - c**2, 0, None))
+        }
+        for quantity in quantities:
+            if quantity not in values:
+                values[quantity] = formulas[quantity]()
+        return values
+
+    @staticmethod
+    def prepare(givens, rows, weights = None):
+        '''
+        Converts the givens (dict of quantity -> array, angles in degrees) into a (rows, quantities) array of targets
+        and the matching array of scales used to make the residuals relative.
+        weights (dict of quantity -> array or scalar, 1 by default) multiply the squared residuals, so dividing the
+        scales by their square root is all weighted least squares needs.
+        '''
+        targets = np.full((rows, len(QUANTITIES)), np.nan)
+        for i, quantity in enumerate(QUANTITIES):
+            if quantity in givens:
+                value = np.asarray(givens[quantity], dtype=np.float64)
+                targets[:, i] = np.radians(value) if quantity in ANGLE_QUANTITIES else value
+
+        scales = np.abs(targets)
+        for quantity in ANGLE_QUANTITIES:
+            scales[:, QUANTITIES.index(quantity)] = 1 # angles are already of order 1 in radians
+
+        for quantity, weight in (weights or {}).items():
+            scales[:, QUANTITIES.index(quantity)] /= np.sqrt(np.asarray(weight, dtype=np.float64))
+
+        return targets, scales
+
+    @staticmethod
+    def initialScale(targets):
+        '''
+        Estimates the size of each triangle from its length-like givens, as the side of an equilateral triangle
+        that would have them. Rows with no length-like given (only angles) get NaN, they can't be solved.
+        '''
+        root3 = math.sqrt(3)
+        factors = {
+            'a': 1, 'b': 1, 'c': 1, 'perimeter': 1/3,
+            'ha': 2/root3, 'hb': 2/root3, 'hc': 2/root3, 'ma': 2/root3, 'mb': 2/root3, 'mc': 2/root3
+        }
+        estimates = [targets[:, QUANTITIES.index(quantity)] * factor for quantity, factor in factors.items()]
+        estimates.append(np.sqrt(4 * targets[:, QUANTITIES.index('area')] / root3))
+
+        logs = np.log(np.stack(estimates, axis=1))
+        known = ~np.isnan(logs)
+        counts = known.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'): # rows without any length-like given end up NaN
+            return np.exp(np.where(known, logs, 0).sum(axis=1) / np.where(counts > 0, counts, np.nan))
+
+    @staticmethod
+    def isFeasible(targets):
+        '''
+        Returns a mask of the rows whose givens are all finite and positive, and whose angles are below 180 degrees.
+        The others can't be a triangle, so they aren't iterated on at all.
+        '''
+        given = ~np.isnan(targets)
+        with np.errstate(invalid='ignore'):
+            feasible = np.isfinite(targets) & (targets > 0)
+            for quantity in ANGLE_QUANTITIES:
+                i = QUANTITIES.index(quantity)
+                feasible[:, i] &= targets[:, i] < math.pi
+        return np.all(feasible | ~given, axis=1)
+
+    @staticmethod
+    def residuals(u, targets, scales):
+        '''
+        Returns the relative residuals (rows, quantities) for log sides u, 0 where a quantity isn't given.
+        Only the quantities some row has are evaluated, the others are 0 for every row.
+        '''
+        given = ~np.isnan(targets)
+        present = [quantity for quantity, isPresent in zip(QUANTITIES, given.any(axis=0)) if isPresent]
+        sides = np.exp(u)
+        values = GivensSolver.evaluate(sides[:, 0], sides[:, 1], sides[:, 2], present)
+
+        r = np.zeros(targets.shape)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for quantity in present:
+                i = QUANTITIES.index(quantity)
+                r[:, i] = (values[quantity] - targets[:, i]) / scales[:, i]
+        return np.where(given, r, 0)
+
+    @staticmethod
+    def jacobian(u, targets, scales, step = 1e-6):
+        '''
+        Returns the (rows, quantities, 3) jacobian of the residuals with respect to the log sides,
+        using central differences (all rows are perturbed at once, so it's just six extra evaluations).
+        '''
+        columns = []
+        for k in range(3):
+            du = np.zeros_like(u)
+            du[:, k] = step
+            columns.append((GivensSolver.residuals(u + du, targets, scales) - GivensSolver.residuals(u - du, targets, scales)) / (2 * step))
+        return np.stack(columns, axis=2)
+
+    @staticmethod
+    def isStationary(u, targets, scales, tol = 1e-7):
+        '''
+        Returns a mask of the rows where the gradient of the squared residuals vanishes, i.e. u is a least squares fit
+        even though the residual isn't zero.
+        '''
+        r = GivensSolver.residuals(u, targets, scales)
+        J = GivensSolver.jacobian(u, targets, scales)
+        gradient = np.einsum('rqk,rq->rk', J, r)
+        return np.linalg.norm(gradient, axis=1) <= tol
+
+    @staticmethod
+    def isValid(u):
+        '''
+        Returns a mask of the rows whose log sides make a (non degenerate) triangle.
+        '''
+        a, b, c = np.exp(u).T
+        return (a < b + c) & (b < c + a) & (c < a + b)
+
+    @staticmethod
+    def iterate(u, targets, scales, tol, maxIter, stepTol = 0):
+        '''
+        Runs damped Gauss-Newton on all rows, with a backtracking line search that only accepts steps that keep
+        the triangle valid and reduce the residual. Rows drop out as soon as they converge or stall, or when the
+        step for their log sides is below stepTol (a scalar or one per row), which is how the rows that can't reach
+        zero residual finish without burning a whole line search on a step lost in the rounding noise.
+        Returns the final log sides, residual norms, iteration counts and convergence mask.
+        '''
+        rows = len(u)
+        norms = np.linalg.norm(GivensSolver.residuals(u, targets, scales), axis=1)
+        iterations = np.zeros(rows, dtype=np.int64)
+        stalled = np.zeros(rows, dtype=bool)
+        stepTol = np.broadcast_to(stepTol, (rows,))
+
+        for _ in range(maxIter):
+            active = np.flatnonzero((norms > tol) & ~stalled)
+            if active.size == 0:
+                break
+
+            uA, tA, sA = u[active], targets[active], scales[active]
+            r = GivensSolver.residuals(uA, tA, sA)
+            J = GivensSolver.jacobian(uA, tA, sA)
+
+            JT = np.transpose(J, (0, 2, 1))
+            JTJ = JT @ J
+            damping = 1e-10 * np.trace(JTJ, axis1=1, axis2=2)[:, None, None] + 1e-300
+            step = -np.linalg.solve(JTJ + damping * np.eye(3), (JT @ r[:, :, None]))[:, :, 0]
+            step = np.clip(step, -2, 2) # a side can't change by more than e² per iteration, keeps far off rows from overflowing
+
+            small = np.abs(step).max(axis=1) < stepTol[active]
+            stalled[active[small]] = True
+            active, uA, tA, sA, step = active[~small], uA[~small], tA[~small], sA[~small], step[~small]
+
+            t = np.ones(active.size)
+            accepted = np.zeros(active.size, dtype=bool)
+            newU = uA.copy()
+            newNorms = norms[active].copy()
+            for _ in range(30): # halve the step of the rows that haven't found a better point yet
+                pending = ~accepted
+                if not pending.any():
+                    break
+                candidate = uA[pending] + t[pending, None] * step[pending]
+                candidateNorms = np.linalg.norm(GivensSolver.residuals(candidate, tA[pending], sA[pending]), axis=1)
+                better = GivensSolver.isValid(candidate) & (candidateNorms < norms[active][pending])
+
+                indices = np.flatnonzero(pending)[better]
+                newU[indices] = candidate[better]
+                newNorms[indices] = candidateNorms[better]
+                accepted[indices] = True
+                t[pending] *= 0.5
+
+            u[active] = newU
+            norms[active] = newNorms
+            iterations[active] += 1
+            stalled[active[~accepted]] = True # no step helps anymore, a local minimum that isn't a solution
+
+        return u, norms, iterations, norms <= tol
+
+    @staticmethod
+    def solve(givens, tol = 1e-10, maxIter = 50, weights = None):
+        '''
+        Solves a batch of triangles.
+        givens is a dict of quantity -> array (or scalar), angles in degrees, NaN where a row doesn't have it.
+        weights optionally weighs the (relative) residual of each quantity, see prepare.
+        Returns a dict with the sides 'a', 'b', 'c' (NaN where not solved), 'converged' (bool), 'iterations',
+        'residual' (the weighted norm) and 'residuals', a dict of quantity -> array of computed minus given values
+        (angles in degrees, NaN where not given).
+        A row with more than three givens converges when it reaches an exact solution or a least squares fit.
+        Rows that don't converge from the first start are retried from the other starting shapes.
+        '''
+        rows = max((np.size(value) for value in givens.values()), default=0)
+        givens = {quantity: np.broadcast_to(np.asarray(value, dtype=np.float64), (rows,)) for quantity, value in givens.items()}
+        targets, scales = GivensSolver.prepare(givens, rows, weights)
+
+        feasible = GivensSolver.isFeasible(targets)
+        scale = np.full(rows, np.nan)
+        scale[feasible] = GivensSolver.initialScale(targets[feasible])
+        counts = np.sum(~np.isnan(targets), axis=1)
+        enough = (counts >= 3) & ~np.isnan(scale)
+        overdetermined = counts > 3
+
+        u = np.full((rows, 3), np.nan)
+        norms = np.full(rows, np.inf)
+        iterations = np.zeros(rows, dtype=np.int64)
+        converged = np.zeros(rows, dtype=bool)
+
+        for start in STARTS:
+            pending = np.flatnonzero(enough & ~converged)
+            if pending.size == 0:
+                break
+
+            u0 = np.log(scale[pending, None] * np.array(start))
+            with np.errstate(all='ignore'): # invalid trial points are expected, the line search rejects them
+                stepTol = np.where(overdetermined[pending], FIT_STEP_TOL, 0)
+                uP, normsP, iterationsP, convergedP = GivensSolver.iterate(u0, targets[pending], scales[pending], tol, maxIter, stepTol)
+                fits = overdetermined[pending] & ~convergedP
+                convergedP[fits] = GivensSolver.isStationary(uP[fits], targets[pending][fits], scales[pending][fits])
+
+            better = normsP < norms[pending]
+            u[pending[better]] = uP[better]
+            norms[pending[better]] = normsP[better]
+            iterations[pending] += iterationsP
+            converged[pending[better]] = convergedP[better] # only where u is the point that converged
+
+        sides = np.where(converged[:, None], np.exp(u), np.nan)
+        with np.errstate(all='ignore'):
+            values = GivensSolver.evaluate(sides[:, 0], sides[:, 1], sides[:, 2])
+        residuals = {}
+        for i, quantity in enumerate(QUANTITIES):
+            if quantity in givens:
+                difference = values[quantity] - targets[:, i]
+                residuals[quantity] = np.degrees(difference) if quantity in ANGLE_QUANTITIES else difference
+
+        return {'a': sides[:, 0], 'b': sides[:, 1], 'c': sides[:, 2],
+                'converged': converged, 'iterations': iterations, 'residual': norms, 'residuals': residuals}
+
+    @staticmethod
+    def solveOne(tol = 1e-10, maxIter = 50, weights = None, **givens):
+        '''
+        Solves a single triangle, givens are keyword arguments (None for unknown).
+        Returns (a, b, c) or None if it didn't converge.
+        '''
+        result = GivensSolver.solveOneWithResiduals(tol, maxIter, weights, **givens)
+        return None if result is None else result[0]
+
+    @staticmethod
+    def solveOneWithResiduals(tol = 1e-10, maxIter = 50, weights = None, **givens):
+        '''
+        Solves a single triangle like solveOne, returns ((a, b, c), residuals) where residuals is a dict of
+        quantity -> computed minus given value (angles in degrees), or None if it didn't converge.
+        '''
+        result = GivensSolver.solve({quantity: [value] for quantity, value in givens.items() if value is not None}, tol, maxIter, weights)
+        if not result['converged'][0]:
+            return None
+        residuals = {quantity: float(values[0]) for quantity, values in result['residuals'].items()}
+        return (result['a'][0], result['b'][0], result['c'][0]), residuals
@@ -1,21 +1,37 @@
 import math
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
+import time
+from PyQt5.QtWidgets import (QAbstractItemView, QAction, QApplication, QComboBox, QDockWidget, QFileDialog, QInputDialog,
+                             QGraphicsEllipseItem, QGraphicsPolygonItem, QGraphicsScene, QGraphicsTextItem, QGridLayout,
+                             QGroupBox, QHBoxLayout, QLabel, QLineEdit, QMainWindow, QMenu, QProgressBar, QPushButton,
+                             QRadioButton, QStatusBar, QTableView, QTableWidget, QTableWidgetItem, QToolBar, QVBoxLayout, QWidget)
+from PyQt5.QtCore import Qt, QPointF, QRectF, QSignalBlocker, QThread, QTimer
+from PyQt5.QtGui import QColor, QDoubleValidator, QFont, QGuiApplication, QIcon, QKeySequence, QPainterPath, QPen, QPolygonF
 from triangle import Triangle
-from trig import TrigLaw
+from trig import TrigLaw, SPHERICAL_LAWS
+from store import TriangleStore
+from view import TriangleView
+from recent import RecentTriangles
+# spherical and results pull in numpy, they're imported once the window is on screen (see initDeferredComponents)
 
 class TrigMainWindow(QMainWindow):
     '''
     Class to create the GUI of the application.
     It uses the Triangle class to draw the triangle and show the steps involved in drawing it.
     '''
-    def __init__(self):
+    def __init__(self, storePath = 'Files/history.db'):
         '''
         Constructor for the TrigMainWindow class.
         It calls the initUI() method to initialize the UI.
+        storePath is the history database, ':memory:' keeps it from touching the one on disk.
         '''
         super().__init__()
+        self.storePath = storePath
+        self.firstFrameTime = None # perf_counter time of the first paint of the window
+        self.deferredComponentsReady = False
+        self.animator = None # TriangleAnimator while an animation is shown
+        self.triangleScene = None # scene in the triangle view, the view doesn't keep it alive by itself
+        self.recent = RecentTriangles() # recent solves to go back and forth between
+        self.feedThread = None # QThread of the FeedWorker while a live feed is shown
         self.initUI()
         
     def initUI(self):
@@ -30,16 +46,16 @@ class TrigMainWindow(QMainWindow):
     def initWindow(self):
         '''
         Initializes the window of the application.
-        It sets the title, icon and size of the window.
+        It sets the title, icon and initial size of the window, it can be resized from there.
         It also initializes the default font to be used at various places.
         '''       
-        screen = QApplication.primaryScreen().size()
+        screen = QApplication.primaryScreen().availableGeometry()
         self.w = screen.width() // 2
         self.h = screen.height() // 2
 
         self.font = QFont('Sans Serif', 10)
         
-        self.setFixedSize(self.w, self.h)
+        self.resize(self.w, self.h)
         self.setWindowIcon(QIcon('Files/logo.png'))
         self.setWindowTitle('Trigonometry Visual Calculator')
         
@@ -58,18 +74,42 @@ class TrigMainWindow(QMainWindow):
         self.infoLayout = QHBoxLayout()   
         self.optionsLayout = QHBoxLayout()         
         self.dimensionsLayout = QHBoxLayout()
+        self.otherGivensLayout = QHBoxLayout()
         
     def initComponents(self):
         '''
-        Initializes the different components of the application.
+        Initializes the components needed for the first frame.
+        The hidden panels are created by initDeferredComponents once the window has been painted.
         '''
         self.initStatusBar()
         self.initToolBar()
         self.initTriangleView()
         self.initInfoBox()
         self.initDimensionInputBoxes()
+        self.initOtherGivensInputBoxes()
         self.initOptionsBox()
         self.initRadioBtns()
+
+    def initDeferredComponents(self):
+        '''
+        Initializes what isn't visible at start up: the history panel (which opens the database) and the results
+        panel (which imports numpy). It runs right after the first frame, and before anything that needs these
+        in case the user is faster than that. It only does anything the first time it's called.
+        '''
+        if self.deferredComponentsReady:
+            return
+        self.deferredComponentsReady = True
+        self.initHistoryPanel()
+        self.initResultsPanel()
+
+    def paintEvent(self, event):
+        '''
+        Records when the window was first painted and schedules the deferred components after it.
+        '''
+        super().paintEvent(event)
+        if self.firstFrameTime is None:
+            self.firstFrameTime = time.perf_counter()
+            QTimer.singleShot(0, self.initDeferredComponents)
         
     def initStatusBar(self):
         '''
@@ -97,11 +137,48 @@ class TrigMainWindow(QMainWindow):
         resetAction.triggered.connect(self.resetInput)
         toolBar.addAction(resetAction)
         
+        historyAction = QAction('History', self)
+        historyAction.triggered.connect(self.toggleHistoryPanel)
+        toolBar.addAction(historyAction)
+        
+        importAction = QAction('Import', self)
+        importAction.triggered.connect(self.onImportClicked)
+        importMenu = QMenu('Import', self)
+        self.float32Action = importMenu.addAction('Store in float32 (half the memory, ~7 digits)')
+        self.float32Action.setCheckable(True)
+        importAction.setMenu(importMenu)
+        toolBar.addAction(importAction)
+
+        animateAction = QAction('Animate', self)
+        animateAction.triggered.connect(self.onAnimateClicked)
+        toolBar.addAction(animateAction)
+
+        self.backAction = QAction('Back', self)
+        self.backAction.setShortcut(QKeySequence.Back)
+        self.backAction.triggered.connect(lambda: self.showRecent(self.recent.back()))
+        toolBar.addAction(self.backAction)
+
+        self.forwardAction = QAction('Forward', self)
+        self.forwardAction.setShortcut(QKeySequence.Forward)
+        self.forwardAction.triggered.connect(lambda: self.showRecent(self.recent.forward()))
+        toolBar.addAction(self.forwardAction)
+
+        self.recentMenu = QMenu('Recent', self)
+        self.recentMenu.aboutToShow.connect(self.fillRecentMenu)
+        toolBar.addAction(self.recentMenu.menuAction())
+        self.updateRecentActions()
+
+        self.feedAction = QAction('Feed', self)
+        self.feedAction.setCheckable(True)
+        self.feedAction.triggered.connect(self.onFeedClicked)
+        toolBar.addAction(self.feedAction)
+        
     def initTriangleView(self):
         '''
-        Creates a QGraphicsView object to display the triangle.
+        Creates a TriangleView (QGraphicsView) object to display the triangle, redrawn when it's resized.
         '''
-        self.triangleView = QGraphicsView()
+        self.triangleView = TriangleView()
+        self.triangleView.resized.connect(self.onTriangleViewResized)
         self.gridLayout.addWidget(self.triangleView, 0, 0) # 0th row, 0th column
     
     def initInfoBox(self):
@@ -155,6 +232,34 @@ class TrigMainWindow(QMainWindow):
         diemnsionsGroupBox.setLayout(self.dimensionsLayout)
         self.gridLayout.addWidget(diemnsionsGroupBox, 2, 0, 1, 2) # 2 rows, 2 columns, row span = 1, column span = 2
         
+    def initOtherGivensInputBoxes(self):
+        '''
+        Initializes a Group Box to input the non-standard properties of the triangle.
+        Creates input boxes for the area, perimeter, altitudes and medians along with their labels.
+        '''
+        otherGivensGroupBox = QGroupBox('Other Givens (optional):')
+        self.otherGivensIBs = {} # to store the input boxes by the name the Triangle class takes them with
+
+        for key, label in (('area', 'Area = '), ('perimeter', 'Perimeter = '), ('ha', 'hₐ = '), ('hb', 'h_b = '),
+                           ('hc', 'h_c = '), ('ma', 'mₐ = '), ('mb', 'm_b = '), ('mc', 'm_c = ')):
+            self.otherGivensLayout.addWidget(QLabel(label))
+
+            otherGivenIB = QLineEdit(self)
+            otherGivenIB.setValidator(QDoubleValidator(0, 1e6, 2))
+            otherGivenIB.setText('0.00')
+
+            if key in ('area', 'perimeter'): # these aren't constrained by the drawing area like lengths are
+                otherGivenIB.textChanged.connect(self.validatePositive)
+            else:
+                otherGivenIB.textChanged.connect(self.validateSideLength)
+            otherGivenIB.textChanged.connect(self.updateInputFieldStatus)
+
+            self.otherGivensLayout.addWidget(otherGivenIB)
+            self.otherGivensIBs[key] = otherGivenIB
+
+        otherGivensGroupBox.setLayout(self.otherGivensLayout)
+        self.gridLayout.addWidget(otherGivensGroupBox, 3, 0, 1, 2) # 3rd row, spans both columns
+
     def initOptionsBox(self):
         '''
         Creates a Group Box to select the operations to be performed on the triangle.
@@ -165,7 +270,7 @@ class TrigMainWindow(QMainWindow):
         
     def initRadioBtns(self):
         '''
-        Creates five Radio Buttons to select the operations to be performed on the triangle.
+        Creates nine Radio Buttons to select the operations to be performed on the triangle.
         These radio buttons are added to the optionsLayout.
         '''
         self.radioBtnSOH = QRadioButton('SOH')
@@ -173,52 +278,150 @@ class TrigMainWindow(QMainWindow):
         self.radioBtnTOA = QRadioButton('TOA')
         self.radioBtnSineLaw = QRadioButton('Sine Law')
         self.radioBtnCosineLaw = QRadioButton('Cosine Law')
+        self.radioBtnAuto = QRadioButton('Auto') # picks the laws by itself
+        self.radioBtnSphericalSineLaw = QRadioButton('Spherical Sine')
+        self.radioBtnSphericalCosineLaw = QRadioButton('Spherical Cosine')
+        self.radioBtnNapier = QRadioButton('Napier')
     
+        self.lawRadioBtns = {
+            TrigLaw.SOH: self.radioBtnSOH, TrigLaw.CAH: self.radioBtnCAH, TrigLaw.TOA: self.radioBtnTOA,
+            TrigLaw.SINE_LAW: self.radioBtnSineLaw, TrigLaw.COSINE_LAW: self.radioBtnCosineLaw, TrigLaw.AUTO: self.radioBtnAuto,
+            TrigLaw.SPHERICAL_SINE_LAW: self.radioBtnSphericalSineLaw, TrigLaw.SPHERICAL_COSINE_LAW: self.radioBtnSphericalCosineLaw,
+            TrigLaw.NAPIER: self.radioBtnNapier
+        }
+
         self.radioBtnSOH.setChecked(True)  # Set default selection
-        self.onSohCahToaClicked(True)
+        blocker = QSignalBlocker(self.angleIBs[0]) # the other fields are already 0, so no need for a resetInput cascade
+        self.angleIBs[0].setText('90.00') # A is 90 degrees in SOH
+        blocker.unblock()
+        self.updateInputFieldStatus()
 
         self.optionsLayout.addWidget(self.radioBtnSOH)
         self.optionsLayout.addWidget(self.radioBtnCAH)
         self.optionsLayout.addWidget(self.radioBtnTOA)
         self.optionsLayout.addWidget(self.radioBtnSineLaw)
         self.optionsLayout.addWidget(self.radioBtnCosineLaw)
+        self.optionsLayout.addWidget(self.radioBtnAuto)
+        self.optionsLayout.addWidget(self.radioBtnSphericalSineLaw)
+        self.optionsLayout.addWidget(self.radioBtnSphericalCosineLaw)
+        self.optionsLayout.addWidget(self.radioBtnNapier)
     
         self.radioBtnSOH.toggled.connect(self.onSohCahToaClicked)
         self.radioBtnCAH.toggled.connect(self.onSohCahToaClicked)
         self.radioBtnTOA.toggled.connect(self.onSohCahToaClicked)
         self.radioBtnSineLaw.toggled.connect(self.onSineCosineLawClicked)
         self.radioBtnCosineLaw.toggled.connect(self.onSineCosineLawClicked)
+        self.radioBtnAuto.toggled.connect(self.onSineCosineLawClicked) # no restrictions on the input, same as sine/cosine law
+        self.radioBtnSphericalSineLaw.toggled.connect(self.onSineCosineLawClicked)
+        self.radioBtnSphericalCosineLaw.toggled.connect(self.onSineCosineLawClicked)
+        self.radioBtnNapier.toggled.connect(self.onSohCahToaClicked) # right spherical triangles, A is 90 degrees like SOH/CAH/TOA
     
     def drawTriangle(self, triangle):
         '''
         Takes a triangle object as an argument and draws it on the QGraphicsView object.
         '''      
-        if self.triangle.errorMessage:
-            self.statusBar.showMessage(self.triangle.errorMessage, 3000)
+        from spherical import SphericalTriangle
+
+        if triangle.errorMessage:
+            self.statusBar.showMessage(triangle.errorMessage, 3000)
             return 
+
+        self.stopAnimation() # the scene is rebuilt, the animated items go away
+        
+        if isinstance(triangle, SphericalTriangle):
+            self.drawSphericalTriangle(triangle)
+            return
         
         triangle.vertices = triangle.calculateVertices() # scale up the vertices to make them visible on the screen
-        scaleVertex = round(min(self.w // 1.5, self.h // 1.5)) / max(triangle.a, triangle.b, triangle.c) # scale factor to scale the vertices
+        scaleVertex = self.triangleView.drawingSize() / max(triangle.a, triangle.b, triangle.c) # scale factor to scale the vertices
         triangle.vertices = [vertex * scaleVertex for vertex in triangle.vertices] # scale the vertices
         polygon = QPolygonF(triangle.vertices)
         triangleItem = QGraphicsPolygonItem(polygon)
 
-        self.scaleFactor = min(triangle.a, triangle.b, triangle.c) * scaleVertex # used to scale components of the triangle to look good on the screen  
+        scaleFactor = min(triangle.a, triangle.b, triangle.c) * scaleVertex # used to scale components of the triangle to look good on the screen  
 
-        if not self.triangleView.scene():
-            self.triangleView.setScene(QGraphicsScene())
-            
-        self.triangleView.scene().clear() # clear the scene before adding new items
-        self.triangleView.scene().addItem(triangleItem)
+        self.newScene().addItem(triangleItem)
         
-        self.drawAngles(triangle)
-        self.drawLabels(triangle)        
+        self.drawAngles(triangle, scaleFactor)
+        self.drawLabels(triangle, scaleFactor)        
+        self.finishDrawing()
         
-    def drawAngles(self, triangle):
+    def drawSphericalTriangle(self, triangle):
+        '''
+        Draws a spherical triangle projected onto the plane tangent to the sphere at its centroid.
+        Sides are drawn as the projected great circle arcs, together with the outline of the sphere for reference.
+        '''
+        vertices, arcs = triangle.calculateProjection()
+        points = vertices + [point for arc in arcs for point in arc]
+        extent = max(max(abs(point.x()), abs(point.y())) for point in points)
+        scaleVertex = self.triangleView.drawingSize() / (2 * extent)
+
+        self.newScene()
+
+        if extent > 0.5: # the sphere's outline only fits in the view for large triangles
+            sphereRadius = scaleVertex
+            self.triangleView.scene().addEllipse(-sphereRadius, -sphereRadius, 2 * sphereRadius, 2 * sphereRadius,
+                                                 QPen(QColor('#d3d3d3'), 1, Qt.DashLine))
+
+        for arc in arcs:
+            path = QPainterPath(arc[0] * scaleVertex)
+            for point in arc[1:]:
+                path.lineTo(point * scaleVertex)
+            self.triangleView.scene().addPath(path)
+
+        triangle.vertices = [vertex * scaleVertex for vertex in vertices]
+        for i, vertex in enumerate(triangle.vertices):
+            textItem = QGraphicsTextItem(f'∠{chr(65+i)}={math.degrees([triangle.A, triangle.B, triangle.C][i]):.2f}°')
+            textItem.setPos(vertex + QPointF(-30, 5 if i != 0 else -25))
+            textItem.setFont(self.font)
+            self.triangleView.scene().addItem(textItem)
+
+        for i, arc in enumerate(arcs):
+            side = [triangle.a, triangle.b, triangle.c][i]
+            textItem = QGraphicsTextItem(f'{chr(97+i)}={math.degrees(side):.2f}°')
+            textItem.setPos(arc[len(arc) // 2] * scaleVertex + QPointF(-20, -20))
+            textItem.setFont(self.font)
+            self.triangleView.scene().addItem(textItem)
+
+        self.finishDrawing()
+
+    def newScene(self):
+        '''
+        Puts a new, empty scene in the triangle view and returns it.
+        Every drawing gets its own scene, so the recent triangles can keep theirs to be shown again as they are.
+        '''
+        scene = QGraphicsScene()
+        self.triangleView.setScene(scene)
+        self.triangleScene = scene # the previous one is deleted here, unless a recent triangle still has it
+        return scene
+
+    def finishDrawing(self):
+        '''
+        Fits the scene to what was drawn (so an old, bigger drawing doesn't leave scroll bars behind)
+        and caches the items.
+        '''
+        scene = self.triangleView.scene()
+        scene.setSceneRect(scene.itemsBoundingRect())
+        self.triangleView.cacheItems()
+
+    def onTriangleViewResized(self):
+        '''
+        Redraws the current triangle to fit the new size of the view.
+        '''
+        triangle = getattr(self, 'triangle', None)
+        if self.animator is not None and self.animator.isRunning():
+            return # it keeps the size it started with
+        if triangle is not None and not triangle.errorMessage:
+            self.drawTriangle(triangle)
+            entry = self.recent.current()
+            if entry is not None and entry.triangle is triangle: # keep the redrawn scene, it fits the new size
+                entry.scene, entry.size = self.triangleScene, self.triangleView.drawingSize()
+
+    def drawAngles(self, triangle, scaleFactor):
         '''
         Draws representation of angles of the triangle using arcs.
         '''
-        angleArcRadius = self.scaleFactor / 5 
+        angleArcRadius = scaleFactor / 5 
         angles = [triangle.A, triangle.B, triangle.C]
         
         for i, angle in enumerate(angles):
@@ -257,11 +460,11 @@ class TrigMainWindow(QMainWindow):
         
         self.triangleView.scene().addItem(arc)
         
-    def drawLabels(self, triangle):  
+    def drawLabels(self, triangle, scaleFactor):  
         '''
         Draws labels for the sides and angles of the triangle.
         '''
-        unit = 0.5 + self.scaleFactor / 200 # to ensure proper spacing between labels and triangle (doesn't work properly haha)
+        unit = 0.5 + scaleFactor / 200 # to ensure proper spacing between labels and triangle (doesn't work properly haha)
         
         sideLabels = [
             f'a={triangle.a:.2f}', 
@@ -319,17 +522,15 @@ class TrigMainWindow(QMainWindow):
         
     def updateInputFieldStatus(self):
         '''
-        Since 3 properties determine a unique triangle (except AAA), we need to disable the input fields when we have 3 of them.
+        3 properties determine a unique triangle (except AAA), but more can be entered: redundant measurements are
+        fitted by least squares and their residuals shown in the procedure. So every field stays enabled,
+        except A when it has to be 90 degrees.
         '''
-        count = sum(float(field.text()) != 0 for field in self.sideIBs + self.angleIBs) # count the number of non-zero inputs
-        
-        for field in self.sideIBs + self.angleIBs:
-            if count >= 3 and (float(field.text()) == 0): # unique triangle              
-                field.setDisabled(True)
-            else:
-                field.setDisabled(False)
+        fields = self.sideIBs + self.angleIBs + list(self.otherGivensIBs.values())
+        for field in fields:
+            field.setDisabled(False)
                 
-        if self.radioBtnSOH.isChecked() or self.radioBtnCAH.isChecked() or self.radioBtnTOA.isChecked():
+        if self.radioBtnSOH.isChecked() or self.radioBtnCAH.isChecked() or self.radioBtnTOA.isChecked() or self.radioBtnNapier.isChecked():
             self.angleIBs[0].setDisabled(True) # A is always 90 degrees in SOH/CAH/TOA and stays disabled to prevent user from changing it
             
     def calculateAndUpdateDisplay(self, display = False):
@@ -337,27 +538,20 @@ class TrigMainWindow(QMainWindow):
         Takes in the input from the input boxes and creates a Triangle object.
         Then it draws the triangle and updates the info box.
         '''        
+        from spherical import SphericalTriangle
+
+        self.initDeferredComponents() # the history has to be there to store the calculation
         try:
-            a = float(self.sideIBs[0].text()) if self.sideIBs[0].text() and float(self.sideIBs[0].text()) != 0 else None # if the input is 0, it is ignored
-            b = float(self.sideIBs[1].text()) if self.sideIBs[1].text() and float(self.sideIBs[1].text()) != 0 else None
-            c = float(self.sideIBs[2].text()) if self.sideIBs[2].text() and float(self.sideIBs[2].text()) != 0 else None
-            A = float(self.angleIBs[0].text()) if self.angleIBs[0].text() and float(self.angleIBs[0].text()) != 0 else None
-            B = float(self.angleIBs[1].text()) if self.angleIBs[1].text() and float(self.angleIBs[1].text()) != 0 else None
-            C = float(self.angleIBs[2].text()) if self.angleIBs[2].text() and float(self.angleIBs[2].text()) != 0 else None
-            
-            lawChosen = TrigLaw.SOH 
-            if self.radioBtnSOH.isChecked():
-                lawChosen = TrigLaw.SOH
-            elif self.radioBtnCAH.isChecked():
-                lawChosen = TrigLaw.CAH
-            elif self.radioBtnTOA.isChecked():
-                lawChosen = TrigLaw.TOA
-            elif self.radioBtnSineLaw.isChecked():
-                lawChosen = TrigLaw.SINE_LAW
-            elif self.radioBtnCosineLaw.isChecked():
-                lawChosen = TrigLaw.COSINE_LAW   
+            inputs, lawChosen, otherGivens = self.readInputs()
+            a, b, c, A, B, C = inputs.values()
                 
-            self.triangle = Triangle(a, b, c, A, B, C, lawChosen)
+            if lawChosen in SPHERICAL_LAWS: # sides are arcs in degrees here
+                self.triangle = SphericalTriangle(a, b, c, A, B, C, lawChosen)
+            else:
+                self.triangle = Triangle(a, b, c, A, B, C, lawChosen, **otherGivens)
+            self.store.add(self.triangle, lawChosen, inputs) # every attempt goes to the history
+            if self.historyDock.isVisible():
+                self.loadHistoryPage()
             
             if self.triangle.errorMessage: # catch errors, dsplay them and halt execution
                 self.statusBar.showMessage(self.triangle.errorMessage, 3000) 
@@ -365,10 +559,197 @@ class TrigMainWindow(QMainWindow):
             
             self.updateInfoBox(a = a, b = b, c = c, A = A, B = B, C = C) # add the procedures to the info box
             self.drawTriangle(self.triangle)   
+            self.recent.add(inputs, lawChosen, otherGivens, self.triangle, '<br>'.join(self.triangle.lawsUsed),
+                            self.triangleScene, self.triangleView.drawingSize())
+            self.updateRecentActions()
         except ValueError: # I did do a lot of validation just in case haha
             if (display):
                 self.statusBar.showMessage('Invalid input, not a feasible/unique triangle!', 3000) 
             
+    def showRecent(self, entry):
+        '''
+        Shows a recent solve again as it was: its inputs, law, procedure and drawing. Nothing is solved or drawn,
+        unless the view changed size since, then only the drawing is redone.
+        '''
+        if entry is None:
+            return
+        self.stopAnimation()
+        self.triangle = entry.triangle
+        self.setInputs(entry.inputs, entry.law, entry.otherGivens)
+        self.showProcedure(entry.procedure)
+
+        if entry.size == self.triangleView.drawingSize():
+            self.triangleView.setScene(entry.scene)
+            self.triangleScene = entry.scene
+        else:
+            self.drawTriangle(entry.triangle)
+            entry.scene, entry.size = self.triangleScene, self.triangleView.drawingSize()
+
+        self.updateRecentActions()
+        self.statusBar.showMessage(f'Recent triangle {self.recent.index + 1} of {len(self.recent)}', 2000)
+
+    def setInputs(self, inputs, law, otherGivens):
+        '''
+        Fills the input boxes and selects the law without going through the validation and reset cascades,
+        the values were valid when they were solved.
+        '''
+        fields = dict(zip(('a', 'b', 'c', 'A', 'B', 'C'), self.sideIBs + self.angleIBs))
+        fields.update(self.otherGivensIBs)
+        givens = dict(inputs, **otherGivens)
+        for key, field in fields.items():
+            blocker = QSignalBlocker(field)
+            field.setText(f'{givens[key]:g}' if givens.get(key) is not None else '0.00')
+            blocker.unblock()
+
+        blocker = QSignalBlocker(self.lawRadioBtns[law])
+        self.lawRadioBtns[law].setChecked(True)
+        blocker.unblock()
+        self.updateInputFieldStatus()
+
+    def updateRecentActions(self):
+        '''
+        Enables Back, Forward and the Recent menu when there's somewhere to go.
+        '''
+        self.backAction.setEnabled(self.recent.canGoBack())
+        self.forwardAction.setEnabled(self.recent.canGoForward())
+        self.recentMenu.setEnabled(len(self.recent) > 0)
+
+    def fillRecentMenu(self):
+        '''
+        Lists the recent triangles, newest first, to jump to any of them.
+        '''
+        self.recentMenu.clear()
+        for index in reversed(range(len(self.recent))):
+            action = self.recentMenu.addAction(self.recent.entries[index].title())
+            action.setCheckable(True)
+            action.setChecked(index == self.recent.index)
+            action.triggered.connect(lambda checked, index=index: self.showRecent(self.recent.jump(index)))
+
+    def readInputs(self):
+        '''
+        Returns the inputs of the input boxes: a dict of a, b, c, A, B, C (None when 0 or empty, angles in degrees),
+        the law chosen and a dict of the other givens that are set.
+        Raises ValueError if a box doesn't hold a number.
+        '''
+        a = float(self.sideIBs[0].text()) if self.sideIBs[0].text() and float(self.sideIBs[0].text()) != 0 else None # if the input is 0, it is ignored
+        b = float(self.sideIBs[1].text()) if self.sideIBs[1].text() and float(self.sideIBs[1].text()) != 0 else None
+        c = float(self.sideIBs[2].text()) if self.sideIBs[2].text() and float(self.sideIBs[2].text()) != 0 else None
+        A = float(self.angleIBs[0].text()) if self.angleIBs[0].text() and float(self.angleIBs[0].text()) != 0 else None
+        B = float(self.angleIBs[1].text()) if self.angleIBs[1].text() and float(self.angleIBs[1].text()) != 0 else None
+        C = float(self.angleIBs[2].text()) if self.angleIBs[2].text() and float(self.angleIBs[2].text()) != 0 else None
+        
+        lawChosen = TrigLaw.SOH 
+        if self.radioBtnSOH.isChecked():
+            lawChosen = TrigLaw.SOH
+        elif self.radioBtnCAH.isChecked():
+            lawChosen = TrigLaw.CAH
+        elif self.radioBtnTOA.isChecked():
+            lawChosen = TrigLaw.TOA
+        elif self.radioBtnSineLaw.isChecked():
+            lawChosen = TrigLaw.SINE_LAW
+        elif self.radioBtnCosineLaw.isChecked():
+            lawChosen = TrigLaw.COSINE_LAW   
+        elif self.radioBtnAuto.isChecked():
+            lawChosen = TrigLaw.AUTO
+        elif self.radioBtnSphericalSineLaw.isChecked():
+            lawChosen = TrigLaw.SPHERICAL_SINE_LAW
+        elif self.radioBtnSphericalCosineLaw.isChecked():
+            lawChosen = TrigLaw.SPHERICAL_COSINE_LAW
+        elif self.radioBtnNapier.isChecked():
+            lawChosen = TrigLaw.NAPIER
+            
+        otherGivens = {key: float(IB.text()) for key, IB in self.otherGivensIBs.items() if IB.text() and float(IB.text()) != 0}
+
+        return {'a': a, 'b': b, 'c': c, 'A': A, 'B': B, 'C': C}, lawChosen, otherGivens
+
+    def onAnimateClicked(self):
+        '''
+        Asks what to animate between the current inputs and another value of one of them,
+        then plays it or exports its frames.
+        '''
+        from animation import AnimationDialog, Keyframes
+
+        try:
+            inputs, lawChosen, otherGivens = self.readInputs()
+        except ValueError:
+            self.statusBar.showMessage('Invalid input, not a feasible/unique triangle!', 3000)
+            return
+        inputs = {key: value for key, value in inputs.items() if value is not None}
+        if lawChosen in SPHERICAL_LAWS or otherGivens or len(inputs) != 3:
+            self.statusBar.showMessage('Animations need a planar triangle given by three sides/angles!', 3000)
+            return
+
+        dialog = AnimationDialog({key: value for key, value in inputs.items() if not (key == 'A' and lawChosen in (TrigLaw.SOH, TrigLaw.CAH, TrigLaw.TOA))}, self)
+        if not dialog.exec_():
+            return
+        quantity, start, end, count, duration, loop = dialog.settings()
+
+        try:
+            keyframes = Keyframes(inputs, quantity, start, end, count, lawChosen, self.triangleView.drawingSize())
+        except ValueError as e:
+            self.statusBar.showMessage(str(e), 3000)
+            return
+
+        if dialog.exportRequested:
+            self.exportAnimation(keyframes, duration)
+        else:
+            self.playAnimation(keyframes, duration, loop)
+
+    def playAnimation(self, keyframes, duration = 3.0, loop = False):
+        '''
+        Plays Keyframes in the triangle view, with the values of every frame in the info box.
+        Once it's over the last frame is solved like a regular calculation, so its procedure is shown.
+        '''
+        from animation import TriangleAnimator
+
+        self.stopAnimation()
+        scene = self.newScene()
+
+        for i in reversed(range(self.infoLayout.count())): # the procedure is replaced by the live values
+            self.infoLayout.itemAt(i).widget().setParent(None)
+        self.animationLabel = QLabel(self)
+        self.animationLabel.setFont(self.font)
+        self.infoLayout.addWidget(self.animationLabel)
+
+        self.animator = TriangleAnimator(scene, keyframes, self.font, duration, loop, self)
+        self.animator.frameChanged.connect(self.onAnimationFrame)
+        self.animator.finished.connect(lambda: self.showTriangle(Triangle(law=keyframes.law, **keyframes.inputsAt(1.0))))
+        self.animator.start()
+        self.statusBar.showMessage('Calculate or draw another triangle to stop the animation' if loop else 'Animating...', 3000)
+
+    def onAnimationFrame(self, values):
+        '''
+        Shows the solved values of the frame on screen.
+        '''
+        lines = [f'{name} = {value:.4f}' for name, value in zip(('a', 'b', 'c'), values[:3])]
+        lines += [f'∠{name} = {value:.4f}°' for name, value in zip(('A', 'B', 'C'), values[3:])]
+        self.animationLabel.setText('<br>'.join(lines))
+
+    def stopAnimation(self):
+        '''
+        Stops the animation being shown, if any.
+        '''
+        if self.animator is not None:
+            self.animator.stop()
+            self.animator.deleteLater()
+            self.animator = None
+
+    def exportAnimation(self, keyframes, duration = 3.0, fps = 30):
+        '''
+        Asks for a folder and renders the frames of Keyframes into it as PNG images.
+        '''
+        from animation import TriangleAnimator
+
+        directory = QFileDialog.getExistingDirectory(self, 'Export Frames To')
+        if not directory:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            paths = TriangleAnimator(QGraphicsScene(), keyframes, self.font, duration).exportFrames(directory, fps)
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.statusBar.showMessage(f'Exported {len(paths)} frames to {directory}', 5000)
+
     def validateSideLength(self):
         '''
         Validation of the side length input to make sure the following conditions are met:
@@ -387,6 +768,18 @@ class TrigMainWindow(QMainWindow):
         except ValueError:
             sender.setText('0')  # 0 if it's not a valid number
 
+    def validatePositive(self):
+        '''
+        Validation of the area and perimeter input to make sure it's a valid, non negative number.
+        '''
+        sender = self.sender()
+
+        try:
+            if float(sender.text()) < 0.0:
+                sender.setText('0')
+        except ValueError:
+            sender.setText('0')  # 0 if it's not a valid number
+
     def validateAngle(self):
         '''
         Validation of the angle input to make sure the following conditions are met:
@@ -408,11 +801,16 @@ class TrigMainWindow(QMainWindow):
         Displays the procedures involved in drawing the triangle in the info box. 
         It is based on the laws obtained from the Triangle object.
         '''
+        self.showProcedure('<br>'.join(self.triangle.lawsUsed))
+
+    def showProcedure(self, text):
+        '''
+        Replaces what the info box shows with the given (rich) text.
+        '''
         for i in reversed(range(self.infoLayout.count())): # clear all the previous procedures
             self.infoLayout.itemAt(i).widget().setParent(None)   
 
-        jointLaws = '<br>'.join(self.triangle.lawsUsed) 
-        label = QLabel(jointLaws, self)
+        label = QLabel(text, self)
         label.setFont(self.font)
         self.infoLayout.addWidget(label)                   
             
@@ -424,6 +822,368 @@ class TrigMainWindow(QMainWindow):
             sideIB.setText('0.00')
         for angleIB in self.angleIBs:
             angleIB.setText('0.00')            
+        for otherGivenIB in self.otherGivensIBs.values():
+            otherGivenIB.setText('0.00')
        
-        if self.radioBtnSOH.isChecked() or self.radioBtnCAH.isChecked() or self.radioBtnTOA.isChecked():
-            self.angleIBs[0].setText('90.00') # make sure A is 90 degrees in SOH/CAH/TOA
\ No newline at end of file
+        if self.radioBtnSOH.isChecked() or self.radioBtnCAH.isChecked() or self.radioBtnTOA.isChecked() or self.radioBtnNapier.isChecked():
+            self.angleIBs[0].setText('90.00') # make sure A is 90 degrees in SOH/CAH/TOA
+            
+    def initHistoryPanel(self):
+        '''
+        Creates a dock widget to browse the triangles stored in the history database.
+        It is hidden until the History button is pressed and only ever holds one page of rows.
+        '''
+        self.store = TriangleStore(self.storePath)
+        self.historyPageSize = 50
+        self.historyPageStarts = [None] # id the current page starts before, one entry per page visited
+
+        self.historyDock = QDockWidget('History', self)
+        self.historyDock.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
+
+        historyWidget = QWidget()
+        historyLayout = QVBoxLayout(historyWidget)
+
+        filterLayout = QHBoxLayout()
+        self.historyLawFilter = QComboBox()
+        self.historyLawFilter.addItem('All laws', None)
+        for law in TrigLaw:
+            self.historyLawFilter.addItem(law.value, law)
+        self.historyStatusFilter = QComboBox()
+        self.historyStatusFilter.addItem('All', None)
+        self.historyStatusFilter.addItem('Solved', 'ok')
+        self.historyStatusFilter.addItem('Failed', 'error')
+        self.historyShapeFilter = QComboBox()
+        self.historyShapeFilter.addItem('All shapes', None)
+        for shape in ('acute', 'right', 'obtuse'):
+            self.historyShapeFilter.addItem(shape.capitalize(), shape)
+
+        for comboBox in (self.historyLawFilter, self.historyStatusFilter, self.historyShapeFilter):
+            comboBox.currentIndexChanged.connect(self.resetHistoryPages)
+            filterLayout.addWidget(comboBox)
+        historyLayout.addLayout(filterLayout)
+
+        self.historyTable = QTableWidget(0, 8)
+        self.historyTable.setHorizontalHeaderLabels(['Law', 'Status', 'a', 'b', 'c', '∠A', '∠B', '∠C'])
+        self.historyTable.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.historyTable.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.historyTable.cellClicked.connect(self.onHistoryRowClicked)
+        historyLayout.addWidget(self.historyTable)
+
+        pageLayout = QHBoxLayout()
+        self.historyNewerBtn = QPushButton('< Newer')
+        self.historyNewerBtn.clicked.connect(self.onHistoryNewerClicked)
+        self.historyOlderBtn = QPushButton('Older >')
+        self.historyOlderBtn.clicked.connect(self.onHistoryOlderClicked)
+        self.historyPageLabel = QLabel()
+        pageLayout.addWidget(self.historyNewerBtn)
+        pageLayout.addWidget(self.historyPageLabel)
+        pageLayout.addWidget(self.historyOlderBtn)
+        historyLayout.addLayout(pageLayout)
+
+        self.historyDock.setWidget(historyWidget)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.historyDock)
+        self.historyDock.hide()
+
+    def toggleHistoryPanel(self):
+        '''
+        Shows or hides the history panel. The first page is only queried when the panel becomes visible.
+        '''
+        self.initDeferredComponents()
+        if self.historyDock.isVisible():
+            self.historyDock.hide()
+        else:
+            self.historyDock.show()
+            self.resetHistoryPages()
+
+    def resetHistoryPages(self):
+        '''
+        Goes back to the newest page, used when the filters change.
+        '''
+        self.historyPageStarts = [None]
+        self.loadHistoryPage()
+
+    def loadHistoryPage(self):
+        '''
+        Fetches the current page from the store and fills the table with it.
+        Steps aren't fetched here, they're loaded on demand when a row is clicked.
+        '''
+        filters = {
+            'law': self.historyLawFilter.currentData(),
+            'status': self.historyStatusFilter.currentData(),
+            'shape': self.historyShapeFilter.currentData()
+        }
+        # one extra row tells us whether there's an older page without a COUNT(*) query
+        rows = self.store.page(beforeId = self.historyPageStarts[-1], limit = self.historyPageSize + 1, **filters)
+        hasOlder = len(rows) > self.historyPageSize
+        self.historyRows = rows[:self.historyPageSize]
+
+        self.historyTable.setRowCount(len(self.historyRows))
+        for i, row in enumerate(self.historyRows):
+            values = [row['law'], row['status']] + [row[key] for key in ('side_a', 'side_b', 'side_c', 'angle_a', 'angle_b', 'angle_c')]
+            for j, value in enumerate(values):
+                text = f'{value:.2f}' if isinstance(value, float) else (value or '-')
+                self.historyTable.setItem(i, j, QTableWidgetItem(text))
+
+        self.historyNewerBtn.setEnabled(len(self.historyPageStarts) > 1)
+        self.historyOlderBtn.setEnabled(hasOlder)
+        self.historyPageLabel.setText(f'Page {len(self.historyPageStarts)}')
+
+    def onHistoryOlderClicked(self):
+        '''
+        Moves to the next (older) page of the history.
+        '''
+        if self.historyRows:
+            self.historyPageStarts.append(self.historyRows[-1]['id'])
+            self.loadHistoryPage()
+
+    def onHistoryNewerClicked(self):
+        '''
+        Moves back to the previous (newer) page of the history.
+        '''
+        if len(self.historyPageStarts) > 1:
+            self.historyPageStarts.pop()
+            self.loadHistoryPage()
+
+    def onHistoryRowClicked(self, rowIndex, column):
+        '''
+        Shows the stored procedure (or error) of the clicked history row in the info box.
+        '''
+        row = self.historyRows[rowIndex]
+        text = self.store.steps(row['id']) if row['status'] == 'ok' else row['error']
+        self.showProcedure(text or 'Procedure was not stored for this triangle.')
+
+    def closeEvent(self, event):
+        '''
+        Stops a running import or feed and closes the history database before the window goes away.
+        '''
+        self.stopFeed()
+        if self.deferredComponentsReady:
+            if self.importThread is not None:
+                self.importWorker.cancel()
+                self.importThread.quit()
+                self.importThread.wait()
+            self.store.close()
+        super().closeEvent(event)
+
+    def initResultsPanel(self):
+        '''
+        Creates a dock widget with a table of imported and solved triangles.
+        The table is a QTableView over a ResultsTableModel, so it only formats the rows on screen no matter
+        how many are loaded. A progress bar and cancel button are added to the status bar for the import.
+        '''
+        from results import ResultColumns, ResultsTableModel
+
+        self.resultsModel = ResultsTableModel(ResultColumns(), self)
+        self.importThread = None
+
+        self.resultsDock = QDockWidget('Results', self)
+        resultsWidget = QWidget()
+        resultsLayout = QVBoxLayout(resultsWidget)
+
+        filterLayout = QHBoxLayout()
+        self.resultsStatusFilter = QComboBox()
+        self.resultsStatusFilter.addItem('All', None)
+        self.resultsStatusFilter.addItem('Solved', 'ok')
+        self.resultsStatusFilter.addItem('Failed', 'error')
+        self.resultsLawFilter = QComboBox()
+        self.resultsLawFilter.addItem('All laws', None)
+        for law in TrigLaw:
+            self.resultsLawFilter.addItem(law.value, law)
+        for comboBox in (self.resultsStatusFilter, self.resultsLawFilter):
+            comboBox.currentIndexChanged.connect(self.onResultsFilterChanged)
+            filterLayout.addWidget(comboBox)
+        resultsLayout.addLayout(filterLayout)
+
+        self.resultsTable = QTableView()
+        self.resultsTable.setModel(self.resultsModel)
+        self.resultsTable.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder) # unsorted until a header is clicked
+        self.resultsTable.setSortingEnabled(True)
+        self.resultsTable.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.resultsTable.verticalHeader().setDefaultSectionSize(20) # fixed row height, no per row size hints
+        self.resultsTable.clicked.connect(self.onResultRowClicked)
+        resultsLayout.addWidget(self.resultsTable)
+
+        self.resultsDock.setWidget(resultsWidget)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.resultsDock)
+        self.resultsDock.hide()
+
+        self.importProgressBar = QProgressBar()
+        self.importProgressBar.setMaximumWidth(150)
+        self.importCancelBtn = QPushButton('Cancel')
+        self.importCancelBtn.clicked.connect(self.onImportCancelClicked)
+        self.statusBar.addPermanentWidget(self.importProgressBar)
+        self.statusBar.addPermanentWidget(self.importCancelBtn)
+        self.importProgressBar.hide()
+        self.importCancelBtn.hide()
+
+    def onImportClicked(self):
+        '''
+        Asks for a CSV file and imports it.
+        '''
+        self.initDeferredComponents()
+        path, _ = QFileDialog.getOpenFileName(self, 'Import Triangles', '', 'CSV files (*.csv)')
+        if path:
+            self.importFile(path)
+
+    def importFile(self, path, law = TrigLaw.AUTO):
+        '''
+        Starts importing and solving a CSV file on a worker thread.
+        Rows without a law column are solved with the given law.
+        The table stores them in float32 when that's checked in the Import menu.
+        '''
+        from results import ResultColumns, ImportWorker
+
+        self.initDeferredComponents()
+        if self.importThread is not None:
+            self.statusBar.showMessage('An import is already running!', 3000)
+            return
+
+        dtype = 'float32' if self.float32Action.isChecked() else 'float64'
+        self.resultsModel.columns = ResultColumns(dtype=dtype)
+        self.resultsModel.refresh()
+        self.resultsDock.show()
+
+        self.importThread = QThread(self)
+        self.importWorker = ImportWorker(path, law, dtype=dtype)
+        self.importWorker.moveToThread(self.importThread)
+        self.importThread.started.connect(self.importWorker.run)
+        self.importWorker.chunkReady.connect(self.resultsModel.appendChunk) # queued, runs on the GUI thread
+        self.importWorker.progress.connect(self.importProgressBar.setValue)
+        self.importWorker.finished.connect(self.onImportFinished)
+
+        self.importProgressBar.setValue(0)
+        self.importProgressBar.show()
+        self.importCancelBtn.show()
+        self.importThread.start()
+
+    def onImportCancelClicked(self):
+        '''
+        Cancels the running import, the rows solved so far stay in the table.
+        '''
+        if self.importThread is not None:
+            self.importWorker.cancel()
+
+    def onImportFinished(self, message):
+        '''
+        Cleans up the worker thread once the import is done or cancelled.
+        '''
+        self.importThread.quit()
+        self.importThread.wait()
+        self.importThread = None
+        self.importProgressBar.hide()
+        self.importCancelBtn.hide()
+        self.statusBar.showMessage(message, 3000)
+
+    def onFeedClicked(self, checked):
+        '''
+        Asks for a feed to show (a socket, a named pipe or a file) and starts it, or stops the running one.
+        '''
+        if not checked:
+            self.stopFeed()
+            return
+        source, ok = QInputDialog.getText(self, 'Live Feed', 'Unix socket, tcp:host:port, named pipe or file (- for stdin):')
+        if ok and source:
+            self.startFeed(source)
+        else:
+            self.feedAction.setChecked(False)
+
+    def startFeed(self, source, law = TrigLaw.AUTO):
+        '''
+        Starts reading JSON lines of triangles from a source on a worker thread, solved with the given law unless a
+        line has its own. The latest triangle is drawn at up to the refresh rate of the screen, and the counters and
+        rates of the feed are shown in the status bar.
+        '''
+        from feed import FeedWorker, FeedRates
+
+        if self.feedThread is not None:
+            self.statusBar.showMessage('A feed is already running!', 3000)
+            return
+
+        self.feedThread = QThread(self)
+        self.feedWorker = FeedWorker(source, law)
+        self.feedWorker.moveToThread(self.feedThread)
+        self.feedThread.started.connect(self.feedWorker.run)
+        self.feedWorker.finished.connect(self.onFeedFinished)
+        self.feedShown = 0
+        self.feedRates = FeedRates()
+        self.feedStatusTime = 0.0
+
+        refreshRate = QGuiApplication.primaryScreen().refreshRate() or 60
+        self.feedTimer = QTimer(self)
+        self.feedTimer.setTimerType(Qt.PreciseTimer)
+        self.feedTimer.setInterval(max(1, round(1000 / refreshRate)))
+        self.feedTimer.timeout.connect(self.onFeedTick)
+
+        self.feedAction.setChecked(True)
+        self.feedThread.start()
+        self.feedTimer.start()
+
+    def onFeedTick(self):
+        '''
+        Draws the latest triangle of the feed if there's a new one, and refreshes its status twice a second.
+        '''
+        triangle = self.feedWorker.takeLatest()
+        if triangle is not None:
+            self.showTriangle(triangle)
+            self.feedShown += 1
+
+        now = time.perf_counter()
+        if now - self.feedStatusTime >= 0.5:
+            self.feedStatusTime = now
+            self.statusBar.showMessage(self.feedRates.status(self.feedWorker, self.feedShown))
+
+    def stopFeed(self):
+        '''
+        Stops the running feed, if any, and waits for its thread.
+        '''
+        if self.feedThread is not None:
+            self.feedWorker.cancel()
+            self.feedThread.quit()
+            self.feedThread.wait()
+            self.onFeedFinished('Feed stopped')
+
+    def onFeedFinished(self, message):
+        '''
+        Cleans up the worker thread once the feed ends, fails or is stopped, the last triangle stays on screen.
+        '''
+        if self.feedThread is None: # already cleaned up by stopFeed
+            return
+        self.feedTimer.stop()
+        self.onFeedTick() # whatever was solved last
+        self.feedThread.quit()
+        self.feedThread.wait()
+        self.feedThread = None
+        self.feedAction.setChecked(False)
+        self.statusBar.showMessage(f'{message}. {self.feedRates.status(self.feedWorker, self.feedShown)}', 5000)
+
+    def onResultsFilterChanged(self):
+        '''
+        Applies the filters chosen in the results panel.
+        '''
+        self.resultsModel.setFilters(self.resultsStatusFilter.currentData(), self.resultsLawFilter.currentData())
+
+    def onResultRowClicked(self, index):
+        '''
+        Solves the clicked row again with its procedure and shows it like a regular calculation.
+        The table doesn't keep procedures, recomputing one row is cheaper than storing millions of them.
+        '''
+        from spherical import SphericalTriangle
+
+        inputs, law = self.resultsModel.rowAt(index.row())
+        if law in SPHERICAL_LAWS:
+            self.showTriangle(SphericalTriangle(law=law, **inputs))
+        else:
+            self.showTriangle(Triangle(law=law, **inputs))
+
+    def showTriangle(self, triangle):
+        '''
+        Shows an already solved triangle (e.g. a row of a table or MeshBatch.triangle) like a regular calculation,
+        or its error in the status bar.
+        '''
+        self.triangle = triangle
+        if self.triangle.errorMessage:
+            self.statusBar.showMessage(self.triangle.errorMessage, 3000)
+            return
+
+        self.updateInfoBox()
+        self.drawTriangle(self.triangle)
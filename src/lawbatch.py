@@ -0,0 +1,107 @@
+import numpy as np
+from planner import LawPlanner, SIDES, ANGLES
+from lazy import LAW_STEPS
+from trig import TrigLaw, SPHERICAL_LAWS
+
+QUANTITIES = SIDES + ANGLES
+
+# array versions of the Trigonometry operations, keyed by the string helper of the PlanStep that does them
+# (the helper's arguments name the quantities the same way for both), v is a dict of arrays, angles in radians
+KERNELS = {
+    'triangleSumTheoremString': lambda v, X, Y, Z: np.pi - (v[X] + v[Y]),
+    'cosineLawSideString': lambda v, x, y, Z, z: np.sqrt(v[x]**2 + v[y]**2 - 2 * v[x] * v[y] * np.cos(v[Z])),
+    'cosineLawAngleString': lambda v, x, y, z, Z: np.arccos((v[x]**2 + v[y]**2 - v[z]**2) / (2 * v[x] * v[y])),
+    'sineLawSideString': lambda v, x, X, W, w: v[x] * np.sin(v[W]) / np.sin(v[X]),
+    'sineLawAngleString': lambda v, x, X, w, W: np.arcsin(v[w] * np.sin(v[X]) / v[x]),
+    'pythagorasTheoremPlusString': lambda v, o, a, h: np.sqrt(v[o]**2 + v[a]**2),
+    'pythagorasTheoremMinusString': lambda v, h, a, o: np.sqrt(v[h]**2 - v[a]**2),
+    'sohSideOString': lambda v, h, o, angle: v[h] * np.sin(v[angle]),
+    'sohSideHString': lambda v, o, h, angle: v[o] / np.sin(v[angle]),
+    'sohAngleString': lambda v, o, h, angle: np.arcsin(v[o] / v[h]),
+    'cahSideAString': lambda v, h, a, angle: v[h] * np.cos(v[angle]),
+    'cahSideHString': lambda v, a, h, angle: v[a] / np.cos(v[angle]),
+    'cahAngleString': lambda v, a, h, angle: np.arccos(v[a] / v[h]),
+    'toaSideOString': lambda v, a, o, angle: v[a] * np.tan(v[angle]),
+    'toaSideAString': lambda v, o, a, angle: v[o] / np.tan(v[angle]),
+    'toaAngleString': lambda v, o, a, angle: np.arctan(v[o] / v[a])
+}
+
+class LawBatch:
+    '''
+    Class that solves planar triangles given by three sides/angles in bulk with numpy, in float64 or float32.
+    Rows are grouped by which quantities they know (and whether A is 90 degrees), and every group goes through the
+    same steps a LazyTriangle of that pattern would take, each done on the whole group at once.
+    float32 halves the memory and bandwidth of the columns at about 1e-7 relative rounding, but the asin/acos
+    steps amplify it near ±1, run precision.py to see what that costs for each law and given case.
+    Rows with more or less than three givens, or only angles, aren't solved here (Triangle fits those).
+    '''
+    @staticmethod
+    def derivations(known, rightAngleA, law):
+        '''
+        Returns the PlanStep for every unknown quantity of a pattern under a law, or None if it can't be solved.
+        Raises ValueError for the spherical laws, only planar triangles are solved here.
+        '''
+        if law in SPHERICAL_LAWS:
+            raise ValueError(f'{law.value} is a spherical law, LawBatch only solves planar triangles')
+        if len(known) != 3 or not known & set(SIDES):
+            return None
+        derivations = LawPlanner.derivations(frozenset(known), rightAngleA, LAW_STEPS[law])
+        if not all(quantity in known or quantity in derivations for quantity in QUANTITIES):
+            return None
+        return derivations
+
+    @staticmethod
+    def evaluate(values, derivations, quantity, kernels = KERNELS):
+        '''
+        Calculates a quantity of a group (and whatever it needs first) into values, a dict of arrays
+        (or of whatever other kernels, like adaptive.DECIMAL_KERNELS, work on).
+        '''
+        if quantity not in values:
+            step = derivations[quantity]
+            for name in step.inputs:
+                LawBatch.evaluate(values, derivations, name, kernels)
+            values[quantity] = kernels[step.stringMethod](values, *step.stringArgs)
+        return values[quantity]
+
+    @staticmethod
+    def solve(columns, law = TrigLaw.AUTO, dtype = np.float64):
+        '''
+        Solves arrays of rows, columns is a dict of 'a', 'b', 'c', 'A', 'B', 'C' -> array (or scalar), angles in
+        degrees, NaN (or missing) where a row doesn't have it.
+        Returns a dict of the six quantities as arrays of dtype (angles in degrees, NaN where not solved)
+        and 'solved', a bool mask of the rows that made a valid triangle.
+        '''
+        rows = max((np.size(value) for value in columns.values()), default=0)
+        values = {}
+        for quantity in QUANTITIES:
+            value = np.asarray(columns.get(quantity, np.nan), dtype=dtype)
+            values[quantity] = np.broadcast_to(np.radians(value) if quantity in ANGLES else value, (rows,))
+
+        knownColumns = np.stack([~np.isnan(values[quantity]) for quantity in QUANTITIES], axis=1)
+        rightAngleA = np.isclose(values['A'], np.pi / 2, rtol=0, atol=np.finfo(dtype).eps) # same test as Triangle, at this precision
+        patterns = knownColumns @ (1 << np.arange(6)) + (rightAngleA << 6)
+
+        results = {quantity: np.full(rows, np.nan, dtype=dtype) for quantity in QUANTITIES}
+        for pattern in np.unique(patterns):
+            known = frozenset(quantity for i, quantity in enumerate(QUANTITIES) if pattern & (1 << i))
+            derivations = LawBatch.derivations(known, bool(pattern & (1 << 6)), law)
+            if derivations is None:
+                continue
+
+            indices = np.flatnonzero(patterns == pattern)
+            group = {quantity: values[quantity][indices] for quantity in known}
+            with np.errstate(invalid='ignore', divide='ignore'): # impossible rows end up NaN
+                for quantity in QUANTITIES:
+                    results[quantity][indices] = LawBatch.evaluate(group, derivations, quantity)
+
+        with np.errstate(invalid='ignore'):
+            angles = np.stack([results[quantity] for quantity in ANGLES])
+            solved = ~np.isnan(np.stack(list(results.values()))).any(axis=0) & (angles > 0).all(axis=0)
+            solved &= angles.sum(axis=0) <= np.pi + np.sqrt(np.finfo(dtype).eps) # asin/acos near ±1 round to about sqrt(eps)
+
+        for quantity in QUANTITIES:
+            results[quantity][~solved] = np.nan
+            if quantity in ANGLES:
+                results[quantity] = np.degrees(results[quantity])
+        results['solved'] = solved
+        return results
@@ -0,0 +1,91 @@
+import math
+from triangle import Triangle
+from planner import LawPlanner
+from trig import TrigLaw, TrigCache, SPHERICAL_LAWS
+
+# which steps each law may use when a quantity is derived on demand, None means all of them (Auto)
+LAW_STEPS = {
+    TrigLaw.SOH: frozenset(('SOH', 'Pythagoras', 'Triangle Sum')),
+    TrigLaw.CAH: frozenset(('CAH', 'Pythagoras', 'Triangle Sum')),
+    TrigLaw.TOA: frozenset(('TOA', 'Pythagoras', 'Triangle Sum')),
+    TrigLaw.SINE_LAW: frozenset(('Sine Law', 'Triangle Sum')),
+    TrigLaw.COSINE_LAW: frozenset(('Cosine Law', 'Triangle Sum')),
+    TrigLaw.AUTO: None
+}
+
+class LazyTriangle(Triangle):
+    '''
+    Class that represents a triangle whose unknown sides and angles are only calculated when they're accessed.
+    Accessing a quantity walks back through the cheapest chain of steps that leads to it from the known ones,
+    calculates only those and caches them, e.g. c of an SAS triangle is a single cosine law call.
+    The procedure strings are only built when lawsUsed is read, using the Triangle string helpers.
+    '''
+    def __init__(self, a=None, b=None, c=None, A=None, B=None, C=None, law=TrigLaw.AUTO):
+        '''
+        Initializes the triangle with the given sides and angles (angles in degrees), nothing is solved yet.
+        Raises ValueError for the spherical laws, SphericalTriangle solves those.
+        '''
+        if law in SPHERICAL_LAWS:
+            raise ValueError(f'{law.value} is a spherical law, LazyTriangle only solves planar triangles')
+        self.errorMessage = None
+        self.cache = TrigCache()
+        self.values = {'a': a, 'b': b, 'c': c}
+        self.values.update({key: math.radians(value) for key, value in (('A', A), ('B', B), ('C', C)) if value is not None})
+        self.values = {key: value for key, value in self.values.items() if value is not None}
+        self.stepsUsed = [] # steps in the order they were calculated
+
+        rightAngleA = 'A' in self.values and math.isclose(self.values['A'], math.pi/2)
+        self.derivations = LawPlanner.derivations(frozenset(self.values), rightAngleA, LAW_STEPS[law])
+
+    def value(self, quantity):
+        '''
+        Returns a quantity, calculating it (and whatever it needs) the first time it's asked for.
+        Returns None and sets the error message if it can't be calculated.
+        '''
+        if quantity in self.values:
+            return self.values[quantity]
+
+        step = self.derivations.get(quantity)
+        if step is None:
+            self.errorMessage = 'Cannot calculate, use other law!'
+            return None
+
+        inputs = {name: self.value(name) for name in step.inputs}
+        if any(value is None for value in inputs.values()):
+            return None
+
+        try:
+            result = step.solve(inputs, self.cache)
+        except (ValueError, ZeroDivisionError):
+            self.errorMessage = 'Not correct dimensions for a triangle!'
+            return None
+
+        if quantity.isupper() and result <= 0:
+            self.errorMessage = 'Angles can\'t add up to more than 180 degrees!'
+            return None
+
+        self.values[quantity] = result
+        self.stepsUsed.append(step)
+        return result
+
+    a = property(lambda self: self.value('a'))
+    b = property(lambda self: self.value('b'))
+    c = property(lambda self: self.value('c'))
+    A = property(lambda self: self.value('A'))
+    B = property(lambda self: self.value('B'))
+    C = property(lambda self: self.value('C'))
+
+    @property
+    def lawsUsed(self):
+        '''
+        Returns the procedure of the quantities calculated so far.
+        '''
+        return [getattr(self, step.stringMethod)(*step.stringArgs) for step in self.stepsUsed]
+
+    def solveAll(self):
+        '''
+        Calculates every quantity, after which the triangle is equivalent to a fully solved Triangle.
+        '''
+        for quantity in ('a', 'b', 'c', 'A', 'B', 'C'):
+            self.value(quantity)
+        return self.errorMessage is None
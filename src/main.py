@@ -1,15 +1,25 @@
+import argparse
 import sys
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QApplication
 from gui import TrigMainWindow
 
 def main():
     '''
     Main function to run the program.
-    It creates an instance of the TrigMainWindow class and displays it.
+    It creates an instance of the TrigMainWindow class and displays it, showing a live feed if one is given.
     '''
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description='Trigonometry Visual Calculator')
+    parser.add_argument('--feed', help='show the triangles of a live feed: Unix socket, tcp:host:port, named pipe, file or - for stdin')
+    args, qtArgs = parser.parse_known_args() # the rest is for Qt
+
+    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling) # scale by the device pixel ratio on HiDPI screens
+    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
+    app = QApplication(sys.argv[:1] + qtArgs)
     gui = TrigMainWindow()
     gui.show()    
+    if args.feed:
+        gui.startFeed(args.feed)
     sys.exit(app.exec_()) # for clean exit
 
-main()
\ No newline at end of file
+main()
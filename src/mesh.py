@@ -0,0 +1,109 @@
+import numpy as np
+from triangle import Triangle
+from trig import TrigLaw
+
+MESH_KEYS = ('a', 'b', 'c', 'A', 'B', 'C', 'area', 'minAngle', 'aspectRatio')
+
+class MeshBatch:
+    '''
+    Class to evaluate planar triangles in bulk from their vertex coordinates, the inverse of Triangle.calculateVertices.
+    Vertices can be 2D or 3D. Angles use atan2 of the cross and dot products of the edges, which stays accurate for
+    very thin triangles where the cosine law loses all its digits.
+    Besides the sides, angles and area it computes two quality metrics:
+    - minAngle, the smallest angle in degrees (60 for an equilateral triangle, 0 for a degenerate one)
+    - aspectRatio, the circumradius over twice the inradius (1 for an equilateral triangle, inf for a degenerate one)
+    '''
+    @staticmethod
+    def solve(pointA, pointB, pointC):
+        '''
+        Solves arrays of triangles given by their vertices, each an (N, 2) or (N, 3) array.
+        Returns a dict of arrays: sides a, b, c, angles A, B, C in degrees, area, minAngle and aspectRatio.
+        Side a is opposite to vertex A like everywhere else in the app.
+        '''
+        pointA, pointB, pointC = (np.asarray(point, dtype=np.float64) for point in (pointA, pointB, pointC))
+        edgeAB, edgeBC, edgeCA = pointB - pointA, pointC - pointB, pointA - pointC
+
+        a = np.linalg.norm(edgeBC, axis=1)
+        b = np.linalg.norm(edgeCA, axis=1)
+        c = np.linalg.norm(edgeAB, axis=1)
+
+        crossArea = MeshBatch.crossNorm(edgeAB, -edgeCA) # twice the area, the same for every pair of edges
+        A = np.arctan2(crossArea, np.einsum('ij,ij->i', edgeAB, -edgeCA))
+        B = np.arctan2(crossArea, np.einsum('ij,ij->i', edgeBC, -edgeAB))
+        C = np.pi - A - B
+
+        area = crossArea / 2
+        s = (a + b + c) / 2
+        with np.errstate(divide='ignore', invalid='ignore'): # degenerate rows get inf (or NaN if all points coincide)
+            aspectRatio = a * b * c / (8 * (s - a) * (s - b) * (s - c)) # R / 2r
+
+        angles = np.degrees(np.stack([A, B, C]))
+        return {
+            'a': a, 'b': b, 'c': c,
+            'A': angles[0], 'B': angles[1], 'C': angles[2],
+            'area': area, 'minAngle': angles.min(axis=0), 'aspectRatio': aspectRatio
+        }
+
+    @staticmethod
+    def crossNorm(u, v):
+        '''
+        Returns the norms of the cross products of two arrays of 2D or 3D vectors.
+        '''
+        if u.shape[1] == 2:
+            return np.abs(u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0])
+        return np.linalg.norm(np.cross(u, v), axis=1)
+
+    @staticmethod
+    def solveChunks(chunks):
+        '''
+        Solves an iterable of (N, 3, D) vertex array chunks one after the other, e.g. read from a memory mapped file,
+        so meshes bigger than memory can be streamed through. Yields one result dict per chunk.
+        '''
+        for chunk in chunks:
+            chunk = np.asarray(chunk, dtype=np.float64)
+            yield MeshBatch.solve(chunk[:, 0], chunk[:, 1], chunk[:, 2])
+
+    @staticmethod
+    def solveArray(vertices, chunkSize = 1_000_000):
+        '''
+        Solves an (N, 3, D) array of vertex triplets, chunkSize rows at a time to bound the temporary memory.
+        Returns a dict of arrays like solve.
+        '''
+        vertices = np.asarray(vertices)
+        results = {key: np.empty(len(vertices)) for key in MESH_KEYS}
+
+        for start in range(0, len(vertices), chunkSize):
+            chunk = np.asarray(vertices[start:start + chunkSize], dtype=np.float64)
+            result = MeshBatch.solve(chunk[:, 0], chunk[:, 1], chunk[:, 2])
+            for key, values in result.items():
+                results[key][start:start + chunkSize] = values
+
+        return results
+
+    @staticmethod
+    def solveIndexed(points, faces, chunkSize = 1_000_000):
+        '''
+        Solves an indexed mesh: points is a (P, D) array of coordinates and faces an (N, 3) array of point indices,
+        like most mesh formats store them. Faces are gathered chunkSize at a time so the (N, 3, D) array is never
+        built in full. Returns a dict of arrays like solve.
+        '''
+        points = np.asarray(points, dtype=np.float64)
+        faces = np.asarray(faces)
+        results = {key: np.empty(len(faces)) for key in MESH_KEYS}
+
+        for start in range(0, len(faces), chunkSize):
+            chunk = faces[start:start + chunkSize]
+            result = MeshBatch.solve(points[chunk[:, 0]], points[chunk[:, 1]], points[chunk[:, 2]])
+            for key, values in result.items():
+                results[key][start:start + chunkSize] = values
+
+        return results
+
+    @staticmethod
+    def triangle(results, index):
+        '''
+        Returns a Triangle solved from the sides of one row of a result dict, to inspect it with its procedure
+        (e.g. with TrigMainWindow.showTriangle). It goes through the cosine law like a triangle typed in by hand.
+        '''
+        return Triangle(a=float(results['a'][index]), b=float(results['b'][index]), c=float(results['c'][index]),
+                        law=TrigLaw.COSINE_LAW)
@@ -0,0 +1,263 @@
+import argparse
+import csv
+import io
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from solver import solveChunk
+from trig import TrigLaw
+from watcher import OUTPUT_SUFFIX, SOLVED_COLUMNS
+
+INPUT_KEYS = ('a', 'b', 'c', 'A', 'B', 'C')
+END = None # put on a queue after the last chunk
+
+def solveRows(rows, law = TrigLaw.AUTO):
+    '''
+    Solves a chunk of rows (None for a malformed row) and returns the results (None for the malformed rows)
+    with the seconds it took. This is what the solver stage runs, in a pool process when it has one.
+    '''
+    start = time.perf_counter()
+    results = iter(solveChunk([row for row in rows if row is not None], law))
+    return [None if row is None else next(results) for row in rows], time.perf_counter() - start
+
+class StageStats:
+    '''
+    Class that keeps where the time of a pipeline stage went: working, waiting for its input (the stage before it
+    is slower) and waiting for room in its output queue (a stage after it is slower).
+    '''
+    def __init__(self, name):
+        self.name = name
+        self.chunks = 0
+        self.busy = 0.0
+        self.waitingIn = 0.0
+        self.waitingOut = 0.0
+
+    def line(self, elapsed):
+        share = lambda seconds: f'{100 * seconds / max(elapsed, 1e-9):5.1f}%'
+        return f'{self.name:<8}{self.chunks:>8}{share(self.busy):>10}{share(self.waitingIn):>10}{share(self.waitingOut):>10}'
+
+class BatchPipeline:
+    '''
+    Class that solves a CSV file of triangles in four stages on threads connected by bounded queues:
+    the reader reads chunks of lines, the parser turns them into rows, the solver solves them (through Triangle) and
+    the writer formats and writes the results next to the input as <name>.solved.csv (the same format as watcher.py).
+    So the disk works while the CPU solves, and a full queue blocks the stage that feeds it, which bounds memory
+    to about queueSize chunks per queue however big the file is.
+    With processes the solver stage hands the chunks to a process pool and passes their futures on, the writer
+    waits for them in order, so up to queueSize + 1 chunks are solved at once and the output keeps the input order.
+    The stats show the share of the time every stage worked or waited, the stage that works most is the bottleneck.
+    '''
+    def __init__(self, inputPath, outputPath = None, law = TrigLaw.AUTO, chunkSize = 2000, queueSize = 4, processes = 0):
+        self.inputPath = inputPath
+        self.outputPath = outputPath or (inputPath[:-len('.csv')] if inputPath.endswith('.csv') else inputPath) + OUTPUT_SUFFIX
+        self.law = law
+        self.chunkSize = chunkSize
+        self.queueSize = queueSize
+        self.processes = processes
+        self.stats = [StageStats(name) for name in ('reader', 'parser', 'solver', 'writer')]
+        self.solveTime = 0.0 # seconds spent solving, summed over the pool processes
+        self.rows = 0
+        self.elapsed = 0.0
+        self.error = None
+
+    def read(self, file):
+        '''
+        Reads the next chunk of lines, END at the end of the file.
+        '''
+        lines = list(itertools.islice(file, self.chunkSize))
+        return lines or END
+
+    def parse(self, lines):
+        '''
+        Parses a chunk of lines into (records, rows): the CSV values (written back with the results) and the row
+        dicts to solve, None for a row with an invalid value.
+        '''
+        records = [values + [''] * (len(self.header) - len(values)) for values in csv.reader(lines) if any(value.strip() for value in values)]
+        rows = []
+        for values in records:
+            fields = dict(zip(self.header, values))
+            try:
+                row = {key: float(value) for key, value in fields.items() if key in INPUT_KEYS and value.strip()}
+                if fields.get('law', '').strip():
+                    row['law'] = TrigLaw(fields['law'].strip()).value
+                rows.append(row)
+            except ValueError:
+                rows.append(None)
+        return records, rows
+
+    def solve(self, chunk):
+        '''
+        Solves a parsed chunk, or sends it to the pool. Returns (records, results and seconds or a future of them).
+        '''
+        records, rows = chunk
+        if self.executor is not None:
+            return records, self.executor.submit(solveRows, rows, self.law)
+        return records, solveRows(rows, self.law)
+
+    def write(self, chunk, output):
+        '''
+        Formats a solved chunk and writes it, waiting for its solve first if it's in the pool.
+        The wait counts as waiting for input, the writer can't do anything else meanwhile.
+        '''
+        records, solved = chunk
+        if isinstance(solved, Future):
+            start = time.perf_counter()
+            solved = solved.result()
+            waited = time.perf_counter() - start
+            self.stats[3].waitingIn += waited
+            self.stats[3].busy -= waited # the stage adds the whole call to busy
+        results, seconds = solved
+        self.solveTime += seconds
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        for values, result in zip(records, results):
+            if result is None:
+                writer.writerow(values + [''] * 6 + ['Invalid value in row!'])
+            else:
+                writer.writerow(values + ['' if value is None else repr(value) for value in result[:6]] + [result.error or ''])
+        output.write(buffer.getvalue())
+        self.rows += len(records)
+
+    def readStage(self, file, outbox):
+        '''
+        Runs the reader: reads chunks of lines and puts them in outbox until the end of the file (or an error).
+        '''
+        stats = self.stats[0]
+        while self.error is None:
+            start = time.perf_counter()
+            try:
+                lines = self.read(file)
+            except Exception as e: # reported by run
+                self.error = e
+                break
+            read = time.perf_counter()
+            stats.busy += read - start
+            if lines is END:
+                break
+            stats.chunks += 1
+            outbox.put(lines)
+            stats.waitingOut += time.perf_counter() - read
+        outbox.put(END)
+
+    def stage(self, stats, work, inbox, outbox = None):
+        '''
+        Runs a stage: takes chunks from inbox, works on them and puts the results in outbox (if it has one) until
+        END. After an error anywhere it keeps taking (and dropping) chunks, so the stages before it don't block forever.
+        '''
+        while True:
+            start = time.perf_counter()
+            chunk = inbox.get()
+            taken = time.perf_counter()
+            stats.waitingIn += taken - start
+            if chunk is END:
+                break
+            if self.error is not None:
+                continue
+
+            try:
+                result = work(chunk)
+            except Exception as e: # reported by run
+                self.error = self.error or e
+                continue
+            done = time.perf_counter()
+            stats.busy += done - taken
+            stats.chunks += 1
+            if outbox is not None:
+                outbox.put(result)
+                stats.waitingOut += time.perf_counter() - done
+
+        if outbox is not None:
+            outbox.put(END)
+
+    def run(self):
+        '''
+        Solves the file through the pipeline and returns the number of rows written.
+        '''
+        start = time.perf_counter()
+        self.executor = ProcessPoolExecutor(self.processes) if self.processes else None
+        try:
+            with open(self.inputPath, newline='') as inputFile, open(self.outputPath, 'w', newline='') as outputFile:
+                self.header = next(csv.reader([inputFile.readline()]), [])
+                csv.writer(outputFile, lineterminator='\n').writerow(self.header + SOLVED_COLUMNS)
+
+                read, parsed, solved = (queue.Queue(self.queueSize) for _ in range(3))
+                threads = [
+                    threading.Thread(target=self.readStage, args=(inputFile, read), name='reader'),
+                    threading.Thread(target=self.stage, args=(self.stats[1], self.parse, read, parsed), name='parser'),
+                    threading.Thread(target=self.stage, args=(self.stats[2], self.solve, parsed, solved), name='solver'),
+                    threading.Thread(target=self.stage, args=(self.stats[3], lambda chunk: self.write(chunk, outputFile), solved), name='writer')
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+        self.elapsed = time.perf_counter() - start
+        if self.error is not None:
+            raise self.error
+        return self.rows
+
+    def runSequential(self):
+        '''
+        Solves the file with the same stages one after another, to compare against.
+        '''
+        start = time.perf_counter()
+        self.executor = None
+        with open(self.inputPath, newline='') as inputFile, open(self.outputPath, 'w', newline='') as outputFile:
+            self.header = next(csv.reader([inputFile.readline()]), [])
+            csv.writer(outputFile, lineterminator='\n').writerow(self.header + SOLVED_COLUMNS)
+            while True:
+                times = [time.perf_counter()]
+                lines = self.read(inputFile)
+                times.append(time.perf_counter())
+                if lines is END:
+                    break
+                chunk = self.parse(lines)
+                times.append(time.perf_counter())
+                chunk = self.solve(chunk)
+                times.append(time.perf_counter())
+                self.write(chunk, outputFile)
+                times.append(time.perf_counter())
+                for stats, begin, end in zip(self.stats, times, times[1:]):
+                    stats.busy += end - begin
+                    stats.chunks += 1
+        self.elapsed = time.perf_counter() - start
+        return self.rows
+
+    def report(self):
+        '''
+        Returns the throughput and a table of where every stage spent its time.
+        '''
+        lines = [f'{self.rows} rows in {self.elapsed:.2f}s ({self.rows / max(self.elapsed, 1e-9):.0f} rows/s), '
+                 f'solving took {self.solveTime:.2f}s' + (f' over {self.processes} processes' if self.processes else ''),
+                 f'{"stage":<8}{"chunks":>8}{"busy":>10}{"wait in":>10}{"wait out":>10}']
+        lines += [stats.line(self.elapsed) for stats in self.stats]
+        bottleneck = max(self.stats, key=lambda stats: stats.busy)
+        lines.append(f'bottleneck: {bottleneck.name}')
+        return '\n'.join(lines)
+
+def main():
+    '''
+    Command line entry point, solves a CSV file through the pipeline and prints the stage stats.
+    '''
+    parser = argparse.ArgumentParser(description='Solve a CSV file of triangles with reading, parsing, solving and writing overlapped.')
+    parser.add_argument('path')
+    parser.add_argument('--output', default=None, help='output CSV, <name>.solved.csv next to the input by default')
+    parser.add_argument('--law', default=TrigLaw.AUTO.value, help='law used for rows without a law column')
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    parser.add_argument('--queue-size', type=int, default=4, help='chunks every queue holds before the stage feeding it blocks')
+    parser.add_argument('--processes', type=int, default=0, help='solve on a pool of this many processes, on the solver thread if 0')
+    parser.add_argument('--sequential', action='store_true', help='run the stages one after another instead')
+    args = parser.parse_args()
+
+    pipeline = BatchPipeline(args.path, args.output, TrigLaw(args.law), args.chunk_size, args.queue_size, args.processes)
+    pipeline.runSequential() if args.sequential else pipeline.run()
+    print(pipeline.report())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+import heapq
+import math
+from collections import namedtuple
+from functools import lru_cache
+from trig import Trigonometry
+
+# a step of a plan: target is the quantity it calculates, solve takes the current values (dict) and a TrigCache and returns it,
+# stringMethod/stringArgs name the Triangle helper that renders the step in the GUI
+PlanStep = namedtuple('PlanStep', ['target', 'inputs', 'cost', 'law', 'solve', 'stringMethod', 'stringArgs'])
+
+SIDES = ('a', 'b', 'c')
+ANGLES = ('A', 'B', 'C')
+
+# relative cost of each kind of operation, forward trig calls and sqrt are cheap and well conditioned
+# acos/asin lose precision near ±1 (and asin always picks the acute branch), so they carry a conditioning penalty
+# atan is well conditioned everywhere, which is why TOA beats SOH/CAH for the angles of right triangles
+COSTS = {
+    'sum': 1,
+    'sqrt': 2,
+    'forward': 2,
+    'sineSide': 3,
+    'cosineSide': 4,
+    'atan': 3,
+    'acos': 3 + 2,
+    'asin': 3 + 4
+}
+
+class LawPlanner:
+    '''
+    Class that plans the cheapest, best conditioned sequence of trigonometry operations to solve a triangle.
+    It mixes operations of all the laws and only depends on which quantities are known (and whether A is 90 degrees),
+    so plans are cached per known-quantity pattern and planning a new triangle is a table lookup.
+    '''
+    @staticmethod
+    def rules(rightAngleA):
+        '''
+        Returns every operation that can calculate one quantity from others.
+        SOH/CAH/TOA operations are only available when A is 90 degrees, like in the rest of the app.
+        '''
+        rules = []
+
+        for i in range(3):
+            x, y, z = SIDES[i], SIDES[(i+1) % 3], SIDES[(i+2) % 3]
+            X, Y, Z = ANGLES[i], ANGLES[(i+1) % 3], ANGLES[(i+2) % 3]
+
+            rules.append(PlanStep(Z, (X, Y), COSTS['sum'], 'Triangle Sum',
+                                  lambda v, cache, X=X, Y=Y: Trigonometry.triangleSumTheorem(A=v[X], B=v[Y]),
+                                  'triangleSumTheoremString', (X, Y, Z)))
+            rules.append(PlanStep(z, (x, y, Z), COSTS['cosineSide'], 'Cosine Law',
+                                  lambda v, cache, x=x, y=y, Z=Z: Trigonometry.cosine(a=v[x], b=v[y], C=v[Z], cache=cache),
+                                  'cosineLawSideString', (x, y, Z, z)))
+            rules.append(PlanStep(Z, (x, y, z), COSTS['acos'], 'Cosine Law',
+                                  lambda v, cache, x=x, y=y, z=z: Trigonometry.cosine(a=v[x], b=v[y], c=v[z], cache=cache),
+                                  'cosineLawAngleString', (x, y, z, Z)))
+
+            for j in range(3): # sine law between any two side/angle pairs
+                if i == j:
+                    continue
+                w, W = SIDES[j], ANGLES[j]
+                rules.append(PlanStep(w, (x, X, W), COSTS['sineSide'], 'Sine Law',
+                                      lambda v, cache, x=x, X=X, W=W: Trigonometry.sine(a=v[x], A=v[X], B=v[W], cache=cache),
+                                      'sineLawSideString', (x, X, W, w)))
+                rules.append(PlanStep(W, (x, X, w), COSTS['asin'], 'Sine Law',
+                                      lambda v, cache, x=x, X=X, w=w: Trigonometry.sine(a=v[x], A=v[X], b=v[w], cache=cache),
+                                      'sineLawAngleString', (x, X, w, W)))
+
+        if not rightAngleA:
+            return rules
+
+        rules.append(PlanStep('a', ('b', 'c'), COSTS['sqrt'], 'Pythagoras',
+                              lambda v, cache: Trigonometry.pythagorasTheorem(o=v['b'], a=v['c'], cache=cache),
+                              'pythagorasTheoremPlusString', ('b', 'c', 'a')))
+
+        for opposite, adjacent, angle in (('b', 'c', 'B'), ('c', 'b', 'C')): # a is always the hypotenuse
+            rules.append(PlanStep(opposite, ('a', adjacent), COSTS['sqrt'], 'Pythagoras',
+                                  lambda v, cache, adjacent=adjacent: Trigonometry.pythagorasTheorem(h=v['a'], o=v[adjacent], cache=cache),
+                                  'pythagorasTheoremMinusString', ('a', adjacent, opposite)))
+
+            rules.append(PlanStep(opposite, ('a', angle), COSTS['forward'], 'SOH',
+                                  lambda v, cache, angle=angle: Trigonometry.soh(h=v['a'], theta=v[angle], cache=cache),
+                                  'sohSideOString', ('a', opposite, angle)))
+            rules.append(PlanStep('a', (opposite, angle), COSTS['forward'], 'SOH',
+                                  lambda v, cache, opposite=opposite, angle=angle: Trigonometry.soh(o=v[opposite], theta=v[angle], cache=cache),
+                                  'sohSideHString', (opposite, 'a', angle)))
+            rules.append(PlanStep(angle, (opposite, 'a'), COSTS['asin'], 'SOH',
+                                  lambda v, cache, opposite=opposite: Trigonometry.soh(o=v[opposite], h=v['a'], cache=cache),
+                                  'sohAngleString', (opposite, 'a', angle)))
+
+            rules.append(PlanStep(adjacent, ('a', angle), COSTS['forward'], 'CAH',
+                                  lambda v, cache, angle=angle: Trigonometry.cah(h=v['a'], theta=v[angle], cache=cache),
+                                  'cahSideAString', ('a', adjacent, angle)))
+            rules.append(PlanStep('a', (adjacent, angle), COSTS['forward'], 'CAH',
+                                  lambda v, cache, adjacent=adjacent, angle=angle: Trigonometry.cah(a=v[adjacent], theta=v[angle], cache=cache),
+                                  'cahSideHString', (adjacent, 'a', angle)))
+            rules.append(PlanStep(angle, (adjacent, 'a'), COSTS['acos'], 'CAH',
+                                  lambda v, cache, adjacent=adjacent: Trigonometry.cah(a=v[adjacent], h=v['a'], cache=cache),
+                                  'cahAngleString', (adjacent, 'a', angle)))
+
+            rules.append(PlanStep(opposite, (adjacent, angle), COSTS['forward'], 'TOA',
+                                  lambda v, cache, adjacent=adjacent, angle=angle: Trigonometry.toa(a=v[adjacent], theta=v[angle]),
+                                  'toaSideOString', (adjacent, opposite, angle)))
+            rules.append(PlanStep(adjacent, (opposite, angle), COSTS['forward'], 'TOA',
+                                  lambda v, cache, opposite=opposite, angle=angle: Trigonometry.toa(o=v[opposite], theta=v[angle]),
+                                  'toaSideAString', (opposite, adjacent, angle)))
+            rules.append(PlanStep(angle, (opposite, adjacent), COSTS['atan'], 'TOA',
+                                  lambda v, cache, opposite=opposite, adjacent=adjacent: Trigonometry.toa(o=v[opposite], a=v[adjacent]),
+                                  'toaAngleString', (opposite, adjacent, angle)))
+
+        return rules
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def plan(known, rightAngleA = False):
+        '''
+        Returns the cheapest tuple of PlanSteps that calculates every unknown quantity from the known ones,
+        or None if the known quantities can't be solved.
+        known is a frozenset of quantity names ('a', 'b', 'c', 'A', 'B', 'C').
+        There are only 64 possible sets of known quantities, so a Dijkstra search over them is instant and the
+        result is cached, which makes every later plan for the same pattern a dictionary lookup.
+        '''
+        rules = LawPlanner.rules(rightAngleA)
+        goal = frozenset(SIDES + ANGLES)
+        start = frozenset(known)
+
+        queue = [(0, 0, start, ())]
+        visited = set()
+        counter = 0 # tie breaker so the heap never compares sets
+
+        while queue:
+            cost, _, state, steps = heapq.heappop(queue)
+            if state == goal:
+                return steps
+            if state in visited:
+                continue
+            visited.add(state)
+
+            for rule in rules:
+                if rule.target not in state and all(quantity in state for quantity in rule.inputs):
+                    counter += 1
+                    heapq.heappush(queue, (cost + rule.cost, counter, state | {rule.target}, steps + (rule,)))
+
+        return None
+
+    @staticmethod
+    def planFor(values):
+        '''
+        Returns the plan for a dict of values where unknown quantities are None (angles in radians).
+        '''
+        known = frozenset(key for key, value in values.items() if value is not None)
+        rightAngleA = values.get('A') is not None and math.isclose(values['A'], math.pi/2)
+        return LawPlanner.plan(known, rightAngleA)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def derivations(known, rightAngleA = False, laws = None):
+        '''
+        Returns a dict that maps every quantity that can be calculated to the cheapest PlanStep calculating it,
+        counting the cost of deriving its inputs too. It's what lazy evaluation walks back through when a single
+        quantity is asked for. laws optionally restricts the steps to a frozenset of law names.
+        Cached per known-quantity pattern like plan.
+        '''
+        rules = [rule for rule in LawPlanner.rules(rightAngleA) if laws is None or rule.law in laws]
+        costs = {quantity: 0 for quantity in known}
+        best = {}
+
+        changed = True
+        while changed: # relax until no quantity gets cheaper, there are only six of them
+            changed = False
+            for rule in rules:
+                if rule.target in known or not all(quantity in costs for quantity in rule.inputs):
+                    continue
+                cost = rule.cost + sum(costs[quantity] for quantity in rule.inputs)
+                if cost < costs.get(rule.target, math.inf):
+                    costs[rule.target] = cost
+                    best[rule.target] = rule
+                    changed = True
+
+        return best
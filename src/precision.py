@@ -0,0 +1,145 @@
+import argparse
+import itertools
+import numpy as np
+from lawbatch import LawBatch, QUANTITIES
+from planner import SIDES, ANGLES
+from solver import solve
+from stats import readRows
+from trig import TrigLaw, SPHERICAL_LAWS
+
+PLANAR_LAWS = (TrigLaw.SOH, TrigLaw.CAH, TrigLaw.TOA, TrigLaw.SINE_LAW, TrigLaw.COSINE_LAW, TrigLaw.AUTO)
+RIGHT_LAWS = (TrigLaw.SOH, TrigLaw.CAH, TrigLaw.TOA) # these need A = 90
+
+def givenCase(known):
+    '''
+    Returns the name of the case a set of three known quantities is, e.g. 'SAS' when the angle is between the sides.
+    '''
+    sides = [quantity for quantity in known if quantity in SIDES]
+    angles = [quantity for quantity in known if quantity in ANGLES]
+    if len(sides) == 3:
+        return 'SSS'
+    if len(sides) == 2:
+        return 'SSA' if angles[0].lower() in sides else 'SAS' # the included angle is opposite the unknown side
+    if len(sides) == 1:
+        return 'AAS' if sides[0].upper() in angles else 'ASA'
+    return 'AAA'
+
+class PrecisionAudit:
+    '''
+    Class that measures what the float32 LawBatch loses against the reference Triangle (float64, one row at a time),
+    per law and given case. It also runs LawBatch in float64, so what comes from the precision can be told apart
+    from what comes from a different (but equivalent) order of steps.
+    Errors are relative, for the sides and the angles separately, the worst quantity of each row counts.
+    '''
+    def __init__(self, dtype = np.float32):
+        self.dtype = dtype
+        self.groups = {} # (law, case) -> dict of error arrays and counts
+
+    @staticmethod
+    def sampleRows(count, law, seed = 0):
+        '''
+        Returns count random rows (dicts) for a law: random triangles (right angled at A for SOH, CAH and TOA)
+        of random sizes, each given by a random solvable set of three of its sides and angles.
+        '''
+        generator = np.random.default_rng(seed)
+        if law in RIGHT_LAWS:
+            B = generator.uniform(0, 90, count)
+            angles = np.stack([np.full(count, 90.0), B, 90 - B], axis=1)
+        else:
+            angles = 180 * generator.dirichlet((1, 1, 1), count)
+        scale = np.exp(generator.uniform(np.log(1e-3), np.log(1e3), count)) # the circumdiameter
+        sides = scale[:, None] * np.sin(np.radians(angles))
+        values = np.concatenate([sides, angles], axis=1)
+
+        patterns = [known for known in map(frozenset, itertools.combinations(QUANTITIES, 3))
+                    if LawBatch.derivations(known, law in RIGHT_LAWS, law) is not None and (law not in RIGHT_LAWS or 'A' in known)]
+        choices = generator.integers(len(patterns), size=count)
+
+        rows = []
+        for row, choice in zip(values, choices):
+            rows.append({quantity: float(value) for quantity, value in zip(QUANTITIES, row) if quantity in patterns[choice]})
+        return rows
+
+    def add(self, rows, law):
+        '''
+        Solves rows (dicts of exactly three inputs, angles in degrees) with a law through both paths
+        and adds their errors to the groups. Rows of other shapes are skipped.
+        '''
+        rows = [row for row in rows if row is not None and len(row) == 3]
+        reference = np.array([[np.nan if value is None else value for value in solve(law=law, **row)[:6]] for row in rows],
+                             dtype=np.float64).reshape(-1, 6)
+        columns = {quantity: np.array([row.get(quantity, np.nan) for row in rows], dtype=np.float64) for quantity in QUANTITIES}
+        batch = LawBatch.solve(columns, law, self.dtype)
+        exact = LawBatch.solve(columns, law, np.float64)
+
+        cases = np.array([givenCase(row) for row in rows])
+        for case in np.unique(cases):
+            mask = cases == case
+            group = self.groups.setdefault((law.value, case), {'rows': 0, 'mismatched': 0, 'sides': [], 'angles': [], 'exact': []})
+            group['rows'] += int(mask.sum())
+
+            solvedReference = ~np.isnan(reference[mask]).any(axis=1)
+            solvedBatch = batch['solved'][mask]
+            group['mismatched'] += int(np.count_nonzero(solvedReference != solvedBatch)) # one path solved it and the other didn't
+            both = solvedReference & solvedBatch & exact['solved'][mask]
+
+            expected = reference[mask][both]
+            computed = np.stack([batch[quantity][mask][both] for quantity in QUANTITIES], axis=1).astype(np.float64)
+            computedExact = np.stack([exact[quantity][mask][both] for quantity in QUANTITIES], axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                errors = np.abs(computed - expected) / np.abs(expected)
+                errorsExact = np.abs(computedExact - expected) / np.abs(expected)
+            group['sides'].append(errors[:, :3].max(axis=1, initial=0))
+            group['angles'].append(errors[:, 3:].max(axis=1, initial=0))
+            group['exact'].append(errorsExact.max(axis=1, initial=0))
+
+    def report(self, tolerance = 1e-4):
+        '''
+        Returns a table of the maximum and percentile relative errors of every law and given case, marking the
+        groups whose maximum goes over tolerance.
+        '''
+        lines = [f'{"law":<12}{"case":<6}{"rows":>8}{"mismatch":>10}{"side p50":>11}{"side p99.9":>11}{"side max":>11}'
+                 f'{"angle p50":>11}{"angle p99.9":>12}{"angle max":>11}{"float64 max":>12}']
+        for (law, case), group in sorted(self.groups.items()):
+            sides, angles, exact = (np.concatenate(group[name]) if group[name] else np.zeros(0) for name in ('sides', 'angles', 'exact'))
+            percentiles = lambda errors: np.percentile(errors, (50, 99.9)) if errors.size else (np.nan, np.nan)
+            sideMax, angleMax = (errors.max(initial=0) for errors in (sides, angles))
+            flag = '  over' if max(sideMax, angleMax) > tolerance or group['mismatched'] else ''
+            lines.append(f'{law:<12}{case:<6}{group["rows"]:>8}{group["mismatched"]:>10}'
+                         f'{percentiles(sides)[0]:>11.1e}{percentiles(sides)[1]:>11.1e}{sideMax:>11.1e}'
+                         f'{percentiles(angles)[0]:>11.1e}{percentiles(angles)[1]:>12.1e}{angleMax:>11.1e}'
+                         f'{exact.max(initial=0):>12.1e}{flag}')
+        lines.append(f'relative errors of {np.dtype(self.dtype).name} against the float64 Triangle, "over" marks a maximum above {tolerance:g} or rows only one of them solved')
+        return '\n'.join(lines)
+
+def main():
+    '''
+    Command line entry point, audits the float32 batch on random samples of every planar law or on a CSV file.
+    '''
+    parser = argparse.ArgumentParser(description='Report the errors of float32 batch solving against the float64 reference per law and given case.')
+    parser.add_argument('path', nargs='?', help='CSV file of rows to audit, random samples of every law if left out')
+    parser.add_argument('--law', default=None, help='law to audit (for a CSV the default is Auto), every planar law for random samples')
+    parser.add_argument('--sample', type=int, default=20000, help='rows per law (random samples) or at most from the file')
+    parser.add_argument('--tolerance', type=float, default=1e-4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.law and TrigLaw(args.law) in SPHERICAL_LAWS:
+        parser.error(f'{args.law} is a spherical law, only planar laws are batch solved')
+
+    audit = PrecisionAudit()
+    if args.path:
+        law = TrigLaw(args.law or TrigLaw.AUTO.value)
+        rows = []
+        for row in readRows(args.path):
+            if len(rows) >= args.sample:
+                break
+            if row is not None and row.pop('law', law.value) == law.value:
+                rows.append(row)
+        audit.add(rows, law)
+    else:
+        for law in ([TrigLaw(args.law)] if args.law else PLANAR_LAWS):
+            audit.add(PrecisionAudit.sampleRows(args.sample, law, args.seed), law)
+    print(audit.report(args.tolerance))
+
+if __name__ == '__main__':
+    main()
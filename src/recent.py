@@ -0,0 +1,91 @@
+class RecentEntry:
+    '''
+    Class holding what it takes to show a solve again: the inputs typed in, the law, the solved Triangle, its
+    procedure as rendered for the info box and the scene it was drawn in (with the drawing size it was drawn for).
+    '''
+    def __init__(self, key, inputs, law, otherGivens, triangle, procedure, scene, size):
+        self.key = key
+        self.inputs = inputs
+        self.law = law
+        self.otherGivens = otherGivens
+        self.triangle = triangle
+        self.procedure = procedure
+        self.scene = scene
+        self.size = size
+        self.lastShown = 0
+
+    def title(self):
+        '''
+        Returns a short description for menus, e.g. 'Auto: a=5, c=7, ∠B=20'.
+        '''
+        givens = dict(self.inputs, **self.otherGivens)
+        text = ', '.join(f'{"∠" if key.isupper() else ""}{key}={value:g}' for key, value in givens.items() if value is not None)
+        return f'{self.law.value}: {text}'
+
+class RecentTriangles:
+    '''
+    Class that keeps the most recent solves in the order they were made, with a position to go back and forth from.
+    Going back, forward or to any entry is a list lookup, nothing is solved or drawn again. Solving inputs that are
+    already in the list moves their entry to the end instead of adding a copy.
+    Memory is bounded by maxEntries: past it, the entry shown least recently is evicted (never the current one), and
+    its scene goes with it.
+    '''
+    def __init__(self, maxEntries = 50):
+        self.maxEntries = maxEntries
+        self.entries = [] # oldest first
+        self.index = -1 # entry being shown
+        self.clock = 0 # counts the entries shown, for the least recently shown eviction
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(inputs, law, otherGivens):
+        return (law, tuple(sorted(inputs.items())), tuple(sorted(otherGivens.items())))
+
+    def add(self, inputs, law, otherGivens, triangle, procedure, scene, size):
+        '''
+        Adds a solve as the newest entry, makes it the current one and returns it.
+        '''
+        key = RecentTriangles.key(inputs, law, otherGivens)
+        self.entries = [entry for entry in self.entries if entry.key != key]
+        self.entries.append(RecentEntry(key, dict(inputs), law, dict(otherGivens), triangle, procedure, scene, size))
+        entry = self.jump(len(self.entries) - 1)
+        self.evict()
+        return entry
+
+    def evict(self):
+        '''
+        Drops the least recently shown entries until there are at most maxEntries.
+        '''
+        while len(self.entries) > self.maxEntries:
+            current = self.entries[self.index]
+            victim = min((entry for entry in self.entries if entry is not current), key=lambda entry: entry.lastShown)
+            self.entries.remove(victim)
+            self.index = self.entries.index(current)
+
+    def current(self):
+        return self.entries[self.index] if self.entries else None
+
+    def jump(self, index):
+        '''
+        Makes the entry at index the current one and returns it, None if there's no such entry.
+        '''
+        if not 0 <= index < len(self.entries):
+            return None
+        self.index = index
+        self.clock += 1
+        self.entries[index].lastShown = self.clock
+        return self.entries[index]
+
+    def back(self):
+        return self.jump(self.index - 1) if self.index > 0 else None
+
+    def forward(self):
+        return self.jump(self.index + 1)
+
+    def canGoBack(self):
+        return self.index > 0
+
+    def canGoForward(self):
+        return self.index < len(self.entries) - 1
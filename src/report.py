@@ -0,0 +1,175 @@
+import argparse
+import html
+import math
+import os
+from collections import deque
+from solver import solveBatch
+from stats import readRows
+from trig import TrigLaw, SPHERICAL_LAWS
+
+class ReportFormat:
+    '''
+    Class holding the templates of one report format.
+    Templates are plain str.format strings whose bound format methods are looked up once, so rendering a row is a
+    single call. The procedure steps themselves come from the Triangle string helpers, which are f-strings and so
+    already compiled with the module.
+    '''
+    def __init__(self, extension, header, footer, row, error, diagram, step):
+        self.extension = extension
+        self.header = header
+        self.footer = footer
+        self.row = row.format
+        self.error = error.format
+        self.diagram = diagram.format
+        self.step = step
+
+HTML = ReportFormat(
+    extension='.html',
+    header='<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title>'
+           '<style>body{{font-family:sans-serif}} section{{margin:1em 0;border-bottom:1px solid #d3d3d3}}</style>'
+           '</head><body>\n<h1>{title}</h1>\n',
+    footer='</body></html>\n',
+    row='<section><h2>#{index} {law}</h2>\n<p>{inputs}</p>\n{diagram}<p>{steps}</p></section>\n',
+    error='<section><h2>#{index} {law}</h2>\n<p>{inputs}</p>\n<p><b>{error}</b></p></section>\n',
+    diagram='<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="{viewBox}">'
+            '<polygon points="{points}" fill="none" stroke="black" vector-effect="non-scaling-stroke"/></svg>\n',
+    step=lambda step: step # the steps are HTML already
+)
+
+MARKDOWN = ReportFormat(
+    extension='.md',
+    header='# {title}\n\n',
+    footer='',
+    row='## #{index} {law}\n\n{inputs}\n\n{diagram}{steps}\n\n',
+    error='## #{index} {law}\n\n{inputs}\n\n**{error}**\n\n',
+    diagram='<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="{viewBox}">'
+            '<polygon points="{points}" fill="none" stroke="black" vector-effect="non-scaling-stroke"/></svg>\n\n',
+    step=lambda step: step.replace('*', '\\*').replace('<br>', '  \n') # * would start emphasis
+)
+
+FORMATS = {'html': HTML, 'markdown': MARKDOWN}
+
+class ReportWriter:
+    '''
+    Class that writes the procedures of solved triangles to report files as they come, one row at a time.
+    Nothing is kept in memory but the current row: rows go straight to the open file, and once a file reaches
+    maxBytes it's closed and the next rows go to a new one (report-0001.html, report-0002.html, ...).
+    '''
+    def __init__(self, path, format = 'html', maxBytes = 8 << 20, diagrams = True, diagramSize = 160, title = 'Triangle Report'):
+        '''
+        path is the name of the first file without the page number, e.g. reports/job.html.
+        '''
+        self.base = os.path.splitext(path)[0]
+        self.format = FORMATS[format]
+        self.maxBytes = maxBytes
+        self.diagrams = diagrams
+        self.diagramSize = diagramSize
+        self.title = title
+
+        self.file = None
+        self.bytes = 0 # written to the current file, counted because tell() would flush on every row
+        self.paths = []
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def openNext(self):
+        '''
+        Closes the current file and starts the next page.
+        '''
+        self.close()
+        path = f'{self.base}-{len(self.paths) + 1:04d}{self.format.extension}'
+        self.file = open(path, 'w', encoding='utf-8')
+        self.bytes = 0
+        self.paths.append(path)
+        self.writeText(self.format.header.format(title=html.escape(f'{self.title} ({len(self.paths)})')))
+
+    def close(self):
+        if self.file:
+            self.writeText(self.format.footer)
+            self.file.close()
+            self.file = None
+
+    def writeText(self, text):
+        self.file.write(text)
+        self.bytes += len(text.encode('utf-8'))
+
+    def write(self, inputs, result):
+        '''
+        Writes one row, inputs is the dict the row was solved from and result its SolveResult (solved with steps).
+        '''
+        if self.file is None or self.bytes >= self.maxBytes:
+            self.openNext()
+
+        self.rows += 1
+        law = html.escape(result.law.value)
+        inputsText = html.escape(', '.join(f'{key} = {value:g}' for key, value in inputs.items() if key != 'law'))
+
+        if result.error:
+            self.writeText(self.format.error(index=self.rows, law=law, inputs=inputsText, error=html.escape(result.error)))
+            return
+
+        steps = self.format.step('<br>'.join(result.steps))
+        diagram = self.diagram(result) if self.diagrams and result.law not in SPHERICAL_LAWS else ''
+        self.writeText(self.format.row(index=self.rows, law=law, inputs=inputsText, diagram=diagram, steps=steps))
+
+    def diagram(self, result):
+        '''
+        Returns an inline SVG of a solved planar triangle, with the vertices placed like Triangle.calculateVertices.
+        '''
+        A = math.radians(result.A)
+        points = ((0.0, 0.0), (result.c, 0.0), (result.b * math.cos(A), -result.b * math.sin(A)))
+        xs, ys = [x for x, _ in points], [y for _, y in points]
+        width, height = max(xs) - min(xs), max(ys) - min(ys)
+        margin = 0.05 * max(width, height)
+
+        return self.format.diagram(
+            size=self.diagramSize,
+            viewBox=f'{min(xs) - margin:.6g} {min(ys) - margin:.6g} {width + 2 * margin:.6g} {height + 2 * margin:.6g}',
+            points=' '.join(f'{x:.6g},{y:.6g}' for x, y in points))
+
+def writeReport(rows, path, law = TrigLaw.AUTO, format = 'html', maxBytes = 8 << 20, diagrams = True, workers = None):
+    '''
+    Solves an iterable of rows (dicts like solver.solveRow takes, None for a malformed row) with their steps and
+    writes them to report files. Rows are solved and written in bounded chunks, so memory stays flat however
+    many rows there are. Returns the paths of the files written, one empty page when there are no rows.
+    '''
+    pendingInputs = deque() # inputs of the rows in flight, in order, to pair them with their results
+
+    def tracked():
+        for row in rows:
+            pendingInputs.append(row)
+            yield row or {} # a malformed row is still solved (and fails) to keep its place
+
+    with ReportWriter(path, format, maxBytes, diagrams) as writer:
+        for result in solveBatch(tracked(), law, steps=True, workers=workers):
+            inputs = pendingInputs.popleft()
+            if inputs is None:
+                result = result._replace(error='Invalid value in row!')
+            writer.write(inputs or {}, result)
+        if not writer.paths: # no rows, still write an (empty) report
+            writer.openNext()
+        return writer.paths
+
+def main():
+    '''
+    Command line entry point, writes the report of a CSV file of triangles.
+    '''
+    parser = argparse.ArgumentParser(description='Write the step by step procedures of a CSV file of triangles as a report.')
+    parser.add_argument('path')
+    parser.add_argument('output', help='e.g. reports/job.html, pages are numbered job-0001.html, job-0002.html, ...')
+    parser.add_argument('--law', default=TrigLaw.AUTO.value, help='law used for rows without a law column')
+    parser.add_argument('--format', choices=tuple(FORMATS), default='html')
+    parser.add_argument('--max-bytes', type=int, default=8 << 20, help='size after which a new file is started')
+    parser.add_argument('--no-diagrams', action='store_true')
+    args = parser.parse_args()
+
+    paths = writeReport(readRows(args.path), args.output, TrigLaw(args.law), args.format, args.max_bytes, not args.no_diagrams)
+    print(f'Wrote {len(paths)} files: {paths[0]} ... {paths[-1]}' if len(paths) > 1 else f'Wrote {paths}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+import csv
+import math
+import os
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, pyqtSignal
+from solver import solveChunk
+from trig import TrigLaw
+
+LAWS = list(TrigLaw)
+INPUT_KEYS = ('a', 'b', 'c', 'A', 'B', 'C')
+HEADERS = ['Law', 'a', 'b', 'c', '∠A', '∠B', '∠C', 'Solved a', 'Solved b', 'Solved c', 'Solved ∠A', 'Solved ∠B', 'Solved ∠C', 'Error']
+
+class ResultColumns:
+    '''
+    Class that stores solved rows column by column in numpy arrays.
+    Inputs and solved values are float64 (NaN when missing), the law and error message are small integer codes,
+    so a few million rows take a few hundred megabytes instead of gigabytes of Python objects.
+    With dtype=np.float32 the values take half of that, rounded to about 7 significant digits.
+    '''
+    def __init__(self, capacity = 1 << 16, dtype = np.float64):
+        self.size = 0
+        self.inputs = np.full((capacity, 6), np.nan, dtype=dtype)
+        self.solved = np.full((capacity, 6), np.nan, dtype=dtype)
+        self.law = np.zeros(capacity, dtype=np.int8)
+        self.error = np.zeros(capacity, dtype=np.int16) # 0 means solved, otherwise index into errorMessages
+        self.errorMessages = [None]
+
+    def reserve(self, capacity):
+        '''
+        Grows the arrays (by doubling) so they can hold at least capacity rows.
+        '''
+        if capacity <= len(self.law):
+            return
+        newCapacity = max(capacity, 2 * len(self.law))
+        for name in ('inputs', 'solved', 'law', 'error'):
+            old = getattr(self, name)
+            new = np.full((newCapacity,) + old.shape[1:], np.nan if old.dtype.kind == 'f' else 0, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def errorCode(self, message):
+        '''
+        Returns the code of an error message, adding it to the table the first time it's seen.
+        '''
+        if message is None:
+            return 0
+        if message not in self.errorMessages:
+            self.errorMessages.append(message)
+        return self.errorMessages.index(message)
+
+    def append(self, chunk):
+        '''
+        Appends a chunk produced by ImportWorker (dict of arrays plus the error messages it uses).
+        '''
+        count = len(chunk['law'])
+        self.reserve(self.size + count)
+        end = self.size + count
+
+        self.inputs[self.size:end] = chunk['inputs']
+        self.solved[self.size:end] = chunk['solved']
+        self.law[self.size:end] = chunk['law']
+        codes = np.array([self.errorCode(message) for message in chunk['errorMessages']], dtype=np.int16)
+        self.error[self.size:end] = codes[chunk['error']] # remap the chunk's own codes to ours
+        self.size = end
+
+    def row(self, index):
+        '''
+        Returns the inputs of a row as keyword arguments for Triangle/solve, and its law.
+        '''
+        inputs = {key: float(value) for key, value in zip(INPUT_KEYS, self.inputs[index]) if not math.isnan(value)}
+        return inputs, LAWS[self.law[index]]
+
+class ResultsTableModel(QAbstractTableModel):
+    '''
+    Table model over ResultColumns for a QTableView.
+    The view only asks for the cells it shows, so only those are ever formatted. Sorting and filtering never
+    touch the columns, they just compute the array of row indices (self.order) the view goes through.
+    '''
+    def __init__(self, columns, parent = None):
+        super().__init__(parent)
+        self.columns = columns
+        self.order = np.arange(0, dtype=np.int64)
+        self.sortColumn = None
+        self.sortOrder = Qt.AscendingOrder
+        self.statusFilter = None # None, 'ok' or 'error'
+        self.lawFilter = None
+
+    def rowCount(self, parent = QModelIndex()):
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent = QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role = Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+
+        row = self.order[index.row()]
+        column = index.column()
+        if column == 0:
+            return LAWS[self.columns.law[row]].value
+        elif column <= 6:
+            value = self.columns.inputs[row, column - 1]
+        elif column <= 12:
+            value = self.columns.solved[row, column - 7]
+        else:
+            return self.columns.errorMessages[self.columns.error[row]] or ''
+
+        return '' if math.isnan(value) else f'{value:.2f}'
+
+    def sortKey(self, column, indices):
+        '''
+        Returns the values of a column for the given row indices, to sort by.
+        '''
+        if column == 0:
+            return self.columns.law[indices]
+        elif column <= 6:
+            return self.columns.inputs[indices, column - 1]
+        elif column <= 12:
+            return self.columns.solved[indices, column - 7]
+        return self.columns.error[indices]
+
+    def computeOrder(self):
+        '''
+        Computes the filtered and sorted array of row indices.
+        '''
+        size = self.columns.size
+        mask = np.ones(size, dtype=bool)
+        if self.statusFilter == 'ok':
+            mask &= self.columns.error[:size] == 0
+        elif self.statusFilter == 'error':
+            mask &= self.columns.error[:size] != 0
+        if self.lawFilter is not None:
+            mask &= self.columns.law[:size] == LAWS.index(self.lawFilter)
+
+        indices = np.flatnonzero(mask)
+        if self.sortColumn is not None:
+            keys = self.sortKey(self.sortColumn, indices)
+            ordering = np.argsort(keys, kind='stable') # NaNs sort last
+            if self.sortOrder == Qt.DescendingOrder:
+                missing = np.count_nonzero(np.isnan(keys)) if keys.dtype.kind == 'f' else 0
+                ordering = np.concatenate([ordering[:len(ordering) - missing][::-1], ordering[len(ordering) - missing:]]) # keep NaNs last
+            indices = indices[ordering]
+        return indices
+
+    def refresh(self):
+        '''
+        Recomputes the order and resets the view.
+        '''
+        self.beginResetModel()
+        self.order = self.computeOrder()
+        self.endResetModel()
+
+    def sort(self, column, order = Qt.AscendingOrder):
+        self.sortColumn = column if column >= 0 else None # the view passes -1 for unsorted
+        self.sortOrder = order
+        self.layoutAboutToBeChanged.emit()
+        self.order = self.computeOrder()
+        self.layoutChanged.emit()
+
+    def setFilters(self, status = None, law = None):
+        '''
+        Filters the rows by status ('ok' or 'error') and law, None for no filter.
+        '''
+        self.statusFilter = status
+        self.lawFilter = law
+        self.refresh()
+
+    def appendChunk(self, chunk):
+        '''
+        Adds a chunk of solved rows. Without sorting or filtering the new rows just go at the end,
+        otherwise the order is recomputed.
+        '''
+        start = self.columns.size
+        self.columns.append(chunk)
+
+        if self.sortColumn is None and self.statusFilter is None and self.lawFilter is None:
+            self.beginInsertRows(QModelIndex(), start, self.columns.size - 1)
+            self.order = np.arange(self.columns.size, dtype=np.int64)
+            self.endInsertRows()
+        else:
+            self.refresh()
+
+    def rowAt(self, viewRow):
+        '''
+        Returns the inputs and law of the row shown at viewRow.
+        '''
+        return self.columns.row(self.order[viewRow])
+
+class ImportWorker(QObject):
+    '''
+    Worker that reads a CSV file of triangles and solves it chunk by chunk, meant to run on a QThread.
+    The CSV needs a header with any of a, b, c, A, B, C and optionally law.
+    It emits every solved chunk as columnar arrays (of dtype, see ResultColumns) and checks for cancellation between chunks.
+    '''
+    chunkReady = pyqtSignal(object)
+    progress = pyqtSignal(int) # percent of the file read
+    finished = pyqtSignal(str) # final status message
+
+    def __init__(self, path, law = TrigLaw.AUTO, chunkSize = 20000, dtype = np.float64):
+        super().__init__()
+        self.path = path
+        self.law = law
+        self.chunkSize = chunkSize
+        self.dtype = dtype
+        self.cancelled = False
+
+    def cancel(self):
+        '''
+        Asks the worker to stop after the current chunk. Set from the GUI thread, read from the worker.
+        '''
+        self.cancelled = True
+
+    def run(self):
+        '''
+        Reads, solves and emits the file chunk by chunk.
+        '''
+        total = 0
+        self.bytesRead = 0
+        message = None
+
+        try:
+            size = max(os.path.getsize(self.path), 1)
+            with open(self.path, 'rb') as file:
+                reader = csv.DictReader(self.lines(file))
+                chunk = []
+                for record in reader:
+                    chunk.append(record)
+                    if len(chunk) >= self.chunkSize:
+                        self.chunkReady.emit(self.solve(chunk))
+                        total += len(chunk)
+                        chunk = []
+                        self.progress.emit(int(100 * self.bytesRead / size))
+                        if self.cancelled:
+                            message = f'Import cancelled after {total} rows'
+                            return
+                if chunk:
+                    self.chunkReady.emit(self.solve(chunk))
+                    total += len(chunk)
+            self.progress.emit(100)
+            message = f'Imported {total} rows'
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            message = f'Import failed: {e}'
+        except Exception as e: # nothing may escape a slot on a QThread, and the GUI waits for finished
+            message = f'Import failed after {total} rows: {e}'
+        finally:
+            self.finished.emit(message or f'Import failed after {total} rows')
+
+    def lines(self, file):
+        '''
+        Yields the decoded lines of a binary file, counting the bytes read for the progress bar
+        (a text file can't tell its position while it's being iterated).
+        '''
+        for line in file:
+            self.bytesRead += len(line)
+            yield line.decode('utf-8')
+
+    def solve(self, records):
+        '''
+        Parses and solves a chunk of CSV records and returns it as columnar arrays.
+        '''
+        count = len(records)
+        inputs = np.full((count, 6), np.nan, dtype=self.dtype)
+        laws = np.zeros(count, dtype=np.int8)
+        rows = []
+        valid = []
+
+        for i, record in enumerate(records):
+            try:
+                row = {key: float(record[key]) for key in INPUT_KEYS if (record.get(key) or '').strip()}
+                law = TrigLaw(record['law'].strip()) if (record.get('law') or '').strip() else self.law
+            except ValueError:
+                valid.append(False)
+                continue
+            for key, value in row.items():
+                inputs[i, INPUT_KEYS.index(key)] = value
+            laws[i] = LAWS.index(law)
+            rows.append(dict(row, law=law.value))
+            valid.append(True)
+
+        results = iter(solveChunk(rows))
+        solved = np.full((count, 6), np.nan, dtype=self.dtype)
+        error = np.zeros(count, dtype=np.int16)
+        errorMessages = [None, 'Invalid value in row!']
+
+        for i, isValid in enumerate(valid):
+            if not isValid:
+                error[i] = 1
+                continue
+            result = next(results)
+            if result.error:
+                if result.error not in errorMessages:
+                    errorMessages.append(result.error)
+                error[i] = errorMessages.index(result.error)
+            else:
+                solved[i] = result[:6]
+
+        return {'inputs': inputs, 'solved': solved, 'law': laws, 'error': error, 'errorMessages': errorMessages}
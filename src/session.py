@@ -0,0 +1,196 @@
+import argparse
+import functools
+import inspect
+import json
+import os
+import sys
+import time
+from PyQt5.QtWidgets import QApplication, QAction, QRadioButton
+
+# slots of TrigMainWindow whose invocations are counted during a replay, the input cascade goes through these
+COUNTED_SLOTS = ('updateInputFieldStatus', 'validateSideLength', 'validateAngle', 'validatePositive',
+                 'onSohCahToaClicked', 'onSineCosineLawClicked', 'resetInput', 'calculateAndUpdateDisplay')
+ACTIONS = ('Calculate', 'Reset')
+
+def windowFields(window):
+    '''
+    Returns the input boxes of a TrigMainWindow by name: a, b, c, A, B, C and the other givens.
+    '''
+    fields = dict(zip(('a', 'b', 'c'), window.sideIBs))
+    fields.update(zip(('A', 'B', 'C'), window.angleIBs))
+    fields.update(window.otherGivensIBs)
+    return fields
+
+def windowRadioBtns(window):
+    '''
+    Returns the law radio buttons of a TrigMainWindow by attribute name (radioBtnSOH, ...).
+    '''
+    return {name: value for name, value in vars(window).items() if isinstance(value, QRadioButton)}
+
+def windowActions(window):
+    '''
+    Returns the Calculate and Reset tool bar actions of a TrigMainWindow by their text.
+    '''
+    return {action.text(): action for action in window.findChildren(QAction) if action.text() in ACTIONS}
+
+class SessionRecorder:
+    '''
+    Class that records what a user does in a TrigMainWindow: field edits, radio button toggles and Calculate/Reset.
+    Only changes made by the user are recorded (textEdited and clicked, not the setText calls of the window itself),
+    so replaying a session goes through the same cascades of signals the user caused.
+    '''
+    def __init__(self, window):
+        self.events = []
+        self.started = time.perf_counter()
+
+        for name, field in windowFields(window).items():
+            field.textEdited.connect(lambda text, name=name: self.record('edit', name, text))
+        for name, radioBtn in windowRadioBtns(window).items():
+            radioBtn.clicked.connect(lambda checked, name=name: self.record('toggle', name))
+        for name, action in windowActions(window).items():
+            action.triggered.connect(lambda checked, name=name: self.record('action', name))
+
+    def record(self, kind, target, value = None):
+        '''
+        Adds an event with the seconds since the recording started.
+        '''
+        self.events.append({'time': time.perf_counter() - self.started, 'kind': kind, 'target': target, 'value': value})
+
+    def save(self, path):
+        '''
+        Saves the events as JSON.
+        '''
+        with open(path, 'w') as file:
+            json.dump(self.events, file, indent=1)
+
+class SlotCounter:
+    '''
+    Context manager that counts the invocations of COUNTED_SLOTS on every TrigMainWindow created inside it.
+    It wraps the methods on the class, so it has to be entered before the window connects its signals.
+    '''
+    def __init__(self, windowClass):
+        self.windowClass = windowClass
+        self.counts = dict.fromkeys(COUNTED_SLOTS, 0)
+
+    def __enter__(self):
+        self.originals = {name: getattr(self.windowClass, name) for name in COUNTED_SLOTS}
+        for name, original in self.originals.items():
+            setattr(self.windowClass, name, self.counting(name, original))
+        return self
+
+    def __exit__(self, *exception):
+        for name, original in self.originals.items():
+            setattr(self.windowClass, name, original)
+
+    def counting(self, name, original):
+        '''
+        Returns a wrapper of a slot that counts its calls.
+        PyQt passes a slot only as many signal arguments as it takes, the wrapper takes any so it drops the extra ones.
+        '''
+        parameters = len(inspect.signature(original).parameters) - 1 # without self
+
+        @functools.wraps(original)
+        def wrapper(window, *args):
+            self.counts[name] += 1
+            return original(window, *args[:parameters])
+        return wrapper
+
+    def total(self):
+        return sum(self.counts.values())
+
+class SessionReplayer:
+    '''
+    Class that replays a recorded session on a TrigMainWindow as fast as possible and measures every interaction:
+    the time until the event loop is idle again and how many slots ran because of it.
+    '''
+    def __init__(self, window, counter):
+        self.window = window
+        self.counter = counter
+        self.fields = windowFields(window)
+        self.radioBtns = windowRadioBtns(window)
+        self.actions = windowActions(window)
+        self.measurements = [] # (kind, target, seconds, slot calls, slot counts by name)
+
+    def replay(self, events):
+        '''
+        Replays a list of events and records a measurement for each.
+        '''
+        for event in events:
+            before = dict(self.counter.counts)
+            start = time.perf_counter()
+
+            if event['kind'] == 'edit':
+                self.fields[event['target']].setText(event['value'])
+            elif event['kind'] == 'toggle':
+                self.radioBtns[event['target']].click()
+            elif event['kind'] == 'action':
+                self.actions[event['target']].trigger()
+            QApplication.processEvents()
+
+            elapsed = time.perf_counter() - start
+            calls = {name: count - before[name] for name, count in self.counter.counts.items() if count != before[name]}
+            self.measurements.append((event['kind'], event['target'], elapsed, sum(calls.values()), calls))
+
+    def report(self):
+        '''
+        Returns a report of the latency percentiles and slot calls for each kind of interaction,
+        followed by the slowest interactions and the slots they ran.
+        '''
+        percentile = lambda values, p: values[min(len(values) - 1, int(p * len(values)))]
+        lines = [f'{"interaction":<32}{"count":>7}{"p50 ms":>9}{"p95 ms":>9}{"max ms":>9}{"slots/op":>10}']
+
+        groups = {}
+        for kind, target, elapsed, calls, _ in self.measurements:
+            groups.setdefault(f'{kind} {target}', []).append((elapsed, calls))
+        for name, values in sorted(groups.items()):
+            times = sorted(elapsed * 1000 for elapsed, _ in values)
+            slots = sum(calls for _, calls in values) / len(values)
+            lines.append(f'{name:<32}{len(values):>7}{percentile(times, 0.5):>9.2f}{percentile(times, 0.95):>9.2f}{times[-1]:>9.2f}{slots:>10.1f}')
+
+        lines.append('')
+        lines.append('slowest interactions:')
+        for kind, target, elapsed, calls, byName in sorted(self.measurements, key=lambda m: m[2], reverse=True)[:5]:
+            lines.append(f'  {kind} {target}: {elapsed * 1000:.2f} ms, {calls} slot calls {byName}')
+        lines.append(f'total slot calls: {self.counter.total()}')
+        return '\n'.join(lines)
+
+def main():
+    '''
+    Command line entry point, records a session in the regular window or replays one offscreen:
+        python session.py record session.json
+        python session.py replay session.json [--repeat N]
+    '''
+    parser = argparse.ArgumentParser(description='Record and replay input sessions of the calculator.')
+    parser.add_argument('mode', choices=('record', 'replay'))
+    parser.add_argument('path')
+    parser.add_argument('--repeat', type=int, default=1, help='times the session is replayed')
+    args = parser.parse_args()
+
+    if args.mode == 'replay':
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication(sys.argv)
+    from gui import TrigMainWindow # after the platform is set
+
+    if args.mode == 'record':
+        window = TrigMainWindow()
+        recorder = SessionRecorder(window)
+        window.show()
+        app.exec_()
+        recorder.save(args.path)
+        print(f'Recorded {len(recorder.events)} events to {args.path}')
+        return
+
+    with open(args.path) as file:
+        events = json.load(file)
+    with SlotCounter(TrigMainWindow) as counter:
+        window = TrigMainWindow(storePath=':memory:') # replays still store every calculation, just not in the real history
+        window.initDeferredComponents() # it's never shown, build the panels the first frame would have
+        replayer = SessionReplayer(window, counter)
+        counter.counts = dict.fromkeys(COUNTED_SLOTS, 0) # don't count the window setting itself up
+        for _ in range(args.repeat):
+            replayer.replay(events)
+        print(replayer.report())
+        window.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import math
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from triangle import Triangle
+from spherical import SphericalTriangle
+from trig import TrigLaw, SPHERICAL_LAWS
+
+# immutable result of a solve, angles in degrees (and spherical sides in degrees of arc) like the inputs
+# error is None when it was solved, steps is a tuple of the procedure strings (or None if they weren't asked for)
+SolveResult = namedtuple('SolveResult', ['a', 'b', 'c', 'A', 'B', 'C', 'law', 'error', 'steps'])
+
+def solve(a=None, b=None, c=None, A=None, B=None, C=None, law=TrigLaw.AUTO, steps=False, **otherGivens):
+    '''
+    Solves a triangle and returns a SolveResult.
+    This is a pure function: the Triangle it works on is created inside the call and never escapes it,
+    so any number of threads can call it at the same time without locks.
+    Takes the same inputs as Triangle (angles in degrees), other givens are area, perimeter, altitudes and medians.
+    Inputs Triangle fails on (a law that doesn't fit them, zero sides, values that overflow, ...) give an error result
+    instead of raising, so one bad row can't abort a batch.
+    '''
+    try:
+        if law in SPHERICAL_LAWS:
+            triangle = SphericalTriangle(a, b, c, A, B, C, law)
+        else:
+            triangle = Triangle(a, b, c, A, B, C, law, **otherGivens)
+    except (TypeError, ValueError, ArithmeticError):
+        return SolveResult(None, None, None, None, None, None, law, 'Not a feasible/unique triangle!', () if steps else None)
+    return resultOf(triangle, law, steps)
+
+def resultOf(triangle, law, steps=False):
+    '''
+    Returns the SolveResult of a solved Triangle or SphericalTriangle.
+    '''
+    procedure = tuple(triangle.lawsUsed) if steps else None
+    if triangle.errorMessage:
+        return SolveResult(None, None, None, None, None, None, law, triangle.errorMessage, procedure)
+
+    sides = (triangle.a, triangle.b, triangle.c)
+    if law in SPHERICAL_LAWS:
+        sides = tuple(math.degrees(side) for side in sides)
+
+    return SolveResult(*sides, math.degrees(triangle.A), math.degrees(triangle.B), math.degrees(triangle.C),
+                       law, None, procedure)
+
+def solveRow(row, law=TrigLaw.AUTO, steps=False):
+    '''
+    Solves a single row given as a dict of inputs (missing or None for unknowns).
+    A 'law' key in the row overrides the law passed in, a law that isn't one gives an error result.
+    '''
+    row = dict(row)
+    rowLaw = row.pop('law', None) or law
+    try:
+        rowLaw = TrigLaw(rowLaw)
+    except ValueError:
+        return SolveResult(None, None, None, None, None, None, law, 'Invalid law in row!', () if steps else None)
+    return solve(law=rowLaw, steps=steps, **row)
+
+def solveChunk(rows, law=TrigLaw.AUTO, steps=False):
+    '''
+    Solves a list of rows and returns the list of SolveResults in the same order.
+    '''
+    return [solveRow(row, law, steps) for row in rows]
+
+def solveBatch(rows, law=TrigLaw.AUTO, steps=False, workers=None, chunkSize=1000):
+    '''
+    Solves an iterable of rows (dicts) on a thread pool and yields the SolveResults in input order.
+    Rows are handed out in chunks of chunkSize to keep the per task overhead low, and at most two chunks
+    per worker are in flight, so the input can be a generator over a file much bigger than memory.
+    On a regular interpreter the GIL limits the speedup to the parts that release it, on a free-threaded
+    build (3.13t) it scales with the number of cores.
+    '''
+    workers = workers or os.cpu_count() or 1
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        chunk = []
+
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunkSize:
+                pending.append(executor.submit(solveChunk, chunk, law, steps))
+                chunk = []
+                if len(pending) >= 2 * workers: # bounded in flight work, wait for the oldest chunk
+                    yield from pending.pop(0).result()
+
+        if chunk:
+            pending.append(executor.submit(solveChunk, chunk, law, steps))
+
+        for future in pending:
+            yield from future.result()
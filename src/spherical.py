@@ -0,0 +1,515 @@
+import math
+import numpy as np
+from PyQt5.QtCore import QPointF
+from trig import TrigLaw
+
+EARTH_RADIUS = 6371.0088 # mean earth radius in km
+
+class SphericalTrigonometry:
+    '''
+    Class having helper functions to solve spherical trigonometry problems.
+    Sides are central angles (radians) on a unit sphere. This includes the following:
+    - Spherical Cosine Rule for sides and its polar (angles) form
+    - Spherical Sine Rule and Napier's analogies
+    - Napier's rules for right spherical triangles
+    - Spherical excess
+    The cosine rule uses its haversine form so it stays accurate for very small triangles.
+    '''
+    @staticmethod
+    def hav(theta):
+        '''
+        Returns the haversine of an angle.
+        '''
+        return math.sin(theta / 2) ** 2
+
+    @staticmethod
+    def archav(h):
+        '''
+        Returns the angle whose haversine is h.
+        '''
+        return 2 * math.asin(math.sqrt(min(max(h, 0.0), 1.0)))
+
+    @staticmethod
+    def cosineSide(a, b, C):
+        '''
+        Solves for the side opposite to C from two sides and their included angle.
+        hav(c) = hav(a - b) + sin(a) sin(b) hav(C)
+        '''
+        h = SphericalTrigonometry.hav(a - b) + math.sin(a) * math.sin(b) * SphericalTrigonometry.hav(C)
+        return SphericalTrigonometry.archav(h)
+
+    @staticmethod
+    def cosineAngle(a, b, c):
+        '''
+        Solves for the angle opposite to c from three sides.
+        hav(C) = (hav(c) - hav(a - b)) / (sin(a) sin(b))
+        '''
+        h = (SphericalTrigonometry.hav(c) - SphericalTrigonometry.hav(a - b)) / (math.sin(a) * math.sin(b))
+        if h < -1e-12 or h > 1 + 1e-12:
+            raise ValueError('Not a spherical triangle')
+        return SphericalTrigonometry.archav(h)
+
+    @staticmethod
+    def polarCosineAngle(A, B, c):
+        '''
+        Solves for the angle opposite to c from two angles and their included side.
+        cos(C) = -cos(A) cos(B) + sin(A) sin(B) cos(c)
+        '''
+        return math.acos(-math.cos(A) * math.cos(B) + math.sin(A) * math.sin(B) * math.cos(c))
+
+    @staticmethod
+    def polarCosineSide(A, B, C):
+        '''
+        Solves for the side opposite to C from three angles.
+        cos(c) = (cos(C) + cos(A) cos(B)) / (sin(A) sin(B))
+        '''
+        value = (math.cos(C) + math.cos(A) * math.cos(B)) / (math.sin(A) * math.sin(B))
+        if abs(value) > 1 + 1e-12:
+            raise ValueError('Not a spherical triangle')
+        return math.acos(min(max(value, -1.0), 1.0))
+
+    @staticmethod
+    def sine(a = None, A = None, b = None, B = None):
+        '''
+        Solves for an unknown side or angle using the spherical sine rule sin(a) / sin(A) = sin(b) / sin(B).
+        It takes in a side and its corresponding angle and the other side or angle, returns the unknown one.
+        Like the planar sine rule, the principal (less than 90 degrees) solution is returned.
+        '''
+        if a and A and b and not B:
+            return math.asin(math.sin(b) * math.sin(A) / math.sin(a))
+        elif a and A and B and not b:
+            return math.asin(math.sin(a) * math.sin(B) / math.sin(A))
+        else:
+            raise ValueError('Insufficient info')
+
+    @staticmethod
+    def napierAnalogySide(a, b, A, B):
+        '''
+        Solves for the third side c from two sides and their opposite angles using Napier's analogy.
+        tan(c/2) = tan((a + b)/2) cos((A + B)/2) / cos((A - B)/2)
+        '''
+        half = math.atan(math.sin((a + b) / 2) * math.cos((A + B) / 2) / (math.cos((a + b) / 2) * math.cos((A - B) / 2)))
+        if half <= 0:
+            raise ValueError('Not a spherical triangle')
+        return 2 * half
+
+    @staticmethod
+    def napierAnalogyAngle(a, b, A, B):
+        '''
+        Solves for the third angle C from two sides and their opposite angles using Napier's analogy.
+        tan(C/2) = cos((a - b)/2) / (cos((a + b)/2) tan((A + B)/2))
+        '''
+        half = math.atan(math.cos((a - b) / 2) * math.cos((A + B) / 2) / (math.cos((a + b) / 2) * math.sin((A + B) / 2)))
+        if half <= 0:
+            raise ValueError('Not a spherical triangle')
+        return 2 * half
+
+    @staticmethod
+    def excess(a, b, c):
+        '''
+        Returns the spherical excess (A + B + C - π) from the three sides using L'Huilier's theorem,
+        which unlike A + B + C - π doesn't lose all its digits for small triangles.
+        '''
+        s = (a + b + c) / 2
+        product = math.tan(s / 2) * math.tan((s - a) / 2) * math.tan((s - b) / 2) * math.tan((s - c) / 2)
+        return 4 * math.atan(math.sqrt(max(product, 0.0)))
+
+class SphericalTriangle:
+    '''
+    Class that represents a triangle on a unit sphere.
+    It takes sides (as arcs) and angles in degrees like the Triangle class and solves it with the spherical laws.
+    Sides and angles are stored in radians.
+    '''
+    def __init__(self, a=None, b=None, c=None, A=None, B=None, C=None, law=None):
+        '''
+        Initializes the spherical triangle with the given sides and angles (in degrees) and solves it.
+        '''
+        self.lawsUsed = [] # list of laws used to calculate the triangle
+        self.errorMessage = None # error message to be displayed in the GUI
+        self.excess = None
+
+        self.a, self.b, self.c, self.A, self.B, self.C = (math.radians(value) if value is not None else None
+                                                          for value in (a, b, c, A, B, C))
+        self.calculateTriangle(law)
+
+    def calculateTriangle(self, law):
+        '''
+        Calculates the missing sides and angles using the chosen spherical law, then the spherical excess.
+        '''
+        values = [self.a, self.b, self.c, self.A, self.B, self.C]
+        if sum(value is not None for value in values) < 3:
+            self.errorMessage = 'Need at least 3 properties to define a unique triangle!'
+            return
+
+        if any(value is not None and value >= math.pi for value in values):
+            self.errorMessage = 'Sides and angles of a spherical triangle must be less than 180 degrees!'
+            return
+
+        try:
+            if law == TrigLaw.SPHERICAL_SINE_LAW:
+                self.solveSineLaw()
+            elif law == TrigLaw.SPHERICAL_COSINE_LAW:
+                self.solveCosineLaw()
+            elif law == TrigLaw.NAPIER:
+                self.solveNapier()
+
+            if self.errorMessage is None:
+                self.excess = SphericalTrigonometry.excess(self.a, self.b, self.c)
+                self.lawsUsed.append(self.excessString())
+        except (ValueError, ZeroDivisionError):
+            self.errorMessage = 'Not correct dimensions for a spherical triangle!'
+
+    def formatValue(self, value):
+        '''
+        Formats the value to two decimal places if it is not a whole number.
+        '''
+        return f'{value:.2f}' if value != round(value) else str(int(value))
+
+    def formulaString(self, lawName, quantityCalc, formula, substituted):
+        '''
+        Returns the string of a single step to be displayed in the GUI.
+        formula is written with the names of the quantities, substituted with their values.
+        '''
+        label = f'∠{quantityCalc}' if quantityCalc.isupper() else quantityCalc
+        calcVal = self.formatValue(math.degrees(getattr(self, quantityCalc)))
+
+        return (
+            f'We use {lawName} to calculate {label if quantityCalc.isupper() else "side " + label}:<br>'
+            f'{label} = {formula}<br>'
+            f'=> {label} = {substituted}<br>'
+            f'=> {label} = {calcVal}°<br>'
+        )
+
+    def degreesString(self, *quantities):
+        '''
+        Returns the values of the quantities in degrees, formatted for the step strings.
+        '''
+        return [self.formatValue(math.degrees(getattr(self, quantity))) + '°' for quantity in quantities]
+
+    def cosineSideStep(self, x, y, Z, z):
+        '''
+        Calculates side z from sides x, y and their included angle Z with the haversine cosine rule.
+        '''
+        setattr(self, z, SphericalTrigonometry.cosineSide(getattr(self, x), getattr(self, y), getattr(self, Z)))
+        xVal, yVal, ZVal = self.degreesString(x, y, Z)
+        self.lawsUsed.append(self.formulaString('the spherical cosine law', z,
+            f'hav⁻¹(hav({x} - {y}) + sin({x}) sin({y}) hav({Z}))',
+            f'hav⁻¹(hav({xVal} - {yVal}) + sin({xVal}) sin({yVal}) hav({ZVal}))'))
+
+    def cosineAngleStep(self, x, y, z, Z):
+        '''
+        Calculates angle Z from the three sides with the haversine cosine rule.
+        '''
+        setattr(self, Z, SphericalTrigonometry.cosineAngle(getattr(self, x), getattr(self, y), getattr(self, z)))
+        xVal, yVal, zVal = self.degreesString(x, y, z)
+        self.lawsUsed.append(self.formulaString('the spherical cosine law', Z,
+            f'hav⁻¹((hav({z}) - hav({x} - {y})) / (sin({x}) sin({y})))',
+            f'hav⁻¹((hav({zVal}) - hav({xVal} - {yVal})) / (sin({xVal}) sin({yVal})))'))
+
+    def polarCosineAngleStep(self, X, Y, z, Z):
+        '''
+        Calculates angle Z from angles X, Y and their included side z with the polar cosine rule.
+        '''
+        setattr(self, Z, SphericalTrigonometry.polarCosineAngle(getattr(self, X), getattr(self, Y), getattr(self, z)))
+        XVal, YVal, zVal = self.degreesString(X, Y, z)
+        self.lawsUsed.append(self.formulaString('the polar cosine law', Z,
+            f'cos⁻¹(-cos({X}) cos({Y}) + sin({X}) sin({Y}) cos({z}))',
+            f'cos⁻¹(-cos({XVal}) cos({YVal}) + sin({XVal}) sin({YVal}) cos({zVal}))'))
+
+    def polarCosineSideStep(self, X, Y, Z, z):
+        '''
+        Calculates side z from the three angles with the polar cosine rule.
+        '''
+        setattr(self, z, SphericalTrigonometry.polarCosineSide(getattr(self, X), getattr(self, Y), getattr(self, Z)))
+        XVal, YVal, ZVal = self.degreesString(X, Y, Z)
+        self.lawsUsed.append(self.formulaString('the polar cosine law', z,
+            f'cos⁻¹((cos({Z}) + cos({X}) cos({Y})) / (sin({X}) sin({Y})))',
+            f'cos⁻¹((cos({ZVal}) + cos({XVal}) cos({YVal})) / (sin({XVal}) sin({YVal})))'))
+
+    def sineStep(self, x, X, known, calc):
+        '''
+        Calculates side or angle calc from the pair x, X and the known counterpart of calc with the spherical sine rule.
+        '''
+        if calc.isupper():
+            setattr(self, calc, SphericalTrigonometry.sine(a=getattr(self, x), A=getattr(self, X), b=getattr(self, known)))
+            formula = f'sin⁻¹(sin({known}) sin({X}) / sin({x}))'
+        else:
+            setattr(self, calc, SphericalTrigonometry.sine(a=getattr(self, x), A=getattr(self, X), B=getattr(self, known)))
+            formula = f'sin⁻¹(sin({x}) sin({known}) / sin({X}))'
+
+        substituted = formula
+        for quantity, value in zip((x, X, known), self.degreesString(x, X, known)):
+            substituted = substituted.replace(f'({quantity})', f'({value})')
+        self.lawsUsed.append(self.formulaString('the spherical sine law', calc, formula, substituted))
+
+    def napierAnalogySteps(self, x, y, X, Y, z, Z):
+        '''
+        Calculates the remaining side z and angle Z from two sides and their opposite angles using Napier's analogies.
+        '''
+        xVal, yVal, XVal, YVal = self.degreesString(x, y, X, Y)
+        setattr(self, z, SphericalTrigonometry.napierAnalogySide(getattr(self, x), getattr(self, y), getattr(self, X), getattr(self, Y)))
+        self.lawsUsed.append(self.formulaString('Napier\'s analogy', z,
+            f'2 tan⁻¹(tan(({x} + {y})/2) cos(({X} + {Y})/2) / cos(({X} - {Y})/2))',
+            f'2 tan⁻¹(tan(({xVal} + {yVal})/2) cos(({XVal} + {YVal})/2) / cos(({XVal} - {YVal})/2))'))
+        setattr(self, Z, SphericalTrigonometry.napierAnalogyAngle(getattr(self, x), getattr(self, y), getattr(self, X), getattr(self, Y)))
+        self.lawsUsed.append(self.formulaString('Napier\'s analogy', Z,
+            f'2 tan⁻¹(cos(({x} - {y})/2) / (cos(({x} + {y})/2) tan(({X} + {Y})/2)))',
+            f'2 tan⁻¹(cos(({xVal} - {yVal})/2) / (cos(({xVal} + {yVal})/2) tan(({XVal} + {YVal})/2)))'))
+
+    def solveCosineLaw(self):
+        '''
+        Solves the triangle using the spherical cosine law and its polar form.
+        We can solve SSS, SAS, AAA and ASA this way, but not AAS and SSA.
+        '''
+        sides = ('a', 'b', 'c')
+        angles = ('A', 'B', 'C')
+
+        for i in range(3):
+            x, y, z = sides[i], sides[(i+1) % 3], sides[(i+2) % 3]
+            X, Y, Z = angles[i], angles[(i+1) % 3], angles[(i+2) % 3]
+            known = lambda *quantities: all(getattr(self, quantity) is not None for quantity in quantities)
+
+            if known('a', 'b', 'c'):
+                for j in range(3):
+                    if getattr(self, angles[j]) is None:
+                        self.cosineAngleStep(sides[(j+1) % 3], sides[(j+2) % 3], sides[j], angles[j])
+                return
+            elif known(x, y, Z): # SAS
+                self.cosineSideStep(x, y, Z, z)
+                self.cosineAngleStep(y, z, x, X)
+                self.cosineAngleStep(z, x, y, Y)
+                return
+            elif known('A', 'B', 'C'): # AAA is unique on a sphere
+                for j in range(3):
+                    if getattr(self, sides[j]) is None:
+                        self.polarCosineSideStep(angles[(j+1) % 3], angles[(j+2) % 3], angles[j], sides[j])
+                return
+            elif known(X, Y, z): # ASA
+                self.polarCosineAngleStep(X, Y, z, Z)
+                self.polarCosineSideStep(Y, Z, X, x)
+                self.polarCosineSideStep(Z, X, Y, y)
+                return
+
+        self.errorMessage = 'Cannot calculate, use other law!'
+
+    def solveSineLaw(self):
+        '''
+        Solves the triangle using the spherical sine law and Napier's analogies.
+        It needs a side and its opposite angle plus one more side or angle (AAS, SSA).
+        '''
+        pairs = (('a', 'A'), ('b', 'B'), ('c', 'C'))
+
+        for x, X in pairs:
+            if getattr(self, x) is None or getattr(self, X) is None:
+                continue
+            for y, Y in pairs:
+                if y == x:
+                    continue
+                if getattr(self, y) is not None and getattr(self, Y) is None:
+                    self.sineStep(x, X, y, Y)
+                elif getattr(self, Y) is not None and getattr(self, y) is None:
+                    self.sineStep(x, X, Y, y)
+                else:
+                    continue
+
+                z, Z = next(pair for pair in pairs if pair[0] not in (x, y))
+                self.napierAnalogySteps(x, y, X, Y, z, Z)
+                return
+
+        self.errorMessage = 'Cannot calculate, use other law!'
+
+    def solveNapier(self):
+        '''
+        Solves a right spherical triangle (A = 90 degrees, so a is the hypotenuse) using Napier's rules.
+        Any two of a, b, c, B and C are enough. Legs are assumed to be less than 90 degrees.
+        '''
+        if self.A is None or not math.isclose(self.A, math.pi/2):
+            self.errorMessage = 'Angle A must be 90 degrees for Napier\'s rules'
+            return
+
+        a, b, c, B, C = self.a, self.b, self.c, self.B, self.C
+        napier = 'Napier\'s rules'
+
+        if b is None or c is None: # first get both legs, everything else follows from them
+            if a is not None and b is not None:
+                self.c = math.acos(math.cos(a) / math.cos(b))
+                self.lawsUsed.append(self.formulaString(napier, 'c', 'cos⁻¹(cos(a) / cos(b))', 'cos⁻¹(cos({}) / cos({}))'.format(*self.degreesString('a', 'b'))))
+            elif a is not None and c is not None:
+                self.b = math.acos(math.cos(a) / math.cos(c))
+                self.lawsUsed.append(self.formulaString(napier, 'b', 'cos⁻¹(cos(a) / cos(c))', 'cos⁻¹(cos({}) / cos({}))'.format(*self.degreesString('a', 'c'))))
+            elif a is not None and (B is not None or C is not None):
+                X, x, y = ('B', 'b', 'c') if B is not None else ('C', 'c', 'b')
+                setattr(self, x, math.asin(math.sin(a) * math.sin(getattr(self, X))))
+                setattr(self, y, math.atan(math.tan(a) * math.cos(getattr(self, X))))
+                aVal, XVal = self.degreesString('a', X)
+                self.lawsUsed.append(self.formulaString(napier, x, f'sin⁻¹(sin(a) sin({X}))', f'sin⁻¹(sin({aVal}) sin({XVal}))'))
+                self.lawsUsed.append(self.formulaString(napier, y, f'tan⁻¹(tan(a) cos({X}))', f'tan⁻¹(tan({aVal}) cos({XVal}))'))
+            elif b is not None and B is not None:
+                self.c = math.asin(math.tan(b) / math.tan(B))
+                self.lawsUsed.append(self.formulaString(napier, 'c', 'sin⁻¹(tan(b) / tan(B))', 'sin⁻¹(tan({}) / tan({}))'.format(*self.degreesString('b', 'B'))))
+            elif c is not None and C is not None:
+                self.b = math.asin(math.tan(c) / math.tan(C))
+                self.lawsUsed.append(self.formulaString(napier, 'b', 'sin⁻¹(tan(c) / tan(C))', 'sin⁻¹(tan({}) / tan({}))'.format(*self.degreesString('c', 'C'))))
+            elif b is not None and C is not None:
+                self.c = math.atan(math.sin(b) * math.tan(C))
+                self.lawsUsed.append(self.formulaString(napier, 'c', 'tan⁻¹(sin(b) tan(C))', 'tan⁻¹(sin({}) tan({}))'.format(*self.degreesString('b', 'C'))))
+            elif c is not None and B is not None:
+                self.b = math.atan(math.sin(c) * math.tan(B))
+                self.lawsUsed.append(self.formulaString(napier, 'b', 'tan⁻¹(sin(c) tan(B))', 'tan⁻¹(sin({}) tan({}))'.format(*self.degreesString('c', 'B'))))
+            elif B is not None and C is not None:
+                self.a = math.acos(1 / (math.tan(B) * math.tan(C)))
+                self.b = math.asin(math.sin(self.a) * math.sin(B))
+                self.c = math.asin(math.sin(self.a) * math.sin(C))
+                self.lawsUsed.append(self.formulaString(napier, 'a', 'cos⁻¹(cot(B) cot(C))', 'cos⁻¹(cot({}) cot({}))'.format(*self.degreesString('B', 'C'))))
+                self.lawsUsed.append(self.formulaString(napier, 'b', 'sin⁻¹(sin(a) sin(B))', 'sin⁻¹(sin({}) sin({}))'.format(*self.degreesString('a', 'B'))))
+                self.lawsUsed.append(self.formulaString(napier, 'c', 'sin⁻¹(sin(a) sin(C))', 'sin⁻¹(sin({}) sin({}))'.format(*self.degreesString('a', 'C'))))
+            else:
+                self.errorMessage = 'Cannot calculate, use other law!'
+                return
+
+        if self.a is None:
+            self.a = math.acos(math.cos(self.b) * math.cos(self.c))
+            self.lawsUsed.append(self.formulaString(napier, 'a', 'cos⁻¹(cos(b) cos(c))', 'cos⁻¹(cos({}) cos({}))'.format(*self.degreesString('b', 'c'))))
+        if self.B is None:
+            self.B = math.atan2(math.tan(self.b), math.sin(self.c))
+            self.lawsUsed.append(self.formulaString(napier, 'B', 'tan⁻¹(tan(b) / sin(c))', 'tan⁻¹(tan({}) / sin({}))'.format(*self.degreesString('b', 'c'))))
+        if self.C is None:
+            self.C = math.atan2(math.tan(self.c), math.sin(self.b))
+            self.lawsUsed.append(self.formulaString(napier, 'C', 'tan⁻¹(tan(c) / sin(b))', 'tan⁻¹(tan({}) / sin({}))'.format(*self.degreesString('c', 'b'))))
+
+    def excessString(self):
+        '''
+        Returns the spherical excess string to be displayed in the GUI.
+        '''
+        aVal, bVal, cVal = self.degreesString('a', 'b', 'c')
+        return (
+            f'We use L\'Huilier\'s theorem to calculate the spherical excess E:<br>'
+            f'tan(E/4) = sqrt(tan(s/2) tan((s-a)/2) tan((s-b)/2) tan((s-c)/2)), s = (a + b + c)/2<br>'
+            f'=> s = ({aVal} + {bVal} + {cVal})/2<br>'
+            f'=> E = {self.formatValue(math.degrees(self.excess))}° (area = E on a unit sphere, E·R² on a sphere of radius R)<br>'
+        )
+
+    def classifyShape(self, tolerance = 1e-9):
+        '''
+        Classifies a solved triangle by its largest angle as 'right', 'obtuse' or 'acute'.
+        '''
+        largestAngle = max(self.A, self.B, self.C)
+
+        if abs(largestAngle - math.pi/2) <= tolerance:
+            return 'right'
+        elif largestAngle > math.pi/2:
+            return 'obtuse'
+        return 'acute'
+
+    def unitVectors(self):
+        '''
+        Returns the vertices as unit vectors, A at the north pole, B on the zero meridian and C at longitude A.
+        '''
+        return [
+            np.array([0.0, 0.0, 1.0]),
+            np.array([math.sin(self.c), 0.0, math.cos(self.c)]),
+            np.array([math.sin(self.b) * math.cos(self.A), math.sin(self.b) * math.sin(self.A), math.cos(self.b)])
+        ]
+
+    def calculateProjection(self, samples = 32):
+        '''
+        Calculates the vertices and the great circle arcs of the triangle projected orthographically
+        onto the plane tangent to the sphere at the triangle's centroid.
+        Returns (vertices, arcs), arcs[i] is the list of points of the side opposite to vertex i.
+        '''
+        points = self.unitVectors()
+        normal = sum(points)
+        normal /= np.linalg.norm(normal)
+        e1 = np.cross([0.0, 0.0, 1.0], normal) if abs(normal[2]) < 0.999 else np.array([1.0, 0.0, 0.0])
+        e1 /= np.linalg.norm(e1)
+        e2 = np.cross(normal, e1)
+
+        project = lambda p: QPointF(float(p @ e1), -float(p @ e2)) # y is flipped like in Triangle.calculateVertices
+
+        arcs = []
+        for i in range(3):
+            start, end = points[(i+1) % 3], points[(i+2) % 3]
+            omega = math.acos(min(max(float(start @ end), -1.0), 1.0))
+            arc = []
+            for k in range(samples + 1): # slerp along the great circle
+                t = k / samples
+                if omega < 1e-12:
+                    p = start
+                else:
+                    p = (math.sin((1 - t) * omega) * start + math.sin(t * omega) * end) / math.sin(omega)
+                arc.append(project(p))
+            arcs.append(arc)
+
+        return [project(p) for p in points], arcs
+
+class SphericalBatch:
+    '''
+    Class to evaluate spherical triangles in bulk from the latitude/longitude of their vertices.
+    Sides use the haversine formula, angles the half angle formula and the excess L'Huilier's theorem,
+    all of which stay accurate for triangles a few meters across.
+    '''
+    @staticmethod
+    def sidesFromLatLon(lat1, lon1, lat2, lon2):
+        '''
+        Returns the central angles (radians) between two arrays of points given in radians, using the haversine formula.
+        '''
+        h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+    @staticmethod
+    def solve(latA, lonA, latB, lonB, latC, lonC, radius = EARTH_RADIUS):
+        '''
+        Solves arrays of triangles given by vertex coordinates in degrees.
+        Returns a dict of arrays: sides a, b, c in the units of radius, angles A, B, C in degrees,
+        the spherical excess E in degrees and the area in radius units squared.
+        '''
+        latA, lonA, latB, lonB, latC, lonC = (np.radians(np.asarray(value, dtype=np.float64))
+                                              for value in (latA, lonA, latB, lonB, latC, lonC))
+        a = SphericalBatch.sidesFromLatLon(latB, lonB, latC, lonC) # side a is opposite to vertex A
+        b = SphericalBatch.sidesFromLatLon(latC, lonC, latA, lonA)
+        c = SphericalBatch.sidesFromLatLon(latA, lonA, latB, lonB)
+
+        s = (a + b + c) / 2
+        sinS, sinSA, sinSB, sinSC = np.sin(s), np.sin(s - a), np.sin(s - b), np.sin(s - c)
+        with np.errstate(invalid='ignore', divide='ignore'): # degenerate (collinear) rows end up NaN
+            # half angle formula, tan(A/2) = sqrt(sin(s-b) sin(s-c) / (sin(s) sin(s-a)))
+            A = 2 * np.arctan2(np.sqrt(np.clip(sinSB * sinSC, 0, None)), np.sqrt(np.clip(sinS * sinSA, 0, None)))
+            B = 2 * np.arctan2(np.sqrt(np.clip(sinSC * sinSA, 0, None)), np.sqrt(np.clip(sinS * sinSB, 0, None)))
+            C = 2 * np.arctan2(np.sqrt(np.clip(sinSA * sinSB, 0, None)), np.sqrt(np.clip(sinS * sinSC, 0, None)))
+
+        product = np.tan(s / 2) * np.tan((s - a) / 2) * np.tan((s - b) / 2) * np.tan((s - c) / 2)
+        E = 4 * np.arctan(np.sqrt(np.clip(product, 0, None)))
+
+        return {
+            'a': a * radius, 'b': b * radius, 'c': c * radius,
+            'A': np.degrees(A), 'B': np.degrees(B), 'C': np.degrees(C),
+            'E': np.degrees(E), 'area': E * radius ** 2
+        }
+
+    @staticmethod
+    def solveChunks(chunks, radius = EARTH_RADIUS):
+        '''
+        Solves an iterable of (latA, lonA, latB, lonB, latC, lonC) array chunks one after the other,
+        so millions of triplets can be streamed through without holding them all in memory.
+        Yields one result dict per chunk.
+        '''
+        for chunk in chunks:
+            yield SphericalBatch.solve(*chunk, radius=radius)
+
+    @staticmethod
+    def solveArray(points, radius = EARTH_RADIUS, chunkSize = 1_000_000):
+        '''
+        Solves an (N, 3, 2) array of (lat, lon) triplets in degrees, chunkSize rows at a time to bound the
+        temporary memory. Returns a dict of arrays like solve.
+        '''
+        points = np.asarray(points, dtype=np.float64)
+        results = {key: np.empty(len(points)) for key in ('a', 'b', 'c', 'A', 'B', 'C', 'E', 'area')}
+
+        for start in range(0, len(points), chunkSize):
+            chunk = points[start:start + chunkSize]
+            result = SphericalBatch.solve(chunk[:, 0, 0], chunk[:, 0, 1], chunk[:, 1, 0], chunk[:, 1, 1],
+                                          chunk[:, 2, 0], chunk[:, 2, 1], radius)
+            for key, values in result.items():
+                results[key][start:start + chunkSize] = values
+
+        return results
@@ -0,0 +1,292 @@
+import argparse
+import csv
+import json
+import math
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from solver import solveChunk
+from trig import TrigLaw, SPHERICAL_LAWS
+
+FIELDS = ('a', 'b', 'c', 'A', 'B', 'C', 'area')
+
+class RunningMoments:
+    '''
+    Class that keeps the count, mean, variance, min and max of a stream of values in constant memory.
+    Chunks are folded in with Chan's parallel form of Welford's update, which is also how two partial results merge.
+    '''
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0 # sum of squared differences from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        '''
+        Adds an array of values, NaNs are skipped.
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        other = RunningMoments()
+        other.count = values.size
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other):
+        '''
+        Folds the moments of another stream into these.
+        '''
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def toDict(self):
+        if self.count == 0:
+            return {'count': 0}
+        return {'count': self.count, 'mean': self.mean, 'std': math.sqrt(self.m2 / self.count),
+                'min': self.min, 'max': self.max}
+
+class Histogram:
+    '''
+    Class that counts values in fixed bins between low and high, with separate counts for the values outside.
+    With logarithmic=True the bins are evenly spaced in log10, for quantities like areas that span many orders.
+    '''
+    def __init__(self, low, high, bins, logarithmic = False):
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.logarithmic = logarithmic
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.below = 0
+        self.above = 0
+
+    def update(self, values):
+        '''
+        Adds an array of values, NaNs are skipped.
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if self.logarithmic:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.where(values > 0, np.log10(values), -np.inf)
+
+        self.below += int(np.count_nonzero(values < self.low))
+        self.above += int(np.count_nonzero(values > self.high))
+        inside = values[(values >= self.low) & (values <= self.high)]
+        indices = np.minimum(((inside - self.low) / (self.high - self.low) * self.bins).astype(np.int64), self.bins - 1)
+        self.counts += np.bincount(indices, minlength=self.bins)
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.below += other.below
+        self.above += other.above
+
+    def toDict(self):
+        edges = np.linspace(self.low, self.high, self.bins + 1)
+        return {'edges': (10 ** edges if self.logarithmic else edges).tolist(), 'counts': self.counts.tolist(),
+                'below': self.below, 'above': self.above}
+
+class QuantileSketch:
+    '''
+    Class that estimates quantiles of a stream of positive values within a relative error, in constant memory.
+    Values go into logarithmic buckets (bucket i holds values up to gamma^i) like DDSketch, so a quantile is off by at
+    most relativeError and two sketches merge by adding their bucket counts. The number of buckets only grows with
+    the log of the range of the values, a few thousand at most for anything a triangle measures.
+    '''
+    def __init__(self, relativeError = 0.01):
+        self.relativeError = relativeError
+        self.gamma = (1 + relativeError) / (1 - relativeError)
+        self.logGamma = math.log(self.gamma)
+        self.buckets = Counter()
+        self.zeros = 0 # values <= 0, they can't go in a logarithmic bucket
+        self.count = 0
+
+    def update(self, values):
+        '''
+        Adds an array of values, NaNs are skipped.
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        positive = values[values > 0]
+        self.zeros += values.size - positive.size
+        self.count += values.size
+
+        indices, counts = np.unique(np.ceil(np.log(positive) / self.logGamma).astype(np.int64), return_counts=True)
+        self.buckets.update(dict(zip(indices.tolist(), counts.tolist())))
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, q):
+        '''
+        Returns the estimated q quantile (0 <= q <= 1), None if the sketch is empty.
+        '''
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1) # middle of the bucket, within relativeError of any value in it
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def toDict(self, quantiles = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)):
+        return {str(q): self.quantile(q) for q in quantiles}
+
+class BatchStatistics:
+    '''
+    Class that aggregates solved rows chunk by chunk: moments and quantiles of the sides, angles and area,
+    histograms of the angles and areas, and counts per law and per failure reason.
+    Memory doesn't grow with the number of rows, and partial statistics of separate workers merge into the
+    statistics of the whole batch.
+    '''
+    def __init__(self, relativeError = 0.01):
+        self.rows = 0
+        self.laws = Counter()
+        self.errors = Counter()
+        self.moments = {field: RunningMoments() for field in FIELDS}
+        self.sketches = {field: QuantileSketch(relativeError) for field in FIELDS}
+        self.histograms = {
+            'angles': Histogram(0, 180, 36), # all three angles together, 5 degree bins
+            'area': Histogram(-6, 6, 48, logarithmic=True)
+        }
+
+    def addResults(self, results):
+        '''
+        Adds a chunk of SolveResults (e.g. from solver.solveChunk or solveBatch).
+        '''
+        self.rows += len(results)
+        self.laws.update(result.law.value for result in results)
+        self.errors.update(result.error for result in results if result.error)
+
+        solved = [result for result in results if not result.error]
+        values = np.array([result[:6] for result in solved], dtype=np.float64).reshape(-1, 6)
+        planar = np.array([result.law not in SPHERICAL_LAWS for result in solved], dtype=bool)
+        area = np.where(planar, 0.5 * values[:, 0] * values[:, 1] * np.sin(np.radians(values[:, 5])), np.nan) # ab sin(C) / 2
+        self.addColumns(dict(zip(FIELDS, list(values.T) + [area])))
+
+    def addColumns(self, columns):
+        '''
+        Adds a chunk of solved values given as a dict of field -> array (angles in degrees, NaN for missing).
+        '''
+        for field, values in columns.items():
+            self.moments[field].update(values)
+            self.sketches[field].update(values)
+        self.histograms['angles'].update(np.concatenate([columns[angle] for angle in ('A', 'B', 'C')]))
+        self.histograms['area'].update(columns['area'])
+
+    def merge(self, other):
+        '''
+        Folds the statistics of another (partial) batch into these.
+        '''
+        self.rows += other.rows
+        self.laws.update(other.laws)
+        self.errors.update(other.errors)
+        for field in FIELDS:
+            self.moments[field].merge(other.moments[field])
+            self.sketches[field].merge(other.sketches[field])
+        for name, histogram in self.histograms.items():
+            histogram.merge(other.histograms[name])
+        return self
+
+    def toDict(self):
+        return {
+            'rows': self.rows,
+            'solved': self.rows - sum(self.errors.values()),
+            'laws': dict(self.laws),
+            'errors': dict(self.errors),
+            'fields': {field: dict(self.moments[field].toDict(), quantiles=self.sketches[field].toDict()) for field in FIELDS},
+            'histograms': {name: histogram.toDict() for name, histogram in self.histograms.items()}
+        }
+
+    def toJson(self, indent = 1):
+        return json.dumps(self.toDict(), indent=indent)
+
+def summarizeChunk(rows, law = TrigLaw.AUTO):
+    '''
+    Solves a chunk of rows (dicts like solver.solveRow takes) and returns its partial BatchStatistics.
+    This is what a worker runs, only the small partial result travels back.
+    None rows (malformed input) are counted as errors.
+    '''
+    statistics = BatchStatistics()
+    valid = [row for row in rows if row is not None]
+    statistics.addResults(solveChunk(valid, law))
+    if len(valid) < len(rows):
+        statistics.rows += len(rows) - len(valid)
+        statistics.errors['Invalid value in row!'] += len(rows) - len(valid)
+    return statistics
+
+def summarize(rows, law = TrigLaw.AUTO, workers = None, chunkSize = 10000):
+    '''
+    Solves and aggregates an iterable of rows on a thread pool, chunk by chunk, with at most two chunks per worker
+    in flight. Returns the merged BatchStatistics.
+    '''
+    workers = workers or os.cpu_count() or 1
+    total = BatchStatistics()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunkSize:
+                pending.append(executor.submit(summarizeChunk, chunk, law))
+                chunk = []
+                if len(pending) >= 2 * workers:
+                    total.merge(pending.pop(0).result())
+        if chunk:
+            pending.append(executor.submit(summarizeChunk, chunk, law))
+        for future in pending:
+            total.merge(future.result())
+
+    return total
+
+def readRows(path):
+    '''
+    Yields the rows of a CSV file with a header of any of a, b, c, A, B, C and optionally law.
+    Malformed rows are yielded as None, the missing fields of a short row are taken as empty.
+    '''
+    with open(path, newline='') as file:
+        for record in csv.DictReader(file):
+            try:
+                row = {key: float(value) for key, value in record.items() if key in ('a', 'b', 'c', 'A', 'B', 'C') and value and value.strip()}
+                if (record.get('law') or '').strip():
+                    row['law'] = TrigLaw(record['law'].strip()).value
+            except ValueError:
+                row = None
+            yield row
+
+def main():
+    '''
+    Command line entry point, prints the JSON summary of a CSV file of triangles.
+    '''
+    parser = argparse.ArgumentParser(description='Solve a CSV file of triangles and summarize the results as JSON.')
+    parser.add_argument('path')
+    parser.add_argument('--law', default=TrigLaw.AUTO.value, help='law used for rows without a law column')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    print(summarize(readRows(args.path), TrigLaw(args.law), args.workers, args.chunk_size).toJson())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+import math
+import sqlite3
+import time
+from trig import SPHERICAL_LAWS
+
+class TriangleStore:
+    '''
+    Class that persists solved triangles in a local SQLite database.
+    Every calculation (successful or not) is stored with its inputs, the law chosen, the solved values and
+    optionally the step by step procedure so that the history survives resets and restarts.
+    '''
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS triangles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created REAL NOT NULL,
+            law TEXT NOT NULL,
+            status TEXT NOT NULL,
+            shape TEXT,
+            given_side_a REAL, given_side_b REAL, given_side_c REAL,
+            given_angle_a REAL, given_angle_b REAL, given_angle_c REAL,
+            side_a REAL, side_b REAL, side_c REAL,
+            angle_a REAL, angle_b REAL, angle_c REAL,
+            error TEXT,
+            steps TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_triangles_law ON triangles (law, id);
+        CREATE INDEX IF NOT EXISTS idx_triangles_status ON triangles (status, id);
+        CREATE INDEX IF NOT EXISTS idx_triangles_shape ON triangles (shape, id);
+    '''
+
+    COLUMNS = ('id', 'created', 'law', 'status', 'shape',
+               'given_side_a', 'given_side_b', 'given_side_c', 'given_angle_a', 'given_angle_b', 'given_angle_c',
+               'side_a', 'side_b', 'side_c', 'angle_a', 'angle_b', 'angle_c', 'error', 'steps') # SQLite column names are case insensitive, so no a/A
+
+    def __init__(self, path = 'Files/history.db', keepSteps = True):
+        '''
+        Opens (or creates) the database at the given path.
+        WAL mode lets the GUI read pages while a batch job is still writing.
+        '''
+        self.path = path
+        self.keepSteps = keepSteps # step traces are the bulk of the row size, so they can be turned off
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL') # safe with WAL and much faster than FULL
+        self.connection.executescript(self.SCHEMA)
+
+    def close(self):
+        '''
+        Closes the underlying database connection.
+        '''
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def rowFromTriangle(self, triangle, law, inputs):
+        '''
+        Converts a solved Triangle object into a tuple matching the table columns (without the id).
+        inputs is a dict with the values typed in by the user (a, b, c in units and A, B, C in degrees).
+        Angles are stored in degrees since that's what users enter and read.
+        '''
+        status = 'error' if triangle.errorMessage else 'ok'
+        solved = [None] * 6
+        shape = None
+
+        if status == 'ok':
+            sides = [triangle.a, triangle.b, triangle.c]
+            if law in SPHERICAL_LAWS: # spherical sides are arcs in radians, stored in degrees like they're typed in
+                sides = [math.degrees(side) for side in sides]
+            solved = sides + [math.degrees(triangle.A), math.degrees(triangle.B), math.degrees(triangle.C)]
+            shape = triangle.classifyShape()
+
+        steps = '<br>'.join(triangle.lawsUsed) if self.keepSteps and status == 'ok' else None
+
+        return (time.time(), law.value, status, shape,
+                inputs.get('a'), inputs.get('b'), inputs.get('c'),
+                inputs.get('A'), inputs.get('B'), inputs.get('C'),
+                *solved, triangle.errorMessage, steps)
+
+    def add(self, triangle, law, inputs):
+        '''
+        Stores a single solved triangle and returns its id.
+        '''
+        with self.connection: # commits the transaction (or rolls it back on error)
+            cursor = self.connection.execute(self.insertSql(), self.rowFromTriangle(triangle, law, inputs))
+        return cursor.lastrowid
+
+    def addMany(self, rows, chunkSize = 10000):
+        '''
+        Bulk inserts (triangle, law, inputs) tuples.
+        Rows are written in transactions of chunkSize rows, so a huge iterable never has to be held in memory
+        and each commit amortizes the fsync over many rows.
+        Returns the number of rows inserted.
+        '''
+        total = 0
+        chunk = []
+
+        for triangle, law, inputs in rows:
+            chunk.append(self.rowFromTriangle(triangle, law, inputs))
+            if len(chunk) >= chunkSize:
+                total += self.insertChunk(chunk)
+                chunk = []
+
+        if chunk:
+            total += self.insertChunk(chunk)
+
+        return total
+
+    def insertChunk(self, chunk):
+        '''
+        Inserts a list of row tuples in a single transaction.
+        '''
+        with self.connection:
+            self.connection.executemany(self.insertSql(), chunk)
+        return len(chunk)
+
+    def insertSql(self):
+        '''
+        Returns the INSERT statement for all columns except the id.
+        '''
+        columns = self.COLUMNS[1:]
+        return f'INSERT INTO triangles ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})'
+
+    def whereClause(self, law = None, status = None, shape = None):
+        '''
+        Builds the WHERE clause and its parameters for the indexed filter columns.
+        '''
+        conditions = []
+        params = []
+
+        for column, value in (('law', law.value if law is not None else None), ('status', status), ('shape', shape)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+
+        return conditions, params
+
+    def count(self, law = None, status = None, shape = None):
+        '''
+        Returns the number of stored triangles matching the filters.
+        '''
+        conditions, params = self.whereClause(law, status, shape)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        return self.connection.execute(f'SELECT COUNT(*) FROM triangles {where}', params).fetchone()[0]
+
+    def page(self, beforeId = None, limit = 50, law = None, status = None, shape = None, withSteps = False):
+        '''
+        Returns one page of triangles, newest first, as a list of dicts.
+        Paging is keyset based (id < beforeId) instead of OFFSET, so every page is an index range scan
+        no matter how deep into the history the user has scrolled.
+        The steps column is only fetched when asked for, since it is by far the largest.
+        '''
+        conditions, params = self.whereClause(law, status, shape)
+        if beforeId is not None:
+            conditions.append('id < ?')
+            params.append(beforeId)
+
+        columns = [column for column in self.COLUMNS if withSteps or column != 'steps']
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        query = f'SELECT {", ".join(columns)} FROM triangles {where} ORDER BY id DESC LIMIT ?'
+
+        rows = self.connection.execute(query, params + [limit]).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def steps(self, rowId):
+        '''
+        Returns the stored procedure of a single triangle (or None if it wasn't kept).
+        '''
+        row = self.connection.execute('SELECT steps FROM triangles WHERE id = ?', (rowId,)).fetchone()
+        return row[0] if row else None
@@ -1,8 +1,7 @@
 ﻿import math
-from PyQt5.QtWidgets import *
-from PyQt5.QtGui import *
-from PyQt5.QtCore import *
-from trig import Trigonometry, TrigLaw
+from PyQt5.QtCore import QPointF
+from trig import Trigonometry, TrigLaw, TrigCache
+from planner import LawPlanner
 
 class Triangle:
     '''
@@ -10,14 +9,24 @@ class Triangle:
     It is used to calculate the missing sides and angles of a triangle.
     It also calculates the vertices of the triangle based on the sides and angles.
     '''
-    def __init__(self, a=None, b=None, c=None, A=None, B=None, C=None, law=None):
+    def __init__(self, a=None, b=None, c=None, A=None, B=None, C=None, law=None,
+                 area=None, perimeter=None, ha=None, hb=None, hc=None, ma=None, mb=None, mc=None, weights=None):
         '''
         Initializes the triangle with the given sides and angles.
         It converts the angles from degrees to radians.
         It then calculates the missing sides and angles of the triangle.
+        Area, perimeter, altitudes (ha, hb, hc) and medians (ma, mb, mc) can be given too, then the sides are
+        solved numerically and the law is ignored. The same happens with more than three givens (redundant
+        measurements), which are fitted by least squares, optionally weighted by weights (dict of quantity -> weight).
         '''
         self.lawsUsed = [] # list of laws used to calculate the triangle
         self.errorMessage = None # error message to be displayed in the GUI
+        self.cache = TrigCache() # sines, cosines, degrees and squares shared by the solve and the step strings
+        self.weights = weights
+        self.residuals = None # computed minus given value of every measurement when it's fitted by least squares
+        self.otherGivens = {key: value for key, value in
+                            {'area': area, 'perimeter': perimeter, 'ha': ha, 'hb': hb, 'hc': hc, 'ma': ma, 'mb': mb, 'mc': mc}.items()
+                            if value is not None}
 
         self.a = a
         self.b = b
@@ -27,11 +36,16 @@ class Triangle:
         self.C = math.radians(C) if C is not None else None
         
         self.calculateTriangle(law)      
+        self.condition = self.cache.condition # how much the worst step amplified rounding, see TrigCache
 
     def calculateTriangle(self, law: TrigLaw):
         '''
         Calculates the missing sides and angles of the triangle using the chosen trigonometric law.
         '''
+        if self.otherGivens or sum(value is not None for value in (self.a, self.b, self.c, self.A, self.B, self.C)) > 3:
+            self.solveOtherGivens()
+            return
+
         try:
             sides = [self.a, self.b, self.c]
             angles = [self.A, self.B, self.C]
@@ -58,10 +72,11 @@ class Triangle:
                     self.solveSineLaw()
                 elif law == TrigLaw.COSINE_LAW:
                     self.solveCosineLaw()
+                elif law == TrigLaw.AUTO:
+                    self.solveAuto()
                     
                 if (self.A is not None and self.B is not None and self.C is not None):                     
-                    if abs(self.A) + abs(self.B) + abs(self.C) > math.pi:
-                        print(self.A, self.B, self.C)
+                    if abs(self.A) + abs(self.B) + abs(self.C) > math.pi + 1e-9: # angles from acos/asin can be off by some rounding
                         self.errorMessage = 'Angles can\'t add up to more than 180 degrees!'
             except ValueError as e:
                 self.errorMessage = 'Not correct dimensions for a triangle!'
@@ -73,9 +88,9 @@ class Triangle:
         '''
         Returns triangle sum theorem string to be displayed in the GUI.
         '''
-        angle1Val = self.formatValue(math.degrees(getattr(self, angle1)))
-        angle2Val = self.formatValue(math.degrees(getattr(self, angle2)))
-        angleCalcVal = self.formatValue(math.degrees(getattr(self, angleCalc)))
+        angle1Val = self.formatValue(self.cache.degrees(getattr(self, angle1)))
+        angle2Val = self.formatValue(self.cache.degrees(getattr(self, angle2)))
+        angleCalcVal = self.formatValue(self.cache.degrees(getattr(self, angleCalc)))
 
         return (
             f'We use the triangle sum theorem to calculate ∠{angleCalc}:<br>'
@@ -123,7 +138,7 @@ class Triangle:
         '''
         sideOppositeVal = self.formatValue(getattr(self, sideOpposite))
         sideCalcVal = self.formatValue(getattr(self, sideCalc))
-        knownAngleVal = self.formatValue(math.degrees(getattr(self, knownAngle)))
+        knownAngleVal = self.formatValue(self.cache.degrees(getattr(self, knownAngle)))
 
         return (
             f'We use SOH to calculate side {sideCalc}:<br>'
@@ -140,7 +155,7 @@ class Triangle:
         '''
         sideHypotenuseVal = self.formatValue(getattr(self, sideHypotenuse))
         sideCalcVal = self.formatValue(getattr(self, sideCalc))
-        knownAngleVal = self.formatValue(math.degrees(getattr(self, knownAngle)))
+        knownAngleVal = self.formatValue(self.cache.degrees(getattr(self, knownAngle)))
 
         return (
             f'We use SOH to calculate side {sideCalc}:<br>'
@@ -157,7 +172,7 @@ class Triangle:
         '''
         sideOppositeVal = self.formatValue(getattr(self, sideOpposite))
         sideHypotenuseVal = self.formatValue(getattr(self, sideHypotenuse))
-        angleCalcVal = self.formatValue(math.degrees(getattr(self, angleCalc)))
+        angleCalcVal = self.formatValue(self.cache.degrees(getattr(self, angleCalc)))
 
         return (
             f'We use SOH to calculate ∠{angleCalc}:<br>'
@@ -177,22 +192,22 @@ class Triangle:
 
         if self.B is None and self.C is None:
             if self.a is not None and self.b is not None:
-                self.B = Trigonometry.soh(h = self.a, o = self.b)
+                self.B = Trigonometry.soh(h = self.a, o = self.b, cache=self.cache)
                 self.C = Trigonometry.triangleSumTheorem(A=self.A, B=self.B)
-                self.c = Trigonometry.soh(h = self.a, theta = self.C)
+                self.c = Trigonometry.soh(h = self.a, theta = self.C, cache=self.cache)
                 self.lawsUsed.append(self.sohAngleString('b', 'a', 'B'))
                 self.lawsUsed.append(self.triangleSumTheoremString('A', 'B', 'C'))
                 self.lawsUsed.append(self.sohSideOString('a', 'c', 'C'))                
             elif self.a is not None and self.c is not None:
-                self.C = Trigonometry.soh(h = self.a, o = self.c)
+                self.C = Trigonometry.soh(h = self.a, o = self.c, cache=self.cache)
                 self.B = Trigonometry.triangleSumTheorem(A=self.A, B=self.C)
-                self.b = Trigonometry.soh(h = self.a, theta = self.B)  
+                self.b = Trigonometry.soh(h = self.a, theta = self.B, cache=self.cache)  
                 self.lawsUsed.append(self.sohAngleString('c', 'a', 'C'))
                 self.lawsUsed.append(self.triangleSumTheoremString('A', 'C', 'B'))
                 self.lawsUsed.append(self.sohSideOString('a', 'b', 'B'))             
             elif self.b is not None and self.c is not None:
-                self.a = Trigonometry.pythagorasTheorem(o = self.b, a = self.c)
-                self.B = Trigonometry.soh(h = self.a, o = self.b)
+                self.a = Trigonometry.pythagorasTheorem(o = self.b, a = self.c, cache=self.cache)
+                self.B = Trigonometry.soh(h = self.a, o = self.b, cache=self.cache)
                 self.C = Trigonometry.triangleSumTheorem(A=self.A, B=self.B)
                 self.lawsUsed.append(self.pythagorasTheoremPlusString('b', 'c', 'a'))
                 self.lawsUsed.append(self.sohAngleString('b', 'a', 'B'))
@@ -209,18 +224,18 @@ class Triangle:
                 self.lawsUsed.append(self.triangleSumTheoremString('A', 'B', 'C'))
 
             if self.a is not None:                
-                self.b = Trigonometry.soh(h = self.a, theta = self.B)
-                self.c = Trigonometry.soh(h = self.a, theta = self.C)
+                self.b = Trigonometry.soh(h = self.a, theta = self.B, cache=self.cache)
+                self.c = Trigonometry.soh(h = self.a, theta = self.C, cache=self.cache)
                 self.lawsUsed.append(self.sohSideHString('a', 'b', 'B'))
                 self.lawsUsed.append(self.sohSideHString('a', 'c', 'C'))                
             elif self.b is not None:                
-                self.a = Trigonometry.soh(o = self.b, theta=self.B)
-                self.c = Trigonometry.soh(h = self.a, theta=self.C)
+                self.a = Trigonometry.soh(o = self.b, theta=self.B, cache=self.cache)
+                self.c = Trigonometry.soh(h = self.a, theta=self.C, cache=self.cache)
                 self.lawsUsed.append(self.sohSideOString('b', 'a', 'A'))
                 self.lawsUsed.append(self.sohSideHString('a', 'c', 'C'))                
             elif self.c is not None:
-                self.a = Trigonometry.soh(o = self.c, theta = self.C)
-                self.b = Trigonometry.soh(h = self.a, theta = self.B)
+                self.a = Trigonometry.soh(o = self.c, theta = self.C, cache=self.cache)
+                self.b = Trigonometry.soh(h = self.a, theta = self.B, cache=self.cache)
                 self.lawsUsed.append(self.sohSideOString('c', 'a', 'A'))
                 self.lawsUsed.append(self.sohSideHString('a', 'b', 'B'))
             else:
@@ -237,7 +252,7 @@ class Triangle:
         '''
         sideAdjacentVal = self.formatValue(getattr(self, sideAdjacent))
         sideCalcVal = self.formatValue(getattr(self, sideCalc))
-        knownAngleVal = self.formatValue(math.degrees(getattr(self, knownAngle)))
+        knownAngleVal = self.formatValue(self.cache.degrees(getattr(self, knownAngle)))
 
         return (
             f'We use CAH to calculate side {sideCalc}:<br>'
@@ -254,7 +269,7 @@ class Triangle:
         '''
         sideHypotenuseVal = self.formatValue(getattr(self, sideHypotenuse))
         sideCalcVal = self.formatValue(getattr(self, sideCalc))
-        knownAngleVal = self.formatValue(math.degrees(getattr(self, knownAngle)))
+        knownAngleVal = self.formatValue(self.cache.degrees(getattr(self, knownAngle)))
 
         return (
             f'We use CAH to calculate side {sideCalc}:<br>'
@@ -271,7 +286,7 @@ class Triangle:
         '''
         sideAdjacentVal = self.formatValue(getattr(self, sideAdjacent))
         sideHypotenuseVal = self.formatValue(getattr(self, sideHypotenuse))
-        angleCalcVal = self.formatValue(math.degrees(getattr(self, angleCalc)))
+        angleCalcVal = self.formatValue(self.cache.degrees(getattr(self, angleCalc)))
 
         return (
             f'We use CAH to calculate ∠{angleCalc}:<br>'
@@ -291,22 +306,22 @@ class Triangle:
         
         if self.B is None and self.C is None:
             if self.a is not None and self.b is not None:
-                self.C = Trigonometry.cah(h = self.a, a = self.b)
+                self.C = Trigonometry.cah(h = self.a, a = self.b, cache=self.cache)
                 self.B = Trigonometry.triangleSumTheorem(A=self.A, B=self.C)
-                self.c = Trigonometry.cah(h = self.a, theta = self.B)
+                self.c = Trigonometry.cah(h = self.a, theta = self.B, cache=self.cache)
                 self.lawsUsed.append(self.cahAngleString('b', 'a', 'C'))
                 self.lawsUsed.append(self.triangleSumTheoremString('A', 'C', 'B'))
                 self.lawsUsed.append(self.cahSideAString('a', 'c', 'B'))
             elif self.a is not None and self.c is not None:
-                self.B = Trigonometry.cah(h = self.a, a = self.c)
+                self.B = Trigonometry.cah(h = self.a, a = self.c, cache=self.cache)
                 self.C = Trigonometry.triangleSumTheorem(A=self.A, B=self.B)
-                self.b = Trigonometry.cah(h = self.a, theta = self.C)
+                self.b = Trigonometry.cah(h = self.a, theta = self.C, cache=self.cache)
                 self.lawsUsed.append(self.cahAngleString('c', 'a', 'B'))
                 self.lawsUsed.append(self.triangleSumTheoremString('A', 'B', 'C'))
                 self.lawsUsed.append(self.cahSideAString('a', 'b', 'C'))
             elif self.b is not None and self.c is not None:
-                self.a = Trigonometry.pythagorasTheorem(o = self.b, a = self.c)
-                self.C = Trigonometry.cah(h = self.a, a = self.b)
+                self.a = Trigonometry.pythagorasTheorem(o = self.b, a = self.c, cache=self.cache)
+                self.C = Trigonometry.cah(h = self.a, a = self.b, cache=self.cache)
                 self.B = Trigonometry.triangleSumTheorem(A=self.A, B=self.C)
                 self.lawsUsed.append(self.pythagorasTheoremPlusString('b', 'c', 'a'))
                 self.lawsUsed.append(self.cahAngleString('b', 'a', 'C'))
@@ -319,18 +334,18 @@ class Triangle:
                 self.C = Trigonometry.triangleSumTheorem(A=self.A, B=self.B)
                 self.lawsUsed.append(self.triangleSumTheoremString('A', 'B', 'C'))
             if self.a is not None:
-                self.b = Trigonometry.cah(h = self.a, theta = self.C)
-                self.c = Trigonometry.cah(h = self.a, theta = self.B)
+                self.b = Trigonometry.cah(h = self.a, theta = self.C, cache=self.cache)
+                self.c = Trigonometry.cah(h = self.a, theta = self.B, cache=self.cache)
                 self.lawsUsed.append(self.cahSideAString('a', 'b', 'C'))
                 self.lawsUsed.append(self.cahSideAString('a', 'c', 'B'))
             elif self.b is not None:
-                self.a = Trigonometry.cah(a = self.b, theta = self.C)
-                self.c = Trigonometry.cah(h = self.a, theta = self.B)
+                self.a = Trigonometry.cah(a = self.b, theta = self.C, cache=self.cache)
+                self.c = Trigonometry.cah(h = self.a, theta = self.B, cache=self.cache)
                 self.lawsUsed.append(self.cahSideHString('b', 'a', 'C'))
                 self.lawsUsed.append(self.cahSideAString('a', 'c', 'B'))
             elif self.c is not None:
-                self.a = Trigonometry.cah(a = self.c, theta = self.B)
-                self.b = Trigonometry.cah(h = self.a, theta = self.C)
+                self.a = Trigonometry.cah(a = self.c, theta = self.B, cache=self.cache)
+                self.b = Trigonometry.cah(h = self.a, theta = self.C, cache=self.cache)
                 self.lawsUsed.append(self.cahSideHString('c', 'a', 'B'))
                 self.lawsUsed.append(self.cahSideAString('a', 'b', 'C'))
         else:
@@ -344,7 +359,7 @@ class Triangle:
         '''
         sideOppositeVal = self.formatValue(getattr(self, sideOpposite))
         sideCalcVal = self.formatValue(getattr(self, sideCalc))
-        knownAngleVal = self.formatValue(math.degrees(getattr(self, knownAngle)))
+        knownAngleVal = self.formatValue(self.cache.degrees(getattr(self, knownAngle)))
 
         return (
             f'We use TOA to calculate side {sideCalc}:<br>'
@@ -361,7 +376,7 @@ class Triangle:
         '''
         sideAdjacentVal = self.formatValue(getattr(self, sideAdjacent))
         sideCalcVal = self.formatValue(getattr(self, sideCalc))
-        knownAngleVal = self.formatValue(math.degrees(getattr(self, knownAngle)))
+        knownAngleVal = self.formatValue(self.cache.degrees(getattr(self, knownAngle)))
 
         return (
             f'We use TOA to calculate side {sideCalc}:<br>'
@@ -378,7 +393,7 @@ class Triangle:
         '''
         sideOppositeVal = self.formatValue(getattr(self, sideOpposite))
         sideAdjacentVal = self.formatValue(getattr(self, sideAdjacent))
-        angleCalcVal = self.formatValue(math.degrees(getattr(self, angleCalc)))
+        angleCalcVal = self.formatValue(self.cache.degrees(getattr(self, angleCalc)))
 
         return (
             f'We use TOA to calculate ∠{angleCalc}:<br>'
@@ -398,13 +413,13 @@ class Triangle:
             
         if self.B is None and self.C is None:
             if self.a is not None and self.b is not None:
-                self.c = Trigonometry.pythagorasTheorem(h = self.a, a = self.b)
+                self.c = Trigonometry.pythagorasTheorem(h = self.a, a = self.b, cache=self.cache)
                 self.lawsUsed.append(self.pythagorasTheoremMinusString('a', 'b', 'c'))                
             elif self.a is not None and self.c is not None:
-                self.b = Trigonometry.pythagorasTheorem(h = self.a, o = self.c)
+                self.b = Trigonometry.pythagorasTheorem(h = self.a, o = self.c, cache=self.cache)
                 self.lawsUsed.append(self.pythagorasTheoremMinusString('a', 'c', 'b'))                
             elif self.b is not None and self.c is not None:
-                self.a = Trigonometry.pythagorasTheorem(o = self.b, a = self.c)
+                self.a = Trigonometry.pythagorasTheorem(o = self.b, a = self.c, cache=self.cache)
                 self.lawsUsed.append(self.pythagorasTheoremPlusString('b', 'c', 'a'))
             self.B = Trigonometry.toa(o = self.b, a = self.c)
             self.C = Trigonometry.triangleSumTheorem(A=self.A, B=self.B)  
@@ -421,12 +436,12 @@ class Triangle:
                 self.errorMessage = 'Cannot calculate, use other law!'                
             elif self.b is not None:
                 self.c = Trigonometry.toa(o = self.b, theta = self.B)
-                self.a = Trigonometry.pythagorasTheorem(o = self.b, a = self.c)
+                self.a = Trigonometry.pythagorasTheorem(o = self.b, a = self.c, cache=self.cache)
                 self.lawsUsed.append(self.toaSideAString('b', 'c', 'B'))
                 self.lawsUsed.append(self.pythagorasTheoremPlusString('b', 'c', 'a'))
             elif self.c is not None:
                 self.b = Trigonometry.toa(o = self.c, theta = self.C)
-                self.a = Trigonometry.pythagorasTheorem(o = self.b, a = self.c)
+                self.a = Trigonometry.pythagorasTheorem(o = self.b, a = self.c, cache=self.cache)
                 self.lawsUsed.append(self.toaSideAString('c', 'b', 'C'))
                 self.lawsUsed.append(self.pythagorasTheoremPlusString('b', 'c', 'a'))
         else:
@@ -439,9 +454,9 @@ class Triangle:
         Calculates an angle using the sine law.
         '''
         side1Val = self.formatValue(getattr(self, side1))
-        angle1Val = self.formatValue(math.degrees(getattr(self, angle1)))
+        angle1Val = self.formatValue(self.cache.degrees(getattr(self, angle1)))
         side2Val = self.formatValue(getattr(self, side2))
-        angleCalcVal = self.formatValue(math.degrees(getattr(self, angleCalc)))
+        angleCalcVal = self.formatValue(self.cache.degrees(getattr(self, angleCalc)))
 
         return (
             f'We use the sine law to calculate ∠{angleCalc}:<br>'
@@ -458,8 +473,8 @@ class Triangle:
         Calculates a side using the sine law.
         '''
         side1Val = self.formatValue(getattr(self, side1))
-        angle1Val = self.formatValue(math.degrees(getattr(self, angle1)))
-        angle2Val = self.formatValue(math.degrees(getattr(self, angle2)))
+        angle1Val = self.formatValue(self.cache.degrees(getattr(self, angle1)))
+        angle2Val = self.formatValue(self.cache.degrees(getattr(self, angle2)))
         sideCalcVal = self.formatValue(getattr(self, sideCalc))
 
         return (
@@ -480,69 +495,69 @@ class Triangle:
             self.C = Trigonometry.triangleSumTheorem(A=self.A, B=self.B)
             self.lawsUsed.append(self.triangleSumTheoremString('A', 'B', 'C'))
             if self.a:
-                self.b = Trigonometry.sine(a=self.a, A=self.A, B=self.B)
-                self.c = Trigonometry.sine(a=self.a, A=self.A, B=self.C)
+                self.b = Trigonometry.sine(a=self.a, A=self.A, B=self.B, cache=self.cache)
+                self.c = Trigonometry.sine(a=self.a, A=self.A, B=self.C, cache=self.cache)
                 self.lawsUsed.append(self.sineLawSideString('a', 'A', 'B', 'b'))
                 self.lawsUsed.append(self.sineLawSideString('a', 'A', 'C', 'c'))
             elif self.b:
-                self.a = Trigonometry.sine(a=self.b, A=self.B, B=self.A)
-                self.c = Trigonometry.sine(a=self.b, A=self.B, B=self.C)
+                self.a = Trigonometry.sine(a=self.b, A=self.B, B=self.A, cache=self.cache)
+                self.c = Trigonometry.sine(a=self.b, A=self.B, B=self.C, cache=self.cache)
                 self.lawsUsed.append(self.sineLawSideString('b', 'B', 'A', 'a'))
                 self.lawsUsed.append(self.sineLawSideString('b', 'B', 'C', 'c'))
             elif self.c:
-                self.a = Trigonometry.sine(a=self.c, A=self.C, B=self.A)
-                self.b = Trigonometry.sine(a=self.c, A=self.C, B=self.B)
+                self.a = Trigonometry.sine(a=self.c, A=self.C, B=self.A, cache=self.cache)
+                self.b = Trigonometry.sine(a=self.c, A=self.C, B=self.B, cache=self.cache)
                 self.lawsUsed.append(self.sineLawSideString('c', 'C', 'A', 'a'))
                 self.lawsUsed.append(self.sineLawSideString('c', 'C', 'B', 'b'))            
         elif self.A and self.C and not self.B:
             self.B = Trigonometry.triangleSumTheorem(A=self.A, B=self.C)
             self.lawsUsed.append(self.triangleSumTheoremString('A', 'C', 'B'))
             if self.a:
-                self.b = Trigonometry.sine(a=self.a, A=self.A, B=self.B)
-                self.c = Trigonometry.sine(a=self.a, A=self.A, B=self.C)
+                self.b = Trigonometry.sine(a=self.a, A=self.A, B=self.B, cache=self.cache)
+                self.c = Trigonometry.sine(a=self.a, A=self.A, B=self.C, cache=self.cache)
                 self.lawsUsed.append(self.sineLawSideString('a', 'A', 'B', 'b'))
                 self.lawsUsed.append(self.sineLawSideString('a', 'A', 'C', 'c'))
             elif self.c:
-                self.a = Trigonometry.sine(a=self.c, A=self.C, B=self.A)
-                self.b = Trigonometry.sine(a=self.c, A=self.C, B=self.B)
+                self.a = Trigonometry.sine(a=self.c, A=self.C, B=self.A, cache=self.cache)
+                self.b = Trigonometry.sine(a=self.c, A=self.C, B=self.B, cache=self.cache)
                 self.lawsUsed.append(self.sineLawSideString('c', 'C', 'A', 'a'))
                 self.lawsUsed.append(self.sineLawSideString('c', 'C', 'B', 'b'))
             elif self.b:
-                self.a = Trigonometry.sine(a=self.b, A=self.B, B=self.A)
-                self.c = Trigonometry.sine(a=self.b, A=self.B, B=self.C)
+                self.a = Trigonometry.sine(a=self.b, A=self.B, B=self.A, cache=self.cache)
+                self.c = Trigonometry.sine(a=self.b, A=self.B, B=self.C, cache=self.cache)
                 self.lawsUsed.append(self.sineLawSideString('b', 'B', 'A', 'a'))
                 self.lawsUsed.append(self.sineLawSideString('b', 'B', 'C', 'c'))
         elif self.B and self.C and not self.A:
             self.A = Trigonometry.triangleSumTheorem(A=self.B, B=self.C)
             self.lawsUsed.append(self.triangleSumTheoremString('B', 'C', 'A'))
             if self.b:
-                self.a = Trigonometry.sine(a=self.b, A=self.B, B=self.A)
-                self.c = Trigonometry.sine(a=self.b, A=self.B, B=self.C)
+                self.a = Trigonometry.sine(a=self.b, A=self.B, B=self.A, cache=self.cache)
+                self.c = Trigonometry.sine(a=self.b, A=self.B, B=self.C, cache=self.cache)
                 self.lawsUsed.append(self.sineLawSideString('b', 'B', 'A', 'a'))
                 self.lawsUsed.append(self.sineLawSideString('b', 'B', 'C', 'c'))
             elif self.c:
-                self.a = Trigonometry.sine(a=self.c, A=self.C, B=self.A)
-                self.b = Trigonometry.sine(a=self.c, A=self.C, B=self.B)
+                self.a = Trigonometry.sine(a=self.c, A=self.C, B=self.A, cache=self.cache)
+                self.b = Trigonometry.sine(a=self.c, A=self.C, B=self.B, cache=self.cache)
                 self.lawsUsed.append(self.sineLawSideString('c', 'C', 'A', 'a'))
                 self.lawsUsed.append(self.sineLawSideString('c', 'C', 'B', 'b'))
             elif self.a:
-                self.b = Trigonometry.sine(a=self.a, A=self.A, B=self.B)
-                self.c = Trigonometry.sine(a=self.a, A=self.A, B=self.C)
+                self.b = Trigonometry.sine(a=self.a, A=self.A, B=self.B, cache=self.cache)
+                self.c = Trigonometry.sine(a=self.a, A=self.A, B=self.C, cache=self.cache)
                 self.lawsUsed.append(self.sineLawSideString('a', 'A', 'B', 'b'))
                 self.lawsUsed.append(self.sineLawSideString('a', 'A', 'C', 'c'))
             
         elif self.a and self.b and not self.c:
             if self.A:
-                self.B = Trigonometry.sine(a=self.a, A=self.A, b=self.b)
+                self.B = Trigonometry.sine(a=self.a, A=self.A, b=self.b, cache=self.cache)
                 self.C = Trigonometry.triangleSumTheorem(A=self.A, B=self.B)
-                self.c = Trigonometry.sine(a=self.a, A=self.A, B=self.C)
+                self.c = Trigonometry.sine(a=self.a, A=self.A, B=self.C, cache=self.cache)
                 self.lawsUsed.append(self.sineLawAngleString('a', 'A', 'b', 'B'))
                 self.lawsUsed.append(self.triangleSumTheoremString('A', 'B', 'C'))
                 self.lawsUsed.append(self.sineLawSideString('a', 'A', 'C', 'c'))
             elif self.B:
-                self.A = Trigonometry.sine(a=self.b, A=self.B, b=self.a)
+                self.A = Trigonometry.sine(a=self.b, A=self.B, b=self.a, cache=self.cache)
                 self.C = Trigonometry.triangleSumTheorem(A=self.A, B=self.B)
-                self.c = Trigonometry.sine(a=self.a, A=self.A, B=self.C)
+                self.c = Trigonometry.sine(a=self.a, A=self.A, B=self.C, cache=self.cache)
                 self.lawsUsed.append(self.sineLawAngleString('b', 'B', 'a', 'A'))
                 self.lawsUsed.append(self.triangleSumTheoremString('A', 'B', 'C'))
                 self.lawsUsed.append(self.sineLawSideString('a', 'A', 'C', 'c'))
@@ -550,16 +565,16 @@ class Triangle:
                 self.errorMessage = 'Cannot calculate, use other law!'                
         elif self.a and self.c and not self.b:
             if self.A:
-                self.C = Trigonometry.sine(a=self.a, A=self.A, b=self.c)
+                self.C = Trigonometry.sine(a=self.a, A=self.A, b=self.c, cache=self.cache)
                 self.B = Trigonometry.triangleSumTheorem(A=self.A, B=self.C)
-                self.b = Trigonometry.sine(a=self.c, A=self.C, B=self.B)
+                self.b = Trigonometry.sine(a=self.c, A=self.C, B=self.B, cache=self.cache)
                 self.lawsUsed.append(self.sineLawAngleString('a', 'A', 'c', 'C'))
                 self.lawsUsed.append(self.triangleSumTheoremString('A', 'C', 'B'))
                 self.lawsUsed.append(self.sineLawSideString('c', 'C', 'B', 'b'))
             elif self.C:
-                self.A = Trigonometry.sine(a=self.c, A=self.C, b=self.a)
+                self.A = Trigonometry.sine(a=self.c, A=self.C, b=self.a, cache=self.cache)
                 self.B = Trigonometry.triangleSumTheorem(A=self.A, B=self.C)
-                self.b = Trigonometry.sine(a=self.c, A=self.C, B=self.B)
+                self.b = Trigonometry.sine(a=self.c, A=self.C, B=self.B, cache=self.cache)
                 self.lawsUsed.append(self.sineLawAngleString('c', 'C', 'a', 'A'))
                 self.lawsUsed.append(self.triangleSumTheoremString('A', 'C', 'B'))
                 self.lawsUsed.append(self.sineLawSideString('c', 'C', 'B', 'b'))
@@ -567,16 +582,16 @@ class Triangle:
                 self.errorMessage = 'Cannot calculate, use other law!'                 
         elif self.b and self.c and not self.a:
             if self.B:
-                self.C = Trigonometry.sine(a=self.b, A=self.B, b=self.c)
+                self.C = Trigonometry.sine(a=self.b, A=self.B, b=self.c, cache=self.cache)
                 self.A = Trigonometry.triangleSumTheorem(A=self.B, B=self.C)
-                self.a = Trigonometry.sine(a=self.c, A=self.C, B=self.A)
+                self.a = Trigonometry.sine(a=self.c, A=self.C, B=self.A, cache=self.cache)
                 self.lawsUsed.append(self.sineLawAngleString('b', 'B', 'c', 'C'))
                 self.lawsUsed.append(self.triangleSumTheoremString('B', 'C', 'A'))
                 self.lawsUsed.append(self.sineLawSideString('c', 'C', 'A', 'a'))
             elif self.C:
-                self.B = Trigonometry.sine(a=self.c, A=self.C, b=self.b)
+                self.B = Trigonometry.sine(a=self.c, A=self.C, b=self.b, cache=self.cache)
                 self.A = Trigonometry.triangleSumTheorem(A=self.B, B=self.C)
-                self.a = Trigonometry.sine(a=self.c, A=self.C, B=self.A)
+                self.a = Trigonometry.sine(a=self.c, A=self.C, B=self.A, cache=self.cache)
                 self.lawsUsed.append(self.sineLawAngleString('c', 'C', 'b', 'B'))
                 self.lawsUsed.append(self.triangleSumTheoremString('B', 'C', 'A'))
                 self.lawsUsed.append(self.sineLawSideString('c', 'C', 'A', 'a'))  
@@ -594,7 +609,7 @@ class Triangle:
         sideOpposite1Val = self.formatValue(getattr(self, sideOpposite1))
         sideOpposite2Val = self.formatValue(getattr(self, sideOpposite2))
         sideCorrespondingVal = self.formatValue(getattr(self, sideCorresponding))
-        angleCalcVal = self.formatValue(math.degrees(getattr(self, angleCalc)))
+        angleCalcVal = self.formatValue(self.cache.degrees(getattr(self, angleCalc)))
 
         return (
             f'We use the cosine law to calculate ∠{angleCalc}:<br>'
@@ -612,7 +627,7 @@ class Triangle:
         '''
         side1Val = self.formatValue(getattr(self, side1))
         side2Val = self.formatValue(getattr(self, side2))
-        angleCorrespondingVal = self.formatValue(math.degrees(getattr(self, angleCorresponding)))
+        angleCorrespondingVal = self.formatValue(self.cache.degrees(getattr(self, angleCorresponding)))
         sideCalcVal = self.formatValue(getattr(self, sideCalc))
 
         return (
@@ -630,41 +645,131 @@ class Triangle:
         We can solve SAS, SSS using cosine law alone but not for ASA, AAS and SSA.
         '''
         if self.a is not None and self.b is not None and self.c is not None:  
-            self.A = Trigonometry.cosine(a=self.b, b=self.c, c=self.a)            
-            self.B = Trigonometry.cosine(a=self.c, b=self.a, c=self.b)
-            self.C = Trigonometry.cosine(a=self.a, b=self.b, c=self.c)
+            self.A = Trigonometry.cosine(a=self.b, b=self.c, c=self.a, cache=self.cache)            
+            self.B = Trigonometry.cosine(a=self.c, b=self.a, c=self.b, cache=self.cache)
+            self.C = Trigonometry.cosine(a=self.a, b=self.b, c=self.c, cache=self.cache)
             self.lawsUsed.append(self.cosineLawAngleString('b', 'c', 'a', 'A'))
             self.lawsUsed.append(self.cosineLawAngleString('c', 'a', 'b', 'B'))
             self.lawsUsed.append(self.cosineLawAngleString('a', 'b', 'c', 'C'))
         elif self.a is not None and self.b is not None and self.C is not None:
-            self.c = Trigonometry.cosine(a=self.a, b=self.b, C=self.C)
-            self.A = Trigonometry.cosine(a=self.b, b=self.c, c=self.a)
-            self.B = Trigonometry.cosine(a=self.c, b=self.a, c=self.b)
+            self.c = Trigonometry.cosine(a=self.a, b=self.b, C=self.C, cache=self.cache)
+            self.A = Trigonometry.cosine(a=self.b, b=self.c, c=self.a, cache=self.cache)
+            self.B = Trigonometry.cosine(a=self.c, b=self.a, c=self.b, cache=self.cache)
             self.lawsUsed.append(self.cosineLawSideString('a', 'b', 'C', 'c'))
             self.lawsUsed.append(self.cosineLawAngleString('b', 'c', 'a', 'A'))
             self.lawsUsed.append(self.cosineLawAngleString('c', 'a', 'b', 'B'))
         elif self.a is not None and self.c is not None and self.B is not None:
-            self.b = Trigonometry.cosine(a=self.a, b=self.c, C=self.B)
-            self.A = Trigonometry.cosine(a=self.b, b=self.c, c=self.a)
-            self.C = Trigonometry.cosine(a=self.a, b=self.b, c=self.c)
+            self.b = Trigonometry.cosine(a=self.a, b=self.c, C=self.B, cache=self.cache)
+            self.A = Trigonometry.cosine(a=self.b, b=self.c, c=self.a, cache=self.cache)
+            self.C = Trigonometry.cosine(a=self.a, b=self.b, c=self.c, cache=self.cache)
             self.lawsUsed.append(self.cosineLawSideString('a', 'c', 'B', 'b'))
             self.lawsUsed.append(self.cosineLawAngleString('b', 'c', 'a', 'A'))
             self.lawsUsed.append(self.cosineLawAngleString('a', 'b', 'c', 'C'))
         elif self.b is not None and self.c is not None and self.A is not None:
-            self.a = Trigonometry.cosine(a=self.b, b=self.c, C=self.A)
-            self.B = Trigonometry.cosine(a=self.c, b=self.a, c=self.b)
-            self.C = Trigonometry.cosine(a=self.a, b=self.b, c=self.c)
+            self.a = Trigonometry.cosine(a=self.b, b=self.c, C=self.A, cache=self.cache)
+            self.B = Trigonometry.cosine(a=self.c, b=self.a, c=self.b, cache=self.cache)
+            self.C = Trigonometry.cosine(a=self.a, b=self.b, c=self.c, cache=self.cache)
             self.lawsUsed.append(self.cosineLawSideString('b', 'c', 'A', 'a'))
             self.lawsUsed.append(self.cosineLawAngleString('c', 'a', 'b', 'B'))
             self.lawsUsed.append(self.cosineLawAngleString('a', 'b', 'c', 'C'))  
         else:
             self.errorMessage = 'Cannot calculate, use other law!'
 
+    def solveOtherGivens(self):
+        '''
+        Solves the triangle when area, perimeter, altitudes or medians are among the givens, or when there are more
+        than three givens.
+        The sides are found with the GivensSolver (Gauss-Newton on the nonlinear system, a least squares fit when
+        it's overdetermined) and the angles then follow from the cosine law, so the procedure and drawing work
+        like for any SSS triangle.
+        '''
+        from givens import GivensSolver # imports numpy, which only this path needs
+
+        givens = dict(self.otherGivens)
+        givens.update({key: getattr(self, key) for key in ('a', 'b', 'c') if getattr(self, key) is not None})
+        givens.update({key: self.cache.degrees(getattr(self, key)) for key in ('A', 'B', 'C') if getattr(self, key) is not None})
+
+        if len(givens) < 3:
+            self.errorMessage = 'Need at least 3 properties to define a unique triangle!'
+            return
+
+        result = GivensSolver.solveOneWithResiduals(weights=self.weights, **givens)
+        if result is None:
+            self.errorMessage = 'Could not find a triangle with the given properties!'
+            return
+
+        sides, residuals = result
+        if len(givens) > 3:
+            self.residuals = residuals
+        self.a, self.b, self.c = (float(side) for side in sides)
+        self.A = self.B = self.C = None
+        self.lawsUsed.append(self.otherGivensString(givens))
+
+        try:
+            self.solveCosineLaw()
+        except ValueError:
+            self.errorMessage = 'Not correct dimensions for a triangle!'
+
+    def otherGivensString(self, givens):
+        '''
+        Returns the string describing the numerical solve to be displayed in the GUI.
+        '''
+        names = {'area': 'Area', 'perimeter': 'Perimeter', 'ha': 'hₐ', 'hb': 'h_b', 'hc': 'h_c',
+                 'ma': 'mₐ', 'mb': 'm_b', 'mc': 'm_c', 'A': '∠A', 'B': '∠B', 'C': '∠C'}
+        knownVals = ', '.join(f'{names.get(key, key)} = {self.formatValue(value)}' for key, value in givens.items())
+
+        if self.residuals is None:
+            return (
+                f'We solve for the sides numerically (Newton\'s method) from:<br>'
+                f'{knownVals}<br>'
+                f'=> a = {self.formatValue(self.a)}, b = {self.formatValue(self.b)}, c = {self.formatValue(self.c)}<br>'
+            )
+
+        residualVals = '<br>'.join(f'{names.get(key, key)}: {value:+.4g}{"°" if key in ("A", "B", "C") else ""}'
+                                   for key, value in self.residuals.items())
+        return (
+            f'There are more givens than needed, so we fit the sides by {"weighted " if self.weights else ""}least squares (Gauss-Newton) to:<br>'
+            f'{knownVals}<br>'
+            f'=> a = {self.formatValue(self.a)}, b = {self.formatValue(self.b)}, c = {self.formatValue(self.c)}<br>'
+            f'Residuals (fitted - given):<br>'
+            f'{residualVals}<br>'
+        )
+
+    def solveAuto(self):
+        '''
+        Solves the triangle with the plan the LawPlanner picks for the known quantities.
+        The plan can mix operations of different laws, it's the cheapest and best conditioned way to get every unknown.
+        Sets an error message if the known quantities can't be solved by any law.
+        '''
+        values = {'a': self.a, 'b': self.b, 'c': self.c, 'A': self.A, 'B': self.B, 'C': self.C}
+        self.plan = LawPlanner.planFor(values)
+
+        if self.plan is None:
+            self.errorMessage = 'Cannot calculate, not enough properties for any law!'
+            return
+
+        for step in self.plan:
+            values[step.target] = step.solve(values, self.cache)
+            setattr(self, step.target, values[step.target])
+            self.lawsUsed.append(getattr(self, step.stringMethod)(*step.stringArgs))
+
     def formatValue(self, value):
         '''
         Formats the value to two decimal places if it is not a whole number.
         '''
-        return f'{value:.2f}' if value != round(value) else str(int(value))   
+        return f'{value:.2f}' if value != round(value) else str(int(value))
+
+    def classifyShape(self, tolerance = 1e-9):
+        '''
+        Classifies a solved triangle by its largest angle as 'right', 'obtuse' or 'acute'.
+        '''
+        largestAngle = max(self.A, self.B, self.C)
+
+        if abs(largestAngle - math.pi/2) <= tolerance:
+            return 'right'
+        elif largestAngle > math.pi/2:
+            return 'obtuse'
+        return 'acute'
     
         
     def calculateVertices(self):
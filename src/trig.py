@@ -10,6 +10,124 @@ class TrigLaw(Enum):
     TOA = 'TOA'
     SINE_LAW = 'Sine Law'
     COSINE_LAW = 'Cosine Law'
+    AUTO = 'Auto'
+    SPHERICAL_SINE_LAW = 'Spherical Sine Law'
+    SPHERICAL_COSINE_LAW = 'Spherical Cosine Law'
+    NAPIER = 'Napier\'s Rules'
+
+SPHERICAL_LAWS = (TrigLaw.SPHERICAL_SINE_LAW, TrigLaw.SPHERICAL_COSINE_LAW, TrigLaw.NAPIER) # solved on a sphere by SphericalTriangle
+
+# asin/acos arguments past ±1 by at most this much are treated as rounding, not as an impossible triangle
+DOMAIN_ROUNDING = 1e-12
+
+class TrigFunctions:
+    '''
+    Class with the functions Trigonometry takes its sine, cosine, degrees, squares, inverse sines and cosines and
+    square roots of differences from, uncached.
+    It doesn't estimate the condition of the solve, it's always reported as 1 (well conditioned).
+    '''
+    condition = 1.0
+
+    def sin(self, x):
+        return math.sin(x)
+
+    def cos(self, x):
+        return math.cos(x)
+
+    def degrees(self, x):
+        return math.degrees(x)
+
+    def square(self, x):
+        return x ** 2
+
+    def asin(self, x):
+        return math.asin(x)
+
+    def acos(self, x):
+        return math.acos(x)
+
+    def sqrtDifference(self, positive, negative):
+        '''
+        Returns sqrt(positive - negative), where both are positive and close to each other when the result is small.
+        '''
+        return math.sqrt(positive - negative)
+
+class TrigCache(TrigFunctions):
+    '''
+    Class that caches sines, cosines, degrees and squares by value for the duration of one solve.
+    A solve keeps using the same few values, e.g. the sine law takes sin(A) once for every side it calculates,
+    the cosine law squares the same sides for every angle and the procedure strings convert every angle to degrees
+    a few times. A Triangle shares one cache between its solve and its step strings, so each value is computed once.
+    It also estimates the condition of the solve: how much the steps that lose precision in float (asin/acos near ±1,
+    square roots of nearly equal terms) amplify the rounding of their arguments, the worst step counts.
+    It's inf when an argument was past the domain by rounding only, the solve failed but might not have in exact
+    arithmetic (see adaptive.py).
+    '''
+    def __init__(self):
+        self.sines = {}
+        self.cosines = {}
+        self.degreeValues = {}
+        self.squares = {}
+        self.condition = 1.0
+
+    def sin(self, x):
+        try:
+            return self.sines[x]
+        except KeyError:
+            value = self.sines[x] = math.sin(x)
+            return value
+
+    def cos(self, x):
+        try:
+            return self.cosines[x]
+        except KeyError:
+            value = self.cosines[x] = math.cos(x)
+            return value
+
+    def degrees(self, x):
+        try:
+            return self.degreeValues[x]
+        except KeyError:
+            value = self.degreeValues[x] = math.degrees(x)
+            return value
+
+    def square(self, x):
+        try:
+            return self.squares[x]
+        except KeyError:
+            value = self.squares[x] = x ** 2
+            return value
+
+    def inverseCondition(self, x, inverse):
+        '''
+        Notes the condition of an asin/acos at x: |x| / (sqrt(1 - x²) * |angle|), then returns the angle.
+        Past ±1 it raises the ValueError of math like it always did.
+        '''
+        if abs(x) > 1:
+            if abs(x) <= 1 + DOMAIN_ROUNDING:
+                self.condition = math.inf
+            return inverse(x)
+        angle = inverse(x)
+        remainder = 1 - x * x
+        self.condition = max(self.condition, abs(x) / (math.sqrt(remainder) * abs(angle)) if remainder and angle else math.inf)
+        return angle
+
+    def asin(self, x):
+        return self.inverseCondition(x, math.asin)
+
+    def acos(self, x):
+        return self.inverseCondition(x, math.acos)
+
+    def sqrtDifference(self, positive, negative):
+        difference = positive - negative
+        if difference < 0:
+            if -difference <= DOMAIN_ROUNDING * positive:
+                self.condition = math.inf
+        else:
+            self.condition = max(self.condition, 0.5 * (positive + negative) / difference if difference else math.inf)
+        return math.sqrt(difference)
+
+UNCACHED = TrigFunctions() # what the Trigonometry helpers use when they aren't given a cache
 
 class Trigonometry:
     '''
@@ -18,18 +136,20 @@ class Trigonometry:
     - Triangle Sum Theorem
     - SOHCAHTOA
     - Sine Rule and Cosine Rule    
+    The helpers that take sines, cosines or squares optionally take a TrigCache to get them from.
     '''
     @staticmethod
-    def pythagorasTheorem(o = None, a = None, h = None):
+    def pythagorasTheorem(o = None, a = None, h = None, cache = None):
         '''
         Solves for the missing side of a right angled triangle using pythagoras theorem.
         '''
+        cache = cache or UNCACHED
         if o is None:
-            return math.sqrt(h ** 2 - a ** 2)
+            return cache.sqrtDifference(cache.square(h), cache.square(a))
         elif a is None:
-            return math.sqrt(h ** 2 - o ** 2)
+            return cache.sqrtDifference(cache.square(h), cache.square(o))
         elif h is None:
-            return math.sqrt(o ** 2 + a ** 2)
+            return math.sqrt(cache.square(o) + cache.square(a))
 
     @staticmethod
     def triangleSumTheorem(A,B):
@@ -39,34 +159,36 @@ class Trigonometry:
         return math.pi - (A + B)
     
     @staticmethod
-    def soh(o = None, h = None, theta = None):
+    def soh(o = None, h = None, theta = None, cache = None):
         '''
         Solves for the opposite, hypotenuse or angle of a right angled triangle using SOH.
         It takes in two of them as arguments and returns the third.
         '''
+        cache = cache or UNCACHED
         if theta is not None:
            if o is not None:
-               return o / math.sin(theta)
+               return o / cache.sin(theta)
            elif h is not None:
-               return h * math.sin(theta)
+               return h * cache.sin(theta)
         elif o is not None and h is not None:
-            return math.asin(o/h)
+            return cache.asin(o/h)
         else:
             raise ValueError('Insufficient info')
     
     @staticmethod
-    def cah(a = None, h = None, theta = None):
+    def cah(a = None, h = None, theta = None, cache = None):
         '''
         Solves for the adjacent, hypotenuse or angle of a right angled triangle using CAH.
         It takes in two of them as arguments and returns the third.
         '''
+        cache = cache or UNCACHED
         if theta is not None:
            if a is not None:
-               return a / math.cos(theta)
+               return a / cache.cos(theta)
            elif h is not None:
-               return h * math.cos(theta)
+               return h * cache.cos(theta)
         elif a is not None and h is not None:
-            return math.acos(a/h)
+            return cache.acos(a/h)
         else:
             raise ValueError('Insufficient info')
         
@@ -87,27 +209,29 @@ class Trigonometry:
             raise ValueError('Insufficient info')
     
     @staticmethod
-    def sine(a = None, A = None, b = None, B = None):
+    def sine(a = None, A = None, b = None, B = None, cache = None):
         '''
         Solves for an unknown side or angle of a triangle using the sine rule.
         It takes in a side and its corresponding angle, other side or angle as arguments and returns the unknown side or angle.
         '''        
+        cache = cache or UNCACHED
         if a and A and b and not B:   
-            return math.asin(b * math.sin(A)/a)           
+            return cache.asin(b * cache.sin(A)/a)           
         elif a and A and B and not b:
-            return a * math.sin(B) / math.sin(A)  
+            return a * cache.sin(B) / cache.sin(A)  
         else:
             raise ValueError('Insufficient info')
         
     @staticmethod
-    def cosine(a = None, b = None, c = None, C = None):
+    def cosine(a = None, b = None, c = None, C = None, cache = None):
         '''
         Solves for an unknown side or angle of a triangle using the cosine rule.
         It takes in two sides and their included angle or three sides as arguments and returns the unknown side or angle.
         '''
+        cache = cache or UNCACHED
         if a and b and C and not c:   
-            return math.sqrt(a ** 2 + b ** 2 - 2 * a * b * math.cos(C))           
+            return cache.sqrtDifference(cache.square(a) + cache.square(b), 2 * a * b * cache.cos(C))           
         elif a and b and c and not C:
-            return math.acos((a ** 2 + b ** 2 - c ** 2) / (2 * a * b))
+            return cache.acos((cache.square(a) + cache.square(b) - cache.square(c)) / (2 * a * b))
         else:
             raise ValueError('Insufficient info')
\ No newline at end of file
@@ -0,0 +1,58 @@
+import time
+from collections import deque
+from PyQt5.QtCore import QTimer, pyqtSignal
+from PyQt5.QtGui import QPainter
+from PyQt5.QtWidgets import QGraphicsItem, QGraphicsView
+
+class TriangleView(QGraphicsView):
+    '''
+    Graphics view the triangle is drawn in.
+    It can be resized with the window: the drawing size is taken from the viewport (in device independent pixels,
+    Qt multiplies by the device pixel ratio when it rasterizes) and a resize asks for a redraw once the user has
+    stopped dragging. Every item is cached as a pixmap in device coordinates, so exposes and scrolls just blit
+    the cached pixmaps instead of rasterizing the text and arcs again.
+    It also keeps the duration of the last repaints to measure the drawing cost.
+    '''
+    resized = pyqtSignal() # emitted once the size has settled after a resize
+    RESIZE_DELAY = 50 # milliseconds without a resize event before resized is emitted
+
+    def __init__(self, parent = None, cached = True):
+        super().__init__(parent)
+        self.cached = cached
+        self.paintTimes = deque(maxlen=1000) # seconds per paintEvent
+
+        self.setRenderHint(QPainter.Antialiasing)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self.setOptimizationFlag(QGraphicsView.DontSavePainterState) # every item restores its own pen and brush
+        if cached:
+            self.setCacheMode(QGraphicsView.CacheBackground)
+
+        self.resizeTimer = QTimer(self)
+        self.resizeTimer.setSingleShot(True)
+        self.resizeTimer.setInterval(self.RESIZE_DELAY)
+        self.resizeTimer.timeout.connect(self.resized.emit)
+
+    def drawingSize(self):
+        '''
+        Returns the size (in device independent pixels) the drawing should fit in, with some margin for the labels.
+        '''
+        viewport = self.viewport().size()
+        return round(min(viewport.width(), viewport.height()) / 1.5)
+
+    def cacheItems(self):
+        '''
+        Turns on the pixmap cache of every item in the scene, call it once the scene is built.
+        '''
+        if not self.cached or not self.scene():
+            return
+        for item in self.scene().items():
+            item.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resizeTimer.start() # restarts while the user drags, so the triangle is redrawn once
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        super().paintEvent(event)
+        self.paintTimes.append(time.perf_counter() - start)
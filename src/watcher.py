@@ -0,0 +1,217 @@
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from collections import deque
+from givens import QUANTITIES
+from solver import solveChunk
+from trig import TrigLaw
+
+OUTPUT_SUFFIX = '.solved.csv'
+CHECKPOINT_FILE = '.checkpoints.json'
+SOLVED_COLUMNS = ['solved_a', 'solved_b', 'solved_c', 'solved_A', 'solved_B', 'solved_C', 'error']
+INPUT_COLUMNS = QUANTITIES + ('law',) # other columns (ids, timestamps, ...) are copied to the output but not solved
+LATENCY_WINDOW = 10000 # chunks the latency percentiles are taken over
+
+class FolderWatcher:
+    '''
+    Class that watches a directory for CSV files of triangle measurements and solves the rows appended to them.
+    Results are written next to each input as <name>.solved.csv.
+    For every file it keeps a checkpoint with the byte offset it has read up to and the size of the output at
+    that point. Checkpoints are replaced atomically after the output is flushed, so after a crash the output is
+    truncated back to the checkpoint and the rows after it are solved again, nothing is lost or written twice.
+    '''
+    def __init__(self, directory, law = TrigLaw.AUTO, interval = 1.0, maxBytes = 1 << 20):
+        '''
+        maxBytes bounds how much of a file is read (and held in memory) at once.
+        '''
+        self.directory = directory
+        self.law = law
+        self.interval = interval
+        self.maxBytes = maxBytes
+        self.checkpointPath = os.path.join(directory, CHECKPOINT_FILE)
+        self.checkpoints = self.loadCheckpoints()
+
+        self.rowsSolved = 0
+        self.solveTime = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW) # seconds from a row's file being modified to its result being written, one per recent chunk
+        self.started = time.perf_counter()
+
+    def loadCheckpoints(self):
+        '''
+        Loads the checkpoints of the previous run, if any.
+        '''
+        try:
+            with open(self.checkpointPath) as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def saveCheckpoints(self):
+        '''
+        Writes the checkpoints to a temporary file and swaps it in, so the file on disk is always complete.
+        '''
+        temporaryPath = self.checkpointPath + '.tmp'
+        with open(temporaryPath, 'w') as file:
+            json.dump(self.checkpoints, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporaryPath, self.checkpointPath)
+
+    def inputFiles(self):
+        '''
+        Returns the names of the CSV files in the directory that are inputs (not our own outputs).
+        '''
+        return sorted(name for name in os.listdir(self.directory)
+                      if name.endswith('.csv') and not name.endswith(OUTPUT_SUFFIX))
+
+    def pollOnce(self):
+        '''
+        Processes whatever was appended to every input file since the last checkpoint.
+        Returns the number of rows solved.
+        '''
+        solved = 0
+        for name in self.inputFiles():
+            solved += self.processFile(name)
+        return solved
+
+    def processFile(self, name):
+        '''
+        Solves the complete lines appended to a file since its checkpoint, at most maxBytes at a time.
+        A last line without a newline is left for the next poll, the producer is probably still writing it.
+        '''
+        inputPath = os.path.join(self.directory, name)
+        outputPath = inputPath[:-len('.csv')] + OUTPUT_SUFFIX
+        checkpoint = self.checkpoints.get(name, {'offset': 0, 'outputSize': 0, 'header': None})
+
+        size = os.path.getsize(inputPath)
+        if size < checkpoint['offset']: # the file was truncated or replaced, start over
+            checkpoint = {'offset': 0, 'outputSize': 0, 'header': None}
+        if size == checkpoint['offset']:
+            return 0
+
+        solved = 0
+        with open(inputPath, 'rb') as inputFile:
+            while True:
+                inputFile.seek(checkpoint['offset'])
+                block = inputFile.read(self.maxBytes)
+                end = block.rfind(b'\n')
+                if end < 0:
+                    if len(block) >= self.maxBytes:
+                        raise ValueError(f'{name}: a line is longer than {self.maxBytes} bytes')
+                    break
+
+                block = block[:end + 1]
+                lines = block.decode('utf-8').splitlines()
+                if checkpoint['header'] is None:
+                    checkpoint['header'] = next(csv.reader([lines.pop(0)]))
+
+                modified = os.path.getmtime(inputPath)
+                solved += self.solveLines(lines, checkpoint, outputPath)
+                self.latencies.append(time.time() - modified)
+
+                checkpoint['offset'] += len(block)
+                self.checkpoints[name] = checkpoint
+                self.saveCheckpoints()
+
+        return solved
+
+    def solveLines(self, lines, checkpoint, outputPath):
+        '''
+        Solves the CSV lines and appends the results to the output, returns the number of rows solved.
+        The output is first truncated to the size recorded in the checkpoint, which drops anything a crashed
+        run wrote after its last checkpoint.
+        '''
+        header = checkpoint['header']
+        records = [values + [''] * (len(header) - len(values)) for values in csv.reader(lines) if any(value.strip() for value in values)]
+        rows = []
+        for values in records:
+            try:
+                rows.append({key: self.parseValue(key, value) for key, value in zip(header, values) if key in INPUT_COLUMNS and value.strip()})
+            except ValueError:
+                rows.append(None) # a malformed row gets an error in the output instead of stopping the daemon
+
+        start = time.perf_counter()
+        results = iter(solveChunk([row for row in rows if row is not None], self.law))
+        self.solveTime += time.perf_counter() - start
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        if checkpoint['outputSize'] == 0:
+            writer.writerow(header + SOLVED_COLUMNS)
+        for values, row in zip(records, rows):
+            if row is None:
+                writer.writerow(values + [''] * 6 + ['Invalid value in row!'])
+                continue
+            result = next(results)
+            writer.writerow(values + [self.formatValue(value) for value in result[:6]] + [result.error or ''])
+
+        mode = 'r+b' if os.path.exists(outputPath) else 'wb'
+        with open(outputPath, mode) as outputFile:
+            outputFile.truncate(checkpoint['outputSize'])
+            outputFile.seek(checkpoint['outputSize'])
+            outputFile.write(buffer.getvalue().encode('utf-8'))
+            outputFile.flush()
+            os.fsync(outputFile.fileno())
+            checkpoint['outputSize'] = outputFile.tell()
+
+        self.rowsSolved += len(rows)
+        return len(rows)
+
+    def parseValue(self, key, value):
+        '''
+        Converts a CSV field to what solver.solve takes, everything but the law is a number.
+        '''
+        return TrigLaw(value.strip()).value if key == 'law' else float(value) # both raise ValueError on bad input
+
+    def formatValue(self, value):
+        '''
+        Formats a solved value for the output CSV, empty when it couldn't be solved.
+        '''
+        return '' if value is None else repr(value)
+
+    def report(self):
+        '''
+        Returns a summary of the throughput so far and the latency over the last LATENCY_WINDOW chunks.
+        '''
+        elapsed = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return (f'{self.rowsSolved} rows in {elapsed:.1f}s, '
+                f'{self.rowsSolved / self.solveTime if self.solveTime else 0:.0f} rows/s solving, '
+                f'latency p50 {percentile(0.5):.3f}s p95 {percentile(0.95):.3f}s max {percentile(1.0):.3f}s')
+
+    def run(self, once = False):
+        '''
+        Polls the directory every interval seconds until interrupted (or just once), printing a report
+        whenever something was solved.
+        '''
+        try:
+            while True:
+                if self.pollOnce():
+                    print(self.report(), flush=True)
+                if once:
+                    break
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print(self.report())
+
+def main():
+    '''
+    Command line entry point of the watch-folder daemon.
+    '''
+    parser = argparse.ArgumentParser(description='Solve triangle rows appended to CSV files in a directory.')
+    parser.add_argument('directory')
+    parser.add_argument('--law', default=TrigLaw.AUTO.value, help='law used for rows without a law column')
+    parser.add_argument('--interval', type=float, default=1.0, help='seconds between polls')
+    parser.add_argument('--max-bytes', type=int, default=1 << 20, help='bytes read from a file at once')
+    parser.add_argument('--once', action='store_true', help='process what is there and exit')
+    args = parser.parse_args()
+
+    FolderWatcher(args.directory, TrigLaw(args.law), args.interval, args.max_bytes).run(args.once)
+
+if __name__ == '__main__':
+    main()